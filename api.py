@@ -17,7 +17,7 @@ if __name__ == '__main__':
     from videotrans.task._dubbing import DubbingSrt
     from videotrans.task._speech2text import SpeechToText
     from videotrans.task._translate_srt import TranslateSrt
-    from videotrans.task.job import start_thread
+    from videotrans.task.job import start_thread, stage_status
     from videotrans.task.trans_create import TransCreate
     from videotrans.util import tools
     from videotrans import tts as tts_model, translator, recognition
@@ -537,6 +537,11 @@ if __name__ == '__main__':
             return_data[task_id]=_get_task_data(task_id)
         return jsonify({"code": 0, "msg": "ok","data":return_data})
     
+    # 各阶段排队数和执行中任务数
+    @app.route('/queue_status', methods=['POST', 'GET'])
+    def queue_status():
+        return jsonify({"code": 0, "msg": "ok", "data": stage_status()})
+
     def _get_task_data(task_id):
         file = PROCESS_INFO + f'/{task_id}.json'
         if not Path(file).is_file():
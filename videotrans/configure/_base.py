@@ -1,7 +1,46 @@
+import importlib.util
 import os
+import threading
 
 from videotrans.util import tools
 
+# 按渠道共享的 HTTP 连接池，同一渠道的多次请求复用连接(keep-alive)，避免每组都重新握手
+_http_lock = threading.Lock()
+# 渠道类名 -> requests.Session
+_http_sessions = {}
+# (渠道类名, 代理, 超时) -> httpx.Client
+_http_clients = {}
+
+
+def close_http_pool():
+    with _http_lock:
+        for s in list(_http_sessions.values()) + list(_http_clients.values()):
+            try:
+                s.close()
+            except Exception:
+                pass
+        _http_sessions.clear()
+        _http_clients.clear()
+
+
+# 渠道 name 共享的 httpx.Client，未继承 BaseCon 的类也可直接使用
+# 代理在创建时确定，因此按代理区分，安装了 h2 时启用 HTTP/2
+def http_client(name, proxy=None, timeout=None):
+    if isinstance(proxy, dict):
+        proxy = proxy.get('https') or proxy.get('http') or proxy.get('https://') or proxy.get('http://') or None
+    key = (name, proxy or None, timeout)
+    with _http_lock:
+        client = _http_clients.get(key)
+        if client is None or client.is_closed:
+            import httpx
+            kw = {"proxy": proxy or None, "http2": importlib.util.find_spec('h2') is not None,
+                  "limits": httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60)}
+            if timeout is not None:
+                kw['timeout'] = timeout
+            client = httpx.Client(**kw)
+            _http_clients[key] = client
+        return client
+
 
 class BaseCon:
 
@@ -39,4 +78,24 @@ class BaseCon:
                     os.environ['https_proxy'] = proxy
                     os.environ['all_proxy'] = proxy
                 return proxy
-        return None
\ No newline at end of file
+        return None
+
+    # 当前渠道共享的 requests.Session，用法同 requests.get/post
+    # 仍读取 _set_proxy 设置的环境变量代理，单次请求传入的 proxies 优先
+    def _session(self):
+        name = self.__class__.__name__
+        with _http_lock:
+            session = _http_sessions.get(name)
+            if session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _http_sessions[name] = session
+            return session
+
+    # 当前渠道共享的 httpx.Client，供 OpenAI/Anthropic 等 SDK 作为 http_client 使用
+    def _http_client(self, proxy=None, timeout=None):
+        return http_client(self.__class__.__name__, proxy, timeout)
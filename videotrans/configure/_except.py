@@ -7,6 +7,19 @@ class LogExcept(Exception):
         super().__init__(msg)
         config.logger.error(msg, exc_info=True)
 
+# 接口返回频率限制(429)，翻译重试时按限流退避
+class RateLimited(Exception):
+    pass
+
+
+# 接口返回非 200 状态码，保留 status_code 供判断是否限流
+class StatusError(Exception):
+
+    def __init__(self, msg='', status_code=None):
+        super().__init__(msg)
+        self.status_code = status_code
+
+
 class IPLimitExceeded(Exception):
 
     def __init__(self, msg='',name=""):
@@ -0,0 +1,86 @@
+import gc
+import threading
+import time
+from contextlib import contextmanager
+
+import torch
+
+from videotrans.configure import config
+
+
+class ModelCache:
+    """
+    进程内常驻的模型，首次使用时加载，之后各任务复用，避免每次都从磁盘重新加载
+    键由调用方给出，通常为 (模型名, 设备)，同一模型同时只允许一个任务使用
+    超过 idle_setting 指定秒数未使用的模型由后台线程卸载，0=每次使用后立即卸载
+    识别、人声分离等各自创建实例
+    """
+
+    def __init__(self, idle_setting='funasr_model_idle', name='funasr'):
+        self.idle_setting = idle_setting
+        self.name = name
+        self._lock = threading.Lock()
+        # key -> {"model":模型, "lock":使用锁, "last":最近使用时间, "using":正在使用数}
+        self._entries = {}
+        self._reaper = None
+
+    def _idle_secs(self):
+        return float(config.settings.get(self.idle_setting, 300))
+
+    # 取得模型并在 with 块内独占使用，loader() 仅在未加载时调用
+    @contextmanager
+    def get(self, key, loader):
+        with self._lock:
+            entry = self._entries.setdefault(key, {"model": None, "lock": threading.Lock(), "last": 0, "using": 0})
+            entry['using'] += 1
+        try:
+            with entry['lock']:
+                if entry['model'] is None:
+                    entry['model'] = loader()
+                yield entry['model']
+        finally:
+            with self._lock:
+                entry['using'] -= 1
+                entry['last'] = time.time()
+            if self._idle_secs() <= 0:
+                self.evict()
+            else:
+                self._start_reaper()
+
+    # 卸载空闲模型，idle 为 None 时卸载全部未在使用的模型
+    def evict(self, idle=None):
+        now = time.time()
+        removed = []
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry['using'] > 0 or (idle is not None and now - entry['last'] < idle):
+                    continue
+                removed.append(self._entries.pop(key))
+        if not removed:
+            return
+        for entry in removed:
+            entry['model'] = None
+        gc.collect()
+        try:
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except Exception:
+            pass
+
+    def _start_reaper(self):
+        with self._lock:
+            if self._reaper and self._reaper.is_alive():
+                return
+            self._reaper = threading.Thread(target=self._reap, daemon=True, name=f'{self.name}-model-reaper')
+            self._reaper.start()
+
+    def _reap(self):
+        while not config.exit_soft:
+            idle = self._idle_secs()
+            time.sleep(min(max(idle / 2, 5), 60))
+            self.evict(max(self._idle_secs(), 0))
+            with self._lock:
+                if not self._entries:
+                    self._reaper = None
+                    return
+
@@ -0,0 +1,202 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class StageQueue:
+    """
+    流水线阶段队列，替代原先 list + sleep 轮询
+    按 priority 从小到大取出，同优先级先进先出
+    兼容原 list 的 append/len/遍历 用法，get() 阻塞等待，有任务立即唤醒
+    stop_set 中存在 uuid 的任务在取出时直接丢弃
+    """
+
+    def __init__(self, name, stop_set=None):
+        self.name = name
+        self._stop_set = stop_set if stop_set is not None else set()
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        # 正在该阶段执行中的任务数
+        self.running = 0
+
+    def append(self, trk, priority=None):
+        if priority is None:
+            priority = getattr(trk, 'priority', 0)
+        with self._cond:
+            heapq.heappush(self._heap, (priority, next(self._counter), trk))
+            self._cond.notify()
+
+    # 阻塞取出一个任务，超时返回 None
+    def get(self, timeout=None):
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                while self._heap:
+                    _, _, trk = heapq.heappop(self._heap)
+                    if getattr(trk, 'uuid', None) in self._stop_set:
+                        continue
+                    self.running += 1
+                    return trk
+                if end is None:
+                    self._cond.wait()
+                    continue
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    # 取出的任务执行完毕，无论成功失败均需调用
+    def task_done(self):
+        with self._cond:
+            self.running = max(0, self.running - 1)
+
+    # 排队中且未停止的任务数
+    def qsize(self):
+        with self._cond:
+            return len([it for it in self._heap if getattr(it[2], 'uuid', None) not in self._stop_set])
+
+    def __len__(self):
+        return self.qsize()
+
+    # 按执行顺序返回快照
+    def __iter__(self):
+        with self._cond:
+            items = sorted(self._heap)
+        return iter([it[2] for it in items if getattr(it[2], 'uuid', None) not in self._stop_set])
+
+    def __bool__(self):
+        return True
+
+
+class ResourceClass:
+    """
+    资源类，限制同一类操作同时执行的数量，避免多任务并发时 CPU/网络/编码器 超载
+    limit 每次申请时通过 get_limit 读取，修改高级设置后立即生效
+    同一线程内嵌套申请同一资源类只占用一个名额，防止死锁
+    用法 with config.resource('cpu'): ...
+    """
+
+    def __init__(self, name, get_limit):
+        self.name = name
+        self._get_limit = get_limit
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        # 正在占用名额的数量
+        self.active = 0
+        # 等待名额的数量
+        self.waiting = 0
+
+    @property
+    def limit(self):
+        try:
+            return max(1, int(float(self._get_limit())))
+        except (TypeError, ValueError):
+            return 1
+
+    def acquire(self):
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0:
+            with self._cond:
+                self.waiting += 1
+                try:
+                    # 定时唤醒，以便 limit 调大后立即生效
+                    while self.active >= self.limit:
+                        self._cond.wait(1)
+                finally:
+                    self.waiting -= 1
+                self.active += 1
+        self._local.depth = depth + 1
+
+    def release(self):
+        depth = getattr(self._local, 'depth', 0) - 1
+        if depth < 0:
+            return
+        self._local.depth = depth
+        if depth == 0:
+            with self._cond:
+                self.active -= 1
+                self._cond.notify()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+        return False
+
+
+class TokenBucket:
+    """
+    令牌桶限流，rate 为每秒允许的请求数，None 为不限制
+    收到限流响应时 slow_down() 将速率减半，请求成功后 recover() 逐步恢复到 base_rate
+    """
+
+    # 降速后的最低速率，即最慢 20s 一次请求
+    min_rate = 0.05
+    # base_rate 为 None 时，恢复到该速率后即取消限制
+    free_rate = 10.0
+
+    def __init__(self, name, base_rate=None):
+        self.name = name
+        self.base_rate = base_rate
+        self.rate = base_rate
+        self._tokens = 1.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_base(self, base_rate):
+        with self._lock:
+            if base_rate != self.base_rate:
+                self.base_rate = base_rate
+                self.rate = base_rate
+
+    # 取得一个令牌，stop() 为 True 时放弃并返回 False
+    def acquire(self, stop=None) -> bool:
+        while True:
+            with self._lock:
+                if self.rate is None:
+                    return True
+                now = time.monotonic()
+                self._tokens = min(1.0, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if stop and stop():
+                return False
+            time.sleep(min(wait, 1))
+
+    def slow_down(self):
+        with self._lock:
+            current = self.rate if self.rate is not None else 2.0
+            self.rate = max(self.min_rate, current / 2)
+
+    def recover(self):
+        with self._lock:
+            if self.rate is None:
+                return
+            rate = self.rate * 1.1
+            if self.base_rate is not None and rate >= self.base_rate:
+                self.rate = self.base_rate
+            elif self.base_rate is None and rate >= self.free_rate:
+                self.rate = None
+            else:
+                self.rate = rate
+
+
+_token_buckets = {}
+_token_buckets_lock = threading.Lock()
+
+
+# 同一渠道/接口地址共享一个令牌桶，跨任务生效
+def token_bucket(name, base_rate=None) -> TokenBucket:
+    with _token_buckets_lock:
+        bucket = _token_buckets.get(name)
+        if bucket is None:
+            bucket = _token_buckets[name] = TokenBucket(name, base_rate)
+    bucket.set_base(base_rate)
+    return bucket
@@ -10,6 +10,8 @@ import tempfile
 from pathlib import Path
 from queue import Queue
 
+from videotrans.configure._scheduler import StageQueue, ResourceClass
+
 MAINWIN=None
 
 # 获取程序执行目录
@@ -35,14 +37,16 @@ _temp_path.mkdir(parents=True, exist_ok=True)
 TEMP_DIR = _temp_path.as_posix()
 Path(TEMP_DIR+'/dubbing_cache').mkdir(exist_ok=True)
 
+# 持久缓存目录 cache，退出软件时不删除
+_cache_path = _root_path / "cache"
+_cache_path.mkdir(parents=True, exist_ok=True)
+CACHE_DIR = _cache_path.as_posix()
+
 # 日志目录 logs
 _logs_path = _root_path / "logs"
 _logs_path.mkdir(parents=True, exist_ok=True)
 LOGS_DIR = _logs_path.as_posix()
 
-# 确保同时只能一个 faster-whisper进程在执行
-model_process = None
-
 # 模型下载地址
 MODELS_DOWNLOAD = {
     "openai": {
@@ -185,18 +189,30 @@ box_recogn = 'stop'
 task_countdown = 0
 
 #####################################
+# 各阶段任务队列，阻塞式优先级队列，已停止的任务取出时自动跳过
 # 预先处理队列
-prepare_queue = []
+prepare_queue = StageQueue('prepare', stoped_uuid_set)
 # 识别队列
-regcon_queue = []
+regcon_queue = StageQueue('recogn', stoped_uuid_set)
 # 翻译队列
-trans_queue = []
+trans_queue = StageQueue('trans', stoped_uuid_set)
 # 配音队列
-dubb_queue = []
+dubb_queue = StageQueue('dubbing', stoped_uuid_set)
 # 音视频画面对齐
-align_queue = []
+align_queue = StageQueue('align', stoped_uuid_set)
 # 合成队列
-assemb_queue = []
+assemb_queue = StageQueue('assemb', stoped_uuid_set)
+
+# 资源类及同时执行上限，cpu=本地模型识别等计算密集 network=在线翻译/配音/识别 ffmpeg=音视频编解码
+resource_classes = {
+    "cpu": ResourceClass('cpu', lambda: settings.get('cpu_limit', 1)),
+    "network": ResourceClass('network', lambda: settings.get('network_limit', 5)),
+    "ffmpeg": ResourceClass('ffmpeg', lambda: settings.get('ffmpeg_limit', 2)),
+}
+
+
+def resource(name) -> ResourceClass:
+    return resource_classes[name]
 
 
 # 执行模式 gui 或 api
@@ -261,6 +277,7 @@ def parse_init():
         "cuda_decode":False,
         
         "videoslow_hard":True,
+        "videoslow_onepass":True,
         
         "preset": "fast",
         "ffmpeg_cmd": "",
@@ -300,9 +317,29 @@ def parse_init():
         "trans_thread": 20,
         "aitrans_thread": 50,
         "retries": 2,
+        "trans_cache_rows": 100000,
+        "trans_cache_days": 30,
         "translation_wait": 0,
+        "trans_concurrent": 3,
+        "aitrans_token_budget": 0,
+        "aitrans_max_lines": 500,
         "dubbing_wait": 0,
         "dubbing_thread": 5,
+        "tts_cache_size": 1024,
+        "tts_cache_sampling": False,
+        "cpu_limit": 1,
+        "network_limit": 5,
+        "ffmpeg_limit": 2,
+        "prepare_worker": 0,
+        "recogn_worker": 0,
+        "trans_worker": 0,
+        "dubbing_worker": 0,
+        "align_worker": 0,
+        "assemb_worker": 0,
+        "task_resume": True,
+        "task_resume_days": 7,
+        "stream_pipeline": False,
+        "stream_window": 20,
         "save_segment_audio":False,
         "countdown_sec": 120,
         "backaudio_volume": 0.8,
@@ -340,6 +377,11 @@ def parse_init():
         "initial_prompt_fa": "",
         "whisper_threads": 4,
         "whisper_worker": 1,
+        "whisper_model_cache": 1,
+        "funasr_model_idle": 300,
+        "funasr_batch": 8,
+        "uvr_model_idle": 300,
+        "uvr_batch": 4,
         "beam_size": 5,
         "best_of": 5,
         "temperature": 0.0,
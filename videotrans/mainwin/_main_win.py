@@ -410,6 +410,16 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             tools.kill_ffmpeg_processes()
         except Exception:
             pass
+        try:
+            from videotrans.recognition._pool import whisper_pool
+            whisper_pool.shutdown()
+        except Exception:
+            pass
+        try:
+            from videotrans.configure._base import close_http_pool
+            close_http_pool()
+        except Exception:
+            pass
         time.sleep(3)
         os.chdir(config.ROOT_DIR)
         tools._unlink_tmp()
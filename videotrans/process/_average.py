@@ -1,20 +1,21 @@
-import json
 import os
 import re
-import tempfile
-import time
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 import torch
 import zhconv
-from faster_whisper import WhisperModel
-from pydub import AudioSegment
 
-from videotrans.util.tools import ms_to_time_string,  vail_file, cleartext
+from videotrans.process._overall import load_model
+from videotrans.util import audioio
+from videotrans.util.tools import ms_to_time_string, cleartext
 
+SAMPLE_RATE = 16000
 
+
+# 各分段在识别线程内按时间区间读取为 16k 单声道 float32，直接以 numpy 数组送入模型，不解码整个文件，也不导出临时 wav
+# 多个分段通过线程并发识别，并发数同 whisper_worker，结果按分段顺序输出
 def run(raws, err,detect, *, model_name, is_cuda, detect_language, audio_file, q, settings,
-        TEMP_DIR, ROOT_DIR, defaulelang,proxy=None):
+        TEMP_DIR, ROOT_DIR, defaulelang,proxy=None, model=None):
     os.chdir(ROOT_DIR)
 
     def write_log(jsondata):
@@ -23,86 +24,50 @@ def run(raws, err,detect, *, model_name, is_cuda, detect_language, audio_file, q
         except:
             pass
 
-    tmp_path =  Path(tempfile.gettempdir()+f'/recogn_{time.time()}')
-    tmp_path.mkdir(parents=True, exist_ok=True)
-    tmp_path = tmp_path.as_posix()
-
-    nonslient_file = f'{tmp_path}/detected_voice.json'
-    normalized_sound = AudioSegment.from_wav(audio_file)
-    if vail_file(nonslient_file):
-        nonsilent_data = json.load(open(nonslient_file, 'r'))
-    else:
-        nonsilent_data = _shorten_voice_old(normalized_sound, settings)
-        with open(nonslient_file, 'w') as f:
-            f.write(json.dumps(nonsilent_data))
-
-    total_length = len(nonsilent_data)
-
-    if model_name.startswith('distil-'):
-        com_type = "default"
-    elif is_cuda:
-        com_type = settings['cuda_com_type']
-    else:
-        com_type = settings['cuda_com_type']
-    # 如果不存在 / ，则是本地模型
-    local_file_only = True if model_name.find('/') == -1 else False
-    down_root = ROOT_DIR + "/models"
-    if not local_file_only:
-        if not os.path.isdir(down_root + '/models--' + model_name.replace('/', '--')):
-            msg = '下载模型中，用时可能较久' if defaulelang == 'zh' else 'Download model from huggingface'
-            if proxy:
-                os.environ['https_proxy'] = proxy
-        else:
-            msg = '加载或下载模型中，用时可能较久' if defaulelang == 'zh' else 'Load model from local or download model from huggingface'
-        write_log({"text": msg, "type": "logs"})
-    try:
-        model = WhisperModel(
-            model_name,
-            device="cuda" if is_cuda else "cpu",
-            compute_type=com_type,
-            download_root=down_root,
-            local_files_only=local_file_only)
-    except Exception as e:
-        if re.match(r'not support', str(e), re.I):
-            model = WhisperModel(
-                model_name,
-                device="cuda" if is_cuda else "cpu",
-                download_root=down_root,
-                local_files_only=local_file_only)
-        else:
+    # model 不为 None 时直接使用已加载的常驻模型
+    if model is None:
+        try:
+            model = load_model(model_name, is_cuda=is_cuda, settings=settings, ROOT_DIR=ROOT_DIR,
+                               defaulelang=defaulelang, write_log=write_log, proxy=proxy)
+        except Exception as e:
             err['msg'] = str(e)
             return
     write_log({"text": model_name+" Loaded", "type": "logs"})
     prompt = settings.get(f'initial_prompt_{detect_language}') if detect_language!='auto' else None
+
+    def _transcribe(start_time, end_time):
+        chunk, _ = audioio.read(audio_file, start_time, end_time, sr=SAMPLE_RATE, mono=True)
+        segments, info = model.transcribe(chunk,
+                                       beam_size=settings['beam_size'],
+                                       best_of=settings['best_of'],
+                                       condition_on_previous_text=settings[
+                                           'condition_on_previous_text'],
+                                       temperature=0.0 if settings['temperature'] == 0 else [0.0, 0.2,
+                                                                                             0.4,
+                                                                                             0.6, 0.8,
+                                                                                             1.0],
+                                       vad_filter=False,
+                                       language=detect_language[:2] if detect_language!='auto' else None,
+                                       initial_prompt=prompt if prompt else None
+                                       )
+        # segments 为生成器，需在工作线程内迭代才会真正执行识别
+        return " ".join([t.text for t in segments]), info
+
+    pool = None
     try:
-        last_detect=detect_language
+        nonsilent_data = _shorten_voice_old(audioio.duration_ms(audio_file), settings)
+        total_length = len(nonsilent_data)
+        nums = max(1, min(int(float(settings.get('whisper_worker', 1))), total_length))
+        pool = ThreadPoolExecutor(max_workers=nums)
+        futures = [
+            pool.submit(_transcribe, start_time, end_time)
+            for start_time, end_time, buffered in nonsilent_data
+        ]
         for i, duration in enumerate(nonsilent_data):
-            if not Path(TEMP_DIR + f'/{os.getpid()}.lock'):
-                return
             start_time, end_time, buffered = duration
-            chunk_filename = tmp_path + f"/c{i}_{start_time // 1000}_{end_time // 1000}.wav"
-            audio_chunk = normalized_sound[start_time:end_time]
-            audio_chunk.export(chunk_filename, format="wav")
-
-            text = ""
-            segments, info = model.transcribe(chunk_filename,
-                                           beam_size=settings['beam_size'],
-                                           best_of=settings['best_of'],
-                                           condition_on_previous_text=settings[
-                                               'condition_on_previous_text'],
-                                           temperature=0.0 if settings['temperature'] == 0 else [0.0, 0.2,
-                                                                                                 0.4,
-                                                                                                 0.6, 0.8,
-                                                                                                 1.0],
-                                           vad_filter=False,
-                                           language=detect_language[:2] if detect_language!='auto' else None,
-                                           initial_prompt=prompt if prompt else None
-                                           )
-            if last_detect=='auto':
+            text, info = futures[i].result()
+            if i == 0 and detect_language=='auto':
                 detect['langcode']='zh-cn' if info.language[:2]=='zh' else info.language
-                last_detect=detect['langcode']
-            for t in segments:
-                text += t.text + " "
 
             text = re.sub(r'&#\d+;', '', text.replace('&#39;', "'")).strip()
 
@@ -126,7 +91,7 @@ def run(raws, err,detect, *, model_name, is_cuda, detect_language, audio_file, q
             }
             raws.append(srt_line)
             write_log({"text": f"{srt_line['line']}\n{srt_line['time']}\n{srt_line['text']}\n\n", "type": "subtitle"})
-            write_log({"text": f" {srt_line['line']}/{total_length}", "type": "logs"})
+            write_log({"text": f" {i + 1}/{total_length}", "type": "logs"})
     except (LookupError,ValueError,AttributeError,ArithmeticError) as e:
         err['msg']=f'{e}'
         if detect_language=='auto':
@@ -134,6 +99,8 @@ def run(raws, err,detect, *, model_name, is_cuda, detect_language, audio_file, q
     except BaseException as e:
         err['msg'] = str(e)
     finally:
+        if pool:
+            pool.shutdown(wait=True, cancel_futures=True)
         try:
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
@@ -142,17 +109,17 @@ def run(raws, err,detect, *, model_name, is_cuda, detect_language, audio_file, q
 
 
 # split audio by silence
-def _shorten_voice_old(normalized_sound, settings):
+def _shorten_voice_old(total_ms, settings):
     max_interval = int(float(settings.get('interval_split',1))) * 1000
     nonsilent_data = []
     import math
-    maxlen=math.ceil(len(normalized_sound)/max_interval)
+    maxlen=math.ceil(total_ms/max_interval)
     for i in range(maxlen):
         if i<maxlen-1:
             end_time=i*max_interval+max_interval
             start_time=i*max_interval
         else:
-            end_time=len(normalized_sound)
+            end_time=total_ms
             start_time=i*max_interval
         nonsilent_data.append((start_time, end_time, False))
     return nonsilent_data
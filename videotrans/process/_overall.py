@@ -10,11 +10,59 @@ from faster_whisper import WhisperModel
 
 from videotrans.util.tools import ms_to_time_string,cleartext
 
+# 模型计算类型
+def get_compute_type(model_name, settings):
+    if model_name.startswith('distil-'):
+        return "default"
+    return settings['cuda_com_type']
+
+
+# 加载 WhisperModel，所选数据类型不支持时使用默认类型
+def load_model(model_name, *, is_cuda, settings, ROOT_DIR, defaulelang, write_log, proxy=None):
+    down_root = ROOT_DIR + "/models"
+    whisper_threads = int(float(settings.get('whisper_threads', 1)))
+    num_workers = max(1, int(settings['whisper_worker']))
+    # 未指定线程数时，各工作线程均分 cpu 核心，避免并发识别时相互抢占
+    cpu_threads = max(1, (os.cpu_count() or 1) // num_workers) if whisper_threads < 1 else whisper_threads
+    # 不存在 / ，是普通本地已有模型，直接本地加载，否则在线下载
+    local_file_only = True if model_name.find('/') == -1 else False
+    if not local_file_only:
+        if not os.path.isdir(down_root + '/models--' + model_name.replace('/', '--')):
+            msg = '下载模型中，用时可能较久' if defaulelang == 'zh' else 'Download model from huggingface'
+            print(f'{proxy=}')
+            if proxy:
+                os.environ['https_proxy'] = proxy
+        else:
+            msg = '加载或下载模型中，用时可能较久' if defaulelang == 'zh' else 'Load model from local or download model from huggingface'
+        write_log({"text": msg, "type": "logs"})
+    try:
+        return WhisperModel(
+            model_name,
+            device="cuda" if is_cuda else "cpu",
+            compute_type=get_compute_type(model_name, settings),
+            download_root=down_root,
+            num_workers=num_workers,
+            cpu_threads=cpu_threads,
+            local_files_only=local_file_only
+        )
+    except Exception as e:
+        if not re.match(r'not support', str(e), re.I):
+            raise
+    # 如果所选数据类型不支持，则使用默认
+    return WhisperModel(
+        model_name,
+        device="cuda" if is_cuda else "cpu",
+        download_root=down_root,
+        num_workers=num_workers,
+        cpu_threads=cpu_threads,
+        local_files_only=local_file_only
+    )
+
+
+# model 不为 None 时直接使用已加载的常驻模型
 def run(raws, err,detect, *, model_name, is_cuda, detect_language, audio_file,
-        q: multiprocessing.Queue, ROOT_DIR, TEMP_DIR, settings, defaulelang,proxy=None):
+        q: multiprocessing.Queue, ROOT_DIR, TEMP_DIR, settings, defaulelang,proxy=None, model=None, stream=False):
     os.chdir(ROOT_DIR)
-    down_root = ROOT_DIR + "/models"
-    settings['whisper_threads']=int(float(settings.get('whisper_threads',1)))
     def write_log(jsondata):
         try:
             q.put_nowait(jsondata)
@@ -22,47 +70,14 @@ def run(raws, err,detect, *, model_name, is_cuda, detect_language, audio_file,
             pass
 
 
+    # 常驻进程中的模型无需等待进程退出
+    resident = model is not None
     try:
-        # 不存在 / ，是普通本地已有模型，直接本地加载，否则在线下载
-        local_file_only = True if model_name.find('/') == -1 else False
-        if not local_file_only:
-            if not os.path.isdir(down_root + '/models--' + model_name.replace('/', '--')):
-                msg = '下载模型中，用时可能较久' if defaulelang == 'zh' else 'Download model from huggingface'
-                print(f'{proxy=}')
-                if proxy:
-                    os.environ['https_proxy'] = proxy
-            else:
-                msg = '加载或下载模型中，用时可能较久' if defaulelang == 'zh' else 'Load model from local or download model from huggingface'
-            write_log({"text": msg, "type": "logs"})
-        if model_name.startswith('distil-'):
-            com_type = "default"
-        elif is_cuda:
-            com_type = settings['cuda_com_type']
-        else:
-            com_type = settings['cuda_com_type']
-        try:
-            model = WhisperModel(
-                model_name,
-                device="cuda" if is_cuda else "cpu",
-                compute_type=com_type,
-                download_root=down_root,
-                num_workers=int(settings['whisper_worker']),
-                cpu_threads=os.cpu_count() if settings['whisper_threads'] < 1 else 
-                    settings['whisper_threads'],
-                local_files_only=local_file_only
-            )
-        except Exception as e:
-            if re.match(r'not support', str(e), re.I):
-                # 如果所选数据类型不支持，则使用默认
-                model = WhisperModel(
-                    model_name,
-                    device="cuda" if is_cuda else "cpu",
-                    download_root=down_root,
-                    num_workers=settings['whisper_worker'],
-                    cpu_threads=os.cpu_count() if settings['whisper_threads'] < 1 else settings['whisper_threads'],
-                    local_files_only=local_file_only
-                )
-            else:
+        if model is None:
+            try:
+                model = load_model(model_name, is_cuda=is_cuda, settings=settings, ROOT_DIR=ROOT_DIR,
+                                   defaulelang=defaulelang, write_log=write_log, proxy=proxy)
+            except Exception as e:
                 err['msg'] = str(e)
                 return
         write_log({"text": model_name+" Loaded", "type": "logs"})
@@ -99,6 +114,9 @@ def run(raws, err,detect, *, model_name, is_cuda, detect_language, audio_file,
             raws.append({"words":new_seg,"text":text})
 
             q.put_nowait({"text": f'{text}\n', "type": "subtitle"})
+            # 边识别边翻译配音时，同时输出带时间戳的原始结果
+            if stream:
+                q.put_nowait({"raw": raws[-1], "type": "segment"})
             q.put_nowait({"text": f' {"字幕" if defaulelang == "zh" else "Subtitles"} {len(raws) + 1} ', "type": "logs"})
     except (LookupError,ValueError,AttributeError,ArithmeticError) as e:
         err['msg']=f'{e}'
@@ -112,4 +130,5 @@ def run(raws, err,detect, *, model_name, is_cuda, detect_language, audio_file,
                 torch.cuda.empty_cache()
         except:
             pass
-        time.sleep(2)
+        if not resident:
+            time.sleep(2)
@@ -0,0 +1,72 @@
+import gc
+from collections import OrderedDict
+
+import torch
+
+from videotrans.process import _average, _overall
+
+# 常驻识别进程中已加载的模型，键为 (model_name, compute_type, device)，按最近使用排序
+_models = OrderedDict()
+
+
+# 按最近最少使用淘汰，仅保留 cache_size 个模型
+def _evict(cache_size):
+    evicted = False
+    while len(_models) > max(cache_size, 0):
+        _models.popitem(last=False)
+        evicted = True
+    if evicted:
+        gc.collect()
+        try:
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except:
+            pass
+
+
+def _get_model(kwargs, cache_size, write_log):
+    model_name = kwargs['model_name']
+    key = (model_name, _overall.get_compute_type(model_name, kwargs['settings']), "cuda" if kwargs['is_cuda'] else "cpu")
+    if key in _models:
+        _models.move_to_end(key)
+        return _models[key]
+    # 先淘汰，防止新旧模型同时占用内存
+    _evict(cache_size - 1)
+    model = _overall.load_model(
+        model_name,
+        is_cuda=kwargs['is_cuda'],
+        settings=kwargs['settings'],
+        ROOT_DIR=kwargs['ROOT_DIR'],
+        defaulelang=kwargs['defaulelang'],
+        write_log=write_log,
+        proxy=kwargs.get('proxy'))
+    _models[key] = model
+    return model
+
+
+# 常驻识别进程入口，从 in_q 获取任务，进度日志和最终结果写入 out_q，收到 None 时退出
+def worker(in_q, out_q):
+    def write_log(jsondata):
+        try:
+            out_q.put_nowait(jsondata)
+        except:
+            pass
+
+    while 1:
+        job = in_q.get()
+        if job is None:
+            return
+        kwargs = job['kwargs']
+        cache_size = int(job.get('cache_size', 1))
+        raws = []
+        err = {"msg": ""}
+        detect = {"langcode": kwargs['detect_language']}
+        try:
+            model = _get_model(kwargs, cache_size, write_log)
+        except Exception as e:
+            err['msg'] = str(e)
+        else:
+            func = _average.run if job['mode'] == 'avg' else _overall.run
+            func(raws, err, detect, q=out_q, model=model, **kwargs)
+        _evict(cache_size)
+        out_q.put({"type": "_result", "raws": raws, "err": err['msg'], "langcode": detect['langcode']})
@@ -154,6 +154,32 @@ def is_input_api(recogn_type: int = None,return_str=False):
         return False
     return True
 
+# 影响识别结果的高级设置，断点恢复时任一改变则重新识别
+FINGERPRINT_SETTINGS = [
+    'beam_size', 'best_of', 'temperature', 'condition_on_previous_text', 'cuda_com_type',
+    'vad', 'threshold', 'min_speech_duration_ms', 'max_speech_duration_s', 'min_silence_duration_ms', 'speech_pad_ms',
+    'voice_silence', 'interval_split', 'overall_maxsecs', 'rephrase', 'cjk_len', 'other_len', 'zh_hant_s',
+]
+
+
+def settings_fingerprint(recogn_type: int = 0, detect_language=None) -> Dict:
+    """识别相关设置及初始提示词，供断点恢复判断设置是否一致"""
+    result = {k: config.settings.get(k) for k in FINGERPRINT_SETTINGS}
+    if detect_language and detect_language != 'auto':
+        result['initial_prompt'] = config.settings.get(f'initial_prompt_{detect_language}')
+    if recogn_type == OPENAI_API:
+        result['model'] = config.params.get('openairecognapi_model')
+        result['prompt'] = config.params.get('openairecognapi_prompt')
+    elif recogn_type == GEMINI_SPEECH:
+        result['prompt'] = config.params.get('gemini_srtprompt')
+    return result
+
+
+# 识别过程中是否逐条输出字幕，仅 faster-whisper 整体识别支持，重新断句时最终结果与逐条结果不一致
+def recogn_emits_segments(recogn_type: int = 0, split_type="all") -> bool:
+    return recogn_type == FASTER_WHISPER and split_type != 'avg' and not config.settings.get('rephrase', False)
+
+
 # 统一入口
 def run(*,
         split_type="all",
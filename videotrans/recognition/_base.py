@@ -1,4 +1,3 @@
-import copy
 import json
 import os
 import re
@@ -10,11 +9,14 @@ import zhconv
 
 from videotrans.configure import config
 from videotrans.configure._base import BaseCon
+from videotrans.recognition._models import funasr_models
 
 from videotrans.util import tools
 
 
 class BaseRecogn(BaseCon):
+    # 所属资源类，本地模型识别为 cpu，在线识别为 network
+    resource_class = 'network'
 
     def __init__(self, detect_language=None, audio_file=None, cache_folder=None,
                  model_name=None, inst=None, uuid=None, is_cuda=None,target_code=None,subtitle_type=0):
@@ -70,7 +72,8 @@ class BaseRecogn(BaseCon):
             if self.detect_language[:2].lower() in ['zh', 'ja', 'ko']:
                 self.flag.append(" ")
                 self.join_word_flag = ""
-            return self._exec()
+            with config.resource(self.resource_class):
+                return self._exec()
         except Exception as e:
             config.logger.exception(e, exc_info=True)
             msg = f'{str(e)}'
@@ -91,6 +94,52 @@ class BaseRecogn(BaseCon):
     def _exec(self) -> Union[List[Dict], None]:
         pass
 
+    # ct-punc 标点模型，进程内常驻复用，仅首次加载时可能需从 modelscope 下载，此时临时取消代理
+    def _load_punc_model(self):
+        from funasr import AutoModel
+        self._set_proxy(type='del')
+        try:
+            return AutoModel(model="ct-punc", 
+                model_revision="v2.0.4",
+                local_dir=config.ROOT_DIR + "/models",
+                disable_update=True,
+                disable_log=True,
+                disable_progress_bar=True,
+                hub='ms',
+                device=self.device)
+        finally:
+            self._set_proxy(type='set')
+
+    # 将加标点后的文本 text 中的标点追加到对应 word 末尾
+    # words 和 text 的文字依次对应，双指针一次扫描，忽略空白、大小写和 word 中已有的标点
+    @staticmethod
+    def _punc_align(words, text):
+        puncs = set('，。？！；、,?.!;')
+        text = text.lower()
+        pos, n = 0, len(text)
+        for it in words:
+            for c in it['word'].lower():
+                if c in puncs or c.isspace():
+                    continue
+                while pos < n and (text[pos] in puncs or text[pos].isspace()):
+                    pos += 1
+                if pos < n and text[pos] == c:
+                    pos += 1
+                    continue
+                # 模型改动了个别字符时，在附近找回对齐位置，找不到则保持不动
+                found = text.find(c, pos, pos + 8)
+                if found > -1:
+                    pos = found + 1
+            # word 之后紧跟的标点
+            flag = ''
+            while pos < n and (text[pos] in puncs or text[pos].isspace()):
+                if not flag and text[pos] in puncs:
+                    flag = text[pos]
+                pos += 1
+            if flag and it['word'][-1] not in puncs:
+                it['word'] += flag
+        return words
+
     def re_segment_sentences(self,words,langcode):
         if self.inst and self.inst.status_text:
             self.inst.status_text="正在重新断句..." if config.defaulelang=='zh' else "Re-segmenting..."
@@ -109,10 +158,6 @@ class BaseRecogn(BaseCon):
                 continue
             it['word']=zhconv.convert(it['word'], 'zh-hans') if jianfan and  langcode=='zh' else it['word']
             new_words.append(it)
-        text = "".join([w["word"] for w in new_words])
-        text=text.strip()
-        #print(f'text1={text}')
-        copy_words = copy.deepcopy(new_words)    
         flag_list = [
             '，', 
             '。',
@@ -130,62 +175,14 @@ class BaseRecogn(BaseCon):
         ]
 
         
-        if langcode in ['zh','en']:
-
+        if langcode in ['zh','en'] and new_words:
+            text = ("" if langcode=='zh' else " ").join([w["word"] for w in new_words]).strip()
             try:
-                self._set_proxy(type='del')
-                from funasr import AutoModel
-                model = AutoModel(model="ct-punc", 
-                    model_revision="v2.0.4",
-                    local_dir=config.ROOT_DIR + "/models",
-                    disable_update=True,
-                    disable_log=True,
-                    disable_progress_bar=True,
-                    hub='ms',
-                    device=self.device)
-                res = model.generate(input=text)
-                text=res[0]['text'].strip()       
-
-                # 记录每个标点符号在原text中应该插入的位置
-                flags = {}
-                pos_index = -1
-                for i in range(len(text)):
-                    if text[i] not in flag_list:
-                        pos_index += 1
-                    else:
-                        flags[str(pos_index)] = text[i]
-
-                # 复制一份words，将标点插入
-                pos_start = -1
-                flags_index = list(flags.keys())
-                
-                for w_index, it in enumerate(new_words):
-                    if len(flags_index) < 1:
-                        new_words[w_index] = it
-                        break
-                    f0 = int(flags_index[0])
-                    if pos_start + len(it['word']) < f0:
-                        pos_start += len(it['word'])
-                        continue
-                    # 当前应该插入的标点位置 f0大于 pos_start 并且小于 pos_start+长度，即位置存在于当前word
-                    # word中可能是1-多个字符
-                    if f0 > pos_start and f0 <= pos_start + len(it['word']):
-                        if len(it['word']) == 1:
-                            copy_words[w_index]['word'] += flags[str(f0)]
-                            pos_start += len(it['word'])
-                            flags_index.pop(0)
-                        elif len(it['word']) > 1:
-                            for j in range(f0 - pos_start):
-                                if pos_start + j + 1 == f0:
-                                    copy_words[w_index]['word'] += flags[str(f0)]
-                                    pos_start += len(it['word'])
-                                    flags_index.pop(0)
-                                    break
-                        new_words[w_index] = it
+                with funasr_models.get(("ct-punc", self.device), self._load_punc_model) as model:
+                    res = model.generate(input=text)
+                self._punc_align(new_words, res[0]['text'].strip())
             except Exception as e:
                 config.logger.exception(e, exc_info=True)
-            finally:
-                self._set_proxy(type='set')
             
         # 根据标点符号断句
         
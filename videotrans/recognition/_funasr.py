@@ -5,16 +5,21 @@ from typing import Union, List, Dict
 
 
 
+import numpy as np
 from pydub import AudioSegment
 
 from videotrans.configure import config
 from videotrans.util import tools
 from videotrans.recognition._base import BaseRecogn
+from videotrans.recognition._models import funasr_models
 from funasr import AutoModel
 
+SAMPLE_RATE = 16000
+
 
 
 class FunasrRecogn(BaseRecogn):
+    resource_class = 'cpu'
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -43,24 +48,13 @@ class FunasrRecogn(BaseRecogn):
             if self.inst and self.inst.status_text:
                 self.inst.status_text=msg
         try:
-            model = AutoModel(
-                            model=self.model_name,model_revision="v2.0.4",
-                              vad_model="fsmn-vad", vad_model_revision="v2.0.4",
-                              punc_model="ct-punc", punc_model_revision="v2.0.4",
-                              local_dir=config.ROOT_DIR + "/models",
-                              hub='ms',
-                              disable_update=True,
-                              disable_progress_bar=True,
-                              disable_log=True,
-                            device=self.device
-                    )
-        
-            msg=f"模型加载完毕，进入识别" if config.defaulelang == 'zh' else 'Model loading is complete, enter recognition'
-            self._signal(text=msg)
-            if self.inst and self.inst.status_text:
-                self.inst.status_text=msg
-            res = model.generate(input=self.audio_file, return_raw_text=True, is_final=True,
-                                 sentence_timestamp=True, batch_size_s=100,disable_pbar=True)
+            with funasr_models.get((self.model_name, self.device), self._load_model) as model:
+                msg=f"模型加载完毕，进入识别" if config.defaulelang == 'zh' else 'Model loading is complete, enter recognition'
+                self._signal(text=msg)
+                if self.inst and self.inst.status_text:
+                    self.inst.status_text=msg
+                res = model.generate(input=self.audio_file, return_raw_text=True, is_final=True,
+                                     sentence_timestamp=True, batch_size_s=100,disable_pbar=True)
             raw_subtitles = []
 
             for it in res[0]['sentence_info']:
@@ -82,12 +76,48 @@ class FunasrRecogn(BaseRecogn):
             raise
         finally:         
             self._set_proxy(type='set')
-            try:
-                del model
-            except:
-                pass
         return raw_subtitles
 
+    # 以下模型进程内常驻，各任务复用，空闲超过 funasr_model_idle 秒后卸载
+    def _load_model(self):
+        return AutoModel(
+                        model=self.model_name,model_revision="v2.0.4",
+                          vad_model="fsmn-vad", vad_model_revision="v2.0.4",
+                          punc_model="ct-punc", punc_model_revision="v2.0.4",
+                          local_dir=config.ROOT_DIR + "/models",
+                          hub='ms',
+                          disable_update=True,
+                          disable_progress_bar=True,
+                          disable_log=True,
+                        device=self.device
+                )
+
+    def _load_sense(self):
+        return AutoModel(
+            model="iic/SenseVoiceSmall",
+            punc_model="ct-punc",
+            device=self.device,
+            local_dir=config.ROOT_DIR + "/models",
+              disable_update=True,
+              disable_progress_bar=True,
+              disable_log=True,
+              #trust_remote_code=True,
+              hub='ms'
+        )
+
+    def _load_vad(self):
+        return AutoModel(
+            model="fsmn-vad",
+            local_dir=config.ROOT_DIR + "/models",
+            max_single_segment_time=20000,
+            max_end_silence_time=250,
+            hub='ms',
+            disable_update=True,
+            disable_progress_bar=True,
+            disable_log=True,
+            device=self.device)
+
+    # 整段音频解码为 16k 单声道 float32，VAD 分段直接切片后按批送入模型，不再逐段导出临时 wav
     def _exec1(self) -> Union[List[Dict], None]:
         if self._exit():
             return
@@ -100,63 +130,48 @@ class FunasrRecogn(BaseRecogn):
         try:
             from funasr.utils.postprocess_utils import rich_transcription_postprocess
 
-
-            model = AutoModel(
-                model="iic/SenseVoiceSmall",
-                punc_model="ct-punc",
-                device=self.device,
-                local_dir=config.ROOT_DIR + "/models",
-                  disable_update=True,
-                  disable_progress_bar=True,
-                  disable_log=True,
-                  #trust_remote_code=True,
-                  hub='ms'
-            )
-            #vad
-            vm = AutoModel(
-                model="fsmn-vad",
-                local_dir=config.ROOT_DIR + "/models",
-                max_single_segment_time=20000,
-                max_end_silence_time=250,
-                hub='ms',
-                disable_update=True,
-                disable_progress_bar=True,
-                disable_log=True,
-                device=self.device)
-            msg=f"模型已加载开始识别，请耐心等待" if config.defaulelang == 'zh' else 'Recognition may take a while, please be patient'
-            self._signal(text=msg)
-            if self.inst and self.inst.status_text:
-                self.inst.status_text=msg
-            segments = vm.generate(input=self.audio_file)
-            audiodata = AudioSegment.from_file(self.audio_file)
+            with funasr_models.get(("fsmn-vad", self.device), self._load_vad) as vm:
+                segments = vm.generate(input=self.audio_file)
+            audiodata = AudioSegment.from_file(self.audio_file).set_frame_rate(SAMPLE_RATE).set_channels(1).set_sample_width(2)
+            audio = np.frombuffer(audiodata.raw_data, dtype=np.int16).astype(np.float32) / 32768.0
+            del audiodata
+            batch_size = max(1, int(float(config.settings.get('funasr_batch', 8))))
+            segs = [seg for seg in segments[0]['value'] if seg[1] > seg[0]]
 
             srts = []
-            for seg in segments[0]['value']:
-                chunk = audiodata[seg[0]:seg[1]]
-                filename = f"{config.TEMP_DIR}/{seg[0]}-{seg[1]}.wav"
-                chunk.export(filename)
-                res = model.generate(
-                    input=filename,
-                    language=self.detect_language[:2],  # "zh", "en", "yue", "ja", "ko", "nospeech"
-                    use_itn=True,
-                    disable_pbar=True
-                )
-                text = self.remove_unwanted_characters(rich_transcription_postprocess(res[0]["text"]))
-                srt={
-                    "line": len(srts) + 1,
-                    "text": text,
-                    "start_time": seg[0],
-                    "end_time": seg[1],
-                    "startraw": f'{tools.ms_to_time_string(ms=seg[0])}',
-                    "endraw":f'{tools.ms_to_time_string(ms=seg[1])}'
-                }
-                srt['time']=f"{srt['startraw']} --> {srt['endraw']}"
-                srts.append(srt)
-
-                self._signal(
-                    text=text+"\n",
-                    type='subtitle'
-                )
+            with funasr_models.get(("iic/SenseVoiceSmall", self.device), self._load_sense) as model:
+                msg=f"模型已加载开始识别，请耐心等待" if config.defaulelang == 'zh' else 'Recognition may take a while, please be patient'
+                self._signal(text=msg)
+                if self.inst and self.inst.status_text:
+                    self.inst.status_text=msg
+                for n in range(0, len(segs), batch_size):
+                    if self._exit():
+                        return
+                    batch = segs[n:n + batch_size]
+                    res = model.generate(
+                        input=[audio[seg[0] * SAMPLE_RATE // 1000:seg[1] * SAMPLE_RATE // 1000] for seg in batch],
+                        language=self.detect_language[:2],  # "zh", "en", "yue", "ja", "ko", "nospeech"
+                        use_itn=True,
+                        batch_size=len(batch),
+                        disable_pbar=True
+                    )
+                    for seg, r in zip(batch, res):
+                        text = self.remove_unwanted_characters(rich_transcription_postprocess(r["text"]))
+                        srt={
+                            "line": len(srts) + 1,
+                            "text": text,
+                            "start_time": seg[0],
+                            "end_time": seg[1],
+                            "startraw": f'{tools.ms_to_time_string(ms=seg[0])}',
+                            "endraw":f'{tools.ms_to_time_string(ms=seg[1])}'
+                        }
+                        srt['time']=f"{srt['startraw']} --> {srt['endraw']}"
+                        srts.append(srt)
+
+                        self._signal(
+                            text=text+"\n",
+                            type='subtitle'
+                        )
             return srts
         except Exception as e:
             err=str(e)
@@ -165,10 +180,3 @@ class FunasrRecogn(BaseRecogn):
             raise
         finally:
             self._set_proxy(type='set')
-            try:
-                if model:
-                    del model
-                if vm:
-                    del vm
-            except:
-                pass
\ No newline at end of file
@@ -0,0 +1,4 @@
+from videotrans.configure._models import ModelCache
+
+# funasr 识别、标点等模型
+funasr_models = ModelCache()
@@ -1,19 +1,18 @@
 # openai
-from pathlib import Path
 from typing import Union, List, Dict
 
 import torch
 import whisper
 import zhconv
-from pydub import AudioSegment
 
 from videotrans.configure import config
 from videotrans.recognition._base import BaseRecogn
-from videotrans.util import tools
+from videotrans.util import tools, audioio
 import copy,re
 
 
 class OpenaiWhisperRecogn(BaseRecogn):
+    resource_class = 'cpu'
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -38,14 +37,10 @@ class OpenaiWhisperRecogn(BaseRecogn):
             return
         if self.model_name.find('/')>-1:
             raise Exception('huggingface上的自定义模型只可用于faster-whisper模式' if config.defaulelang=='zh' else 'The model only use when faster-whisper')
-        tmp_path = Path(f'{self.cache_folder}/{Path(self.audio_file).name}_tmp')
-        tmp_path.mkdir(parents=True, exist_ok=True)
-        tmp_path = tmp_path.as_posix()
-
-        # 以600s切分
+        # 以600s切分，每段单独读取为 16k 单声道数组直接送入模型，不解码整个文件
         inter = 600000
-        normalized_sound = AudioSegment.from_wav(self.audio_file)  # -20.0
-        total_length = 1 + (len(normalized_sound) // inter)
+        total_ms = audioio.duration_ms(self.audio_file)
+        total_length = 1 + (total_ms // inter)
 
         self.model = whisper.load_model(
             self.model_name,
@@ -63,14 +58,13 @@ class OpenaiWhisperRecogn(BaseRecogn):
                 if i < total_length - 1:
                     end_time = start_time + inter
                 else:
-                    end_time = len(normalized_sound)
-
-                chunk_filename = tmp_path + f"/c{i}_{start_time // 1000}_{end_time // 1000}.wav"
-                audio_chunk = normalized_sound[start_time:end_time]
-                audio_chunk.export(chunk_filename, format="wav")
+                    end_time = total_ms
+                if end_time <= start_time:
+                    break
+                audio_chunk, _ = audioio.read(self.audio_file, start_time, end_time, sr=16000, mono=True)
 
                 result = self.model.transcribe(
-                    chunk_filename,
+                    audio_chunk,
                     language=self.detect_language[:2] if self.detect_language!='auto' else None,
                     word_timestamps=True,
                     initial_prompt=prompt if prompt else None,
@@ -0,0 +1,115 @@
+import multiprocessing
+import queue
+import threading
+
+from videotrans.configure import config
+from videotrans.process._pool import worker
+
+
+class WhisperPool:
+    """
+    常驻 faster-whisper 识别进程池，避免每个文件都重新创建进程并加载模型
+    进程数不超过 cpu 资源类名额，每个进程内按 (model_name, compute_type, device) 缓存最多 whisper_model_cache 个模型
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._idle = []
+        self._total = 0
+
+    def _start(self):
+        in_q = multiprocessing.Queue()
+        out_q = multiprocessing.Queue()
+        process = multiprocessing.Process(target=worker, args=(in_q, out_q), daemon=True)
+        process.start()
+        return {"process": process, "in": in_q, "out": out_q}
+
+    # 取得一个空闲进程，无空闲且未达上限时新建，否则等待
+    def _acquire(self):
+        with self._cond:
+            while True:
+                while self._idle:
+                    w = self._idle.pop()
+                    if w['process'].is_alive():
+                        return w
+                    self._total -= 1
+                if self._total < config.resource('cpu').limit:
+                    self._total += 1
+                    break
+                self._cond.wait(1)
+        try:
+            return self._start()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, w, reuse=True):
+        with self._cond:
+            if reuse and w['process'].is_alive():
+                self._idle.append(w)
+            else:
+                self._total -= 1
+            self._cond.notify()
+
+    def _kill(self, w):
+        try:
+            if w['process'].is_alive():
+                w['process'].terminate()
+            w['process'].join(5)
+        except Exception:
+            pass
+
+    def transcribe(self, mode, kwargs, *, on_message=None, should_stop=None):
+        """
+        mode: all 整体识别，avg 均等分割识别
+        kwargs: 传给 process/_overall.run 或 process/_average.run 的参数，不含 q 和 model
+        返回 {"raws","err","langcode"}，should_stop() 为 True 时终止该进程并返回 None
+        """
+        w = self._acquire()
+        reuse = True
+        try:
+            w['in'].put({
+                "mode": mode,
+                "kwargs": kwargs,
+                "cache_size": int(float(config.settings.get('whisper_model_cache', 1)))
+            })
+            while True:
+                if should_stop and should_stop():
+                    reuse = False
+                    return None
+                try:
+                    data = w['out'].get(timeout=0.5)
+                except queue.Empty:
+                    if not w['process'].is_alive():
+                        reuse = False
+                        raise Exception('识别进程意外退出' if config.defaulelang == 'zh' else 'Recognition process exited unexpectedly')
+                    continue
+                if data.get('type') == '_result':
+                    return data
+                if on_message:
+                    on_message(data)
+        except BaseException:
+            reuse = False
+            raise
+        finally:
+            if not reuse:
+                self._kill(w)
+            self._release(w, reuse)
+
+    # 退出软件时结束所有常驻进程
+    def shutdown(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+        for w in idle:
+            try:
+                w['in'].put(None)
+                w['process'].join(2)
+            except Exception:
+                pass
+            self._kill(w)
+
+
+whisper_pool = WhisperPool()
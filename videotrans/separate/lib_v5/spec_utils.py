@@ -5,6 +5,7 @@ import os
 
 import librosa
 import numpy as np
+import torch
 
 
 def crop_center(h1, h2):
@@ -25,63 +26,73 @@ def crop_center(h1, h2):
     return h1
 
 
-def wave_to_spectrogram(
-        wave, hop_length, n_fft, mid_side=False, mid_side_b2=False, reverse=False
-):
-    if reverse:
-        wave_left = np.flip(np.asfortranarray(wave[0]))
-        wave_right = np.flip(np.asfortranarray(wave[1]))
-    elif mid_side:
-        wave_left = np.asfortranarray(np.add(wave[0], wave[1]) / 2)
-        wave_right = np.asfortranarray(np.subtract(wave[0], wave[1]))
-    elif mid_side_b2:
-        wave_left = np.asfortranarray(np.add(wave[1], wave[0] * 0.5))
-        wave_right = np.asfortranarray(np.subtract(wave[0], wave[1] * 0.5))
-    else:
-        wave_left = np.asfortranarray(wave[0])
-        wave_right = np.asfortranarray(wave[1])
+# 各 n_fft 的 hann 窗，复用
+_windows = {}
 
-    spec_left = librosa.stft(wave_left, n_fft, hop_length=hop_length)
-    spec_right = librosa.stft(wave_right, n_fft, hop_length=hop_length)
 
-    spec = np.asfortranarray([spec_left, spec_right])
+def _hann(n_fft):
+    window = _windows.get(n_fft)
+    if window is None:
+        window = _windows[n_fft] = torch.hann_window(n_fft)
+    return window
 
-    return spec
 
+def batch_stft(waves, n_fft, hop_length):
+    """
+    全部声道一次计算 STFT，waves 形状为 (声道数, 采样数)
+    与 librosa.stft(center=True, pad_mode="constant") 结果一致，torch 内部多线程计算
+    """
+    x = torch.from_numpy(np.ascontiguousarray(waves, dtype=np.float32))
+    with torch.no_grad():
+        spec = torch.stft(x, n_fft, hop_length=hop_length, window=_hann(n_fft), center=True,
+                          pad_mode="constant", return_complex=True)
+    return spec.numpy()
+
+
+def batch_istft(spec, hop_length):
+    """全部声道一次计算 iSTFT，spec 形状为 (声道数, bins, 帧数)，与 librosa.istft(center=True) 结果一致"""
+    n_fft = 2 * (spec.shape[1] - 1)
+    x = torch.from_numpy(np.ascontiguousarray(spec, dtype=np.complex64))
+    with torch.no_grad():
+        wave = torch.istft(x, n_fft, hop_length=hop_length, window=_hann(n_fft), center=True)
+    return wave.numpy()
 
-def wave_to_spectrogram_mt(
-        wave, hop_length, n_fft, mid_side=False, mid_side_b2=False, reverse=False
-):
-    import threading
 
+def _split_channels(wave, mid_side=False, mid_side_b2=False, reverse=False):
     if reverse:
-        wave_left = np.flip(np.asfortranarray(wave[0]))
-        wave_right = np.flip(np.asfortranarray(wave[1]))
-    elif mid_side:
-        wave_left = np.asfortranarray(np.add(wave[0], wave[1]) / 2)
-        wave_right = np.asfortranarray(np.subtract(wave[0], wave[1]))
-    elif mid_side_b2:
-        wave_left = np.asfortranarray(np.add(wave[1], wave[0] * 0.5))
-        wave_right = np.asfortranarray(np.subtract(wave[0], wave[1] * 0.5))
-    else:
-        wave_left = np.asfortranarray(wave[0])
-        wave_right = np.asfortranarray(wave[1])
+        return np.flip(wave[:2], 1)
+    if mid_side:
+        return np.stack([np.add(wave[0], wave[1]) / 2, np.subtract(wave[0], wave[1])])
+    if mid_side_b2:
+        return np.stack([np.add(wave[1], wave[0] * 0.5), np.subtract(wave[0], wave[1] * 0.5)])
+    return wave[:2]
 
-    def run_thread(**kwargs):
-        global spec_left
-        spec_left = librosa.stft(**kwargs)
 
-    thread = threading.Thread(
-        target=run_thread,
-        kwargs={"y": wave_left, "n_fft": n_fft, "hop_length": hop_length},
-    )
-    thread.start()
-    spec_right = librosa.stft(wave_right, n_fft=n_fft, hop_length=hop_length)
-    thread.join()
+def _merge_channels(wave, mid_side=False, mid_side_b2=False, reverse=False):
+    wave_left, wave_right = wave[0], wave[1]
+    if reverse:
+        return np.flip(wave, 1)
+    if mid_side:
+        return np.stack([np.add(wave_left, wave_right / 2), np.subtract(wave_left, wave_right / 2)])
+    if mid_side_b2:
+        return np.stack([
+            np.add(wave_right / 1.25, 0.4 * wave_left),
+            np.subtract(wave_left / 1.25, 0.4 * wave_right),
+        ])
+    return wave
 
-    spec = np.asfortranarray([spec_left, spec_right])
 
-    return spec
+def wave_to_spectrogram(
+        wave, hop_length, n_fft, mid_side=False, mid_side_b2=False, reverse=False
+):
+    return batch_stft(_split_channels(wave, mid_side, mid_side_b2, reverse), n_fft, hop_length)
+
+
+# 左右声道已在同一次 batch_stft 中并行计算，保留此名称兼容原调用
+def wave_to_spectrogram_mt(
+        wave, hop_length, n_fft, mid_side=False, mid_side_b2=False, reverse=False
+):
+    return wave_to_spectrogram(wave, hop_length, n_fft, mid_side, mid_side_b2, reverse)
 
 
 def combine_spectrograms(specs, mp):
@@ -119,7 +130,7 @@ def combine_spectrograms(specs, mp):
                 gp = g
                 spec_c[:, b, :] *= g
 
-    return np.asfortranarray(spec_c)
+    return spec_c
 
 
 def spectrogram_to_image(spec, mode="magnitude"):
@@ -287,61 +298,12 @@ def cache_or_load(mix_path, inst_path, mp):
 
 
 def spectrogram_to_wave(spec, hop_length, mid_side, mid_side_b2, reverse):
-    spec_left = np.asfortranarray(spec[0])
-    spec_right = np.asfortranarray(spec[1])
-
-    wave_left = librosa.istft(spec_left, hop_length=hop_length)
-    wave_right = librosa.istft(spec_right, hop_length=hop_length)
-
-    if reverse:
-        return np.asfortranarray([np.flip(wave_left), np.flip(wave_right)])
-    elif mid_side:
-        return np.asfortranarray(
-            [np.add(wave_left, wave_right / 2), np.subtract(wave_left, wave_right / 2)]
-        )
-    elif mid_side_b2:
-        return np.asfortranarray(
-            [
-                np.add(wave_right / 1.25, 0.4 * wave_left),
-                np.subtract(wave_left / 1.25, 0.4 * wave_right),
-            ]
-        )
-    else:
-        return np.asfortranarray([wave_left, wave_right])
+    return _merge_channels(batch_istft(spec, hop_length), mid_side, mid_side_b2, reverse)
 
 
+# 左右声道已在同一次 batch_istft 中并行计算，保留此名称兼容原调用
 def spectrogram_to_wave_mt(spec, hop_length, mid_side, reverse, mid_side_b2):
-    import threading
-
-    spec_left = np.asfortranarray(spec[0])
-    spec_right = np.asfortranarray(spec[1])
-
-    def run_thread(**kwargs):
-        global wave_left
-        wave_left = librosa.istft(**kwargs)
-
-    thread = threading.Thread(
-        target=run_thread, kwargs={"stft_matrix": spec_left, "hop_length": hop_length}
-    )
-    thread.start()
-    wave_right = librosa.istft(spec_right, hop_length=hop_length)
-    thread.join()
-
-    if reverse:
-        return np.asfortranarray([np.flip(wave_left), np.flip(wave_right)])
-    elif mid_side:
-        return np.asfortranarray(
-            [np.add(wave_left, wave_right / 2), np.subtract(wave_left, wave_right / 2)]
-        )
-    elif mid_side_b2:
-        return np.asfortranarray(
-            [
-                np.add(wave_right / 1.25, 0.4 * wave_left),
-                np.subtract(wave_left / 1.25, 0.4 * wave_right),
-            ]
-        )
-    else:
-        return np.asfortranarray([wave_left, wave_right])
+    return spectrogram_to_wave(spec, hop_length, mid_side, mid_side_b2, reverse)
 
 
 def cmb_spectrogram_to_wave(spec_m, mp, extra_bins_h=None, extra_bins=None):
@@ -351,8 +313,9 @@ def cmb_spectrogram_to_wave(spec_m, mp, extra_bins_h=None, extra_bins=None):
 
     for d in range(1, bands_n + 1):
         bp = mp.param["band"][d]
-        spec_s = np.ndarray(
-            shape=(2, bp["n_fft"] // 2 + 1, spec_m.shape[2]), dtype=complex
+        # 未被频段覆盖的 bin 置零，complex64 与 STFT 精度一致
+        spec_s = np.zeros(
+            shape=(2, bp["n_fft"] // 2 + 1, spec_m.shape[2]), dtype=np.complex64
         )
         h = bp["crop_stop"] - bp["crop_start"]
         spec_s[:, bp["crop_start"]: bp["crop_stop"], :] = spec_m[
@@ -422,24 +385,26 @@ def cmb_spectrogram_to_wave(spec_m, mp, extra_bins_h=None, extra_bins=None):
     return wave.T
 
 
+# 增益逐 bin 线性递减，整段一次原地相乘
 def fft_lp_filter(spec, bin_start, bin_stop):
-    g = 1.0
-    for b in range(bin_start, bin_stop):
-        g -= 1 / (bin_stop - bin_start)
-        spec[:, b, :] = g * spec[:, b, :]
+    n = bin_stop - bin_start
+    if n > 0:
+        g = 1.0 - np.arange(1, n + 1, dtype=np.float32) / n
+        spec[:, bin_start:bin_stop, :] *= g[:, None]
 
-    spec[:, bin_stop:, :] *= 0
+    spec[:, bin_stop:, :] = 0
 
     return spec
 
 
 def fft_hp_filter(spec, bin_start, bin_stop):
-    g = 1.0
-    for b in range(bin_start, bin_stop, -1):
-        g -= 1 / (bin_start - bin_stop)
-        spec[:, b, :] = g * spec[:, b, :]
+    n = bin_start - bin_stop
+    if n > 0:
+        # bin_start 向下至 bin_stop+1 增益依次递减
+        g = 1.0 - np.arange(1, n + 1, dtype=np.float32) / n
+        spec[:, bin_stop + 1: bin_start + 1, :] *= g[::-1, None]
 
-    spec[:, 0: bin_stop + 1, :] *= 0
+    spec[:, 0: bin_stop + 1, :] = 0
 
     return spec
 
@@ -502,19 +467,8 @@ def ensembling(a, specs):
 
 
 def stft(wave, nfft, hl):
-    wave_left = np.asfortranarray(wave[0])
-    wave_right = np.asfortranarray(wave[1])
-    spec_left = librosa.stft(wave_left, nfft, hop_length=hl)
-    spec_right = librosa.stft(wave_right, nfft, hop_length=hl)
-    spec = np.asfortranarray([spec_left, spec_right])
-
-    return spec
+    return batch_stft(wave[:2], nfft, hl)
 
 
 def istft(spec, hl):
-    spec_left = np.asfortranarray(spec[0])
-    spec_right = np.asfortranarray(spec[1])
-
-    wave_left = librosa.istft(spec_left, hop_length=hl)
-    wave_right = librosa.istft(spec_right, hop_length=hl)
-    wave = np.asfortranarray([wave_left, wave_right])
+    return batch_istft(spec[:2], hl)
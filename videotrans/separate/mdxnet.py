@@ -1,10 +1,11 @@
 import os
+import threading
 
-import librosa
 import numpy as np
 import soundfile as sf
 import torch
 
+from videotrans.util import audioio
 from videotrans.util.tools import runffmpeg
 
 # from tqdm import tqdm
@@ -86,135 +87,166 @@ def get_models(device, dim_f, dim_t, n_fft):
     )
 
 
+# 已创建的 onnxruntime 会话，键为 (模型路径, providers)，进程内复用
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+DEFAULT_PROVIDERS = (
+    "CUDAExecutionProvider",
+    "DmlExecutionProvider",
+    "CPUExecutionProvider",
+)
+
+
+def get_session(model_path, providers=DEFAULT_PROVIDERS):
+    """
+    取得缓存的 InferenceSession，不存在时创建
+    仅使用当前可用的 providers，算子内线程数为 CPU 核数，算子间串行执行
+    """
+    import onnxruntime as ort
+
+    key = (os.path.abspath(model_path), tuple(providers))
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            available = ort.get_available_providers()
+            opts = ort.SessionOptions()
+            opts.intra_op_num_threads = max(1, os.cpu_count() or 1)
+            opts.inter_op_num_threads = 1
+            opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+            opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            session = ort.InferenceSession(
+                model_path,
+                sess_options=opts,
+                providers=[p for p in providers if p in available] or ["CPUExecutionProvider"],
+            )
+            _sessions[key] = session
+        return session
+
+
 class Predictor:
     def __init__(self, args):
-        import onnxruntime as ort
-
         # logger.info(ort.get_available_providers())
         self.args = args
         self.model_ = get_models(
             device=cpu, dim_f=args.dim_f, dim_t=args.dim_t, n_fft=args.n_fft
         )
-        self.model = ort.InferenceSession(
-            os.path.join(args.onnx, self.model_.target_name + ".onnx"),
-            providers=[
-                "CUDAExecutionProvider",
-                "DmlExecutionProvider",
-                "CPUExecutionProvider",
-            ],
-        )
+        self.model = get_session(os.path.join(args.onnx, self.model_.target_name + ".onnx"))
+        # 每次送入 onnx 的窗口数，denoise 时正反两份合并在同一次计算中
+        self.batch_size = max(1, int(getattr(args, "batch_size", 4)))
         # logger.info("ONNX load done")
 
-    def demix(self, mix):
-        samples = mix.shape[-1]
+    def _chunk_params(self, samples):
         margin = self.args.margin
         chunk_size = self.args.chunks * 44100
         assert not margin == 0, "margin cannot be zero!"
         if margin > chunk_size:
             margin = chunk_size
-
-        segmented_mix = {}
-
         if self.args.chunks == 0 or samples < chunk_size:
             chunk_size = samples
+        return chunk_size, margin
 
-        counter = -1
+    def segments(self, samples):
+        """
+        按 chunks 秒分段，生成 (start, end, 输出开头裁掉的长度, 输出结尾裁掉的长度)
+        start/end 为含前后 margin 的采样位置
+        """
+        chunk_size, margin = self._chunk_params(samples)
         for skip in range(0, samples, chunk_size):
-            counter += 1
-
-            s_margin = 0 if counter == 0 else margin
+            start = skip - (0 if skip == 0 else margin)
             end = min(skip + chunk_size + margin, samples)
-
-            start = skip - s_margin
-
-            segmented_mix[skip] = mix[:, start:end].copy()
-            if end == samples:
+            last = end == samples
+            yield start, end, 0 if skip == 0 else margin, 0 if last else margin
+            if last:
                 break
 
-        sources = self.demix_base(segmented_mix, margin_size=margin)
+    def demix(self, mix):
         """
         mix:(2,big_sample)
-        segmented_mix:offset->(2,small_sample)
         sources:(1,2,big_sample)
         """
-        return sources
-
-    def demix_base(self, mixes, margin_size):
-        chunked_sources = []
-        # progress_bar = tqdm(total=len(mixes))
-        # progress_bar.set_description("Processing")
-        for mix in mixes:
-            cmix = mixes[mix]
-            sources = []
-            n_sample = cmix.shape[1]
-            model = self.model_
-            trim = model.n_fft // 2
-            gen_size = model.chunk_size - 2 * trim
-            pad = gen_size - n_sample % gen_size
-            mix_p = np.concatenate(
-                (np.zeros((2, trim)), cmix, np.zeros((2, pad)), np.zeros((2, trim))), 1
-            )
-            mix_waves = []
-            i = 0
-            while i < n_sample + pad:
-                waves = np.array(mix_p[:, i: i + model.chunk_size])
-                mix_waves.append(waves)
-                i += gen_size
-            mix_waves = torch.tensor(mix_waves, dtype=torch.float32).to(cpu)
-            with torch.no_grad():
-                _ort = self.model
-                spek = model.stft(mix_waves)
-                if self.args.denoise:
-                    spec_pred = (
-                            -_ort.run(None, {"input": -spek.cpu().numpy()})[0] * 0.5
-                            + _ort.run(None, {"input": spek.cpu().numpy()})[0] * 0.5
-                    )
-                    tar_waves = model.istft(torch.tensor(spec_pred))
-                else:
-                    tar_waves = model.istft(
-                        torch.tensor(_ort.run(None, {"input": spek.cpu().numpy()})[0])
-                    )
-                tar_signal = (
-                    tar_waves[:, :, trim:-trim]
-                        .transpose(0, 1)
-                        .reshape(2, -1)
-                        .numpy()[:, :-pad]
-                )
+        samples = mix.shape[-1]
+        sources = [
+            self.demix_segment(mix[:, start:end], head, tail)
+            for start, end, head, tail in self.segments(samples)
+        ]
+        return np.concatenate(sources, axis=-1)[None]
 
-                start = 0 if mix == 0 else margin_size
-                end = None if mix == list(mixes.keys())[::-1][0] else -margin_size
-                if margin_size == 0:
-                    end = None
-                sources.append(tar_signal[:, start:end])
+    def demix_file(self, path):
+        """
+        逐段读取文件并分离，生成 (原音频片段, 分离结果片段)，均为 (2, n) 且已去除 margin
+        内存占用只与 chunks 有关，与文件长度无关
+        """
+        total_ms = audioio.duration_ms(path)
+        samples = int(total_ms * 44.1)
+        for start, end, head, tail in self.segments(samples):
+            # 按毫秒读取时起点向前取整，多读的采样丢弃，保证与 start 对齐
+            start_ms = start * 1000 // 44100
+            end_ms = None if end >= samples else -(-end * 1000 // 44100)
+            mix, _ = audioio.read(path, start_ms, end_ms, sr=44100)
+            mix = mix[start - int(start_ms * 44100 / 1000):]
+            if end_ms is not None:
+                mix = mix[:end - start]
+            mix = mix.T
+            if mix.shape[0] == 1:
+                mix = np.concatenate([mix, mix])
+            mix = np.ascontiguousarray(mix[:2])
+            source = self.demix_segment(mix, head, tail)
+            yield mix[:, head:mix.shape[1] - tail], source
 
-                # progress_bar.update(1)
+    def _run(self, spek):
+        _ort = self.model
+        if self.args.denoise:
+            n = spek.shape[0]
+            pred = _ort.run(None, {"input": np.concatenate([-spek, spek])})[0]
+            return -pred[:n] * 0.5 + pred[n:] * 0.5
+        return _ort.run(None, {"input": spek})[0]
 
-            chunked_sources.append(sources)
-        _sources = np.concatenate(chunked_sources, axis=-1)
-        # del self.model
-        # progress_bar.close()
-        return _sources
+    def demix_segment(self, cmix, head=0, tail=0):
+        model = self.model_
+        n_sample = cmix.shape[1]
+        trim = model.n_fft // 2
+        gen_size = model.chunk_size - 2 * trim
+        pad = gen_size - n_sample % gen_size
+        mix_p = np.concatenate(
+            (np.zeros((2, trim), dtype=np.float32), cmix.astype(np.float32, copy=False),
+             np.zeros((2, pad + trim), dtype=np.float32)), 1
+        )
+        starts = list(range(0, n_sample + pad, gen_size))
+        # 以 batch_size 个窗口为一批，np.stack 直接得到连续数组
+        batch = max(1, self.batch_size // 2 if self.args.denoise else self.batch_size)
+        tar_waves = []
+        with torch.no_grad():
+            for b in range(0, len(starts), batch):
+                mix_waves = torch.from_numpy(
+                    np.stack([mix_p[:, i: i + model.chunk_size] for i in starts[b:b + batch]])
+                ).to(cpu)
+                spek = model.stft(mix_waves).cpu().numpy()
+                tar_waves.append(model.istft(torch.from_numpy(self._run(spek)).to(cpu)).cpu())
+            tar_waves = torch.cat(tar_waves)
+        tar_signal = (
+            tar_waves[:, :, trim:-trim]
+                .transpose(0, 1)
+                .reshape(2, -1)
+                .numpy()[:, :-pad]
+        )
+        return tar_signal[:, head:tar_signal.shape[1] - tail]
 
     def prediction(self, m, vocal_root, others_root, format):
         os.makedirs(vocal_root, exist_ok=True)
         os.makedirs(others_root, exist_ok=True)
         basename = os.path.basename(m)
-        mix, rate = librosa.load(m, mono=False, sr=44100)
-        if mix.ndim == 1:
-            mix = np.asfortranarray([mix, mix])
-        mix = mix.T
-        sources = self.demix(mix.T)
-        opt = sources[0].T
-        if format in ["wav", "flac"]:
-            sf.write(
-                "%s/%s_main_vocal.%s" % (vocal_root, basename, format), mix - opt, rate
-            )
-            sf.write("%s/%s_others.%s" % (others_root, basename, format), opt, rate)
-        else:
-            path_vocal = "%s/%s_main_vocal.wav" % (vocal_root, basename)
-            path_other = "%s/%s_others.wav" % (others_root, basename)
-            sf.write(path_vocal, mix - opt, rate)
-            sf.write(path_other, opt, rate)
+        rate = 44100
+        ext = format if format in ["wav", "flac"] else "wav"
+        path_vocal = "%s/%s_main_vocal.%s" % (vocal_root, basename, ext)
+        path_other = "%s/%s_others.%s" % (others_root, basename, ext)
+        # 逐段写入，不在内存中保留整个文件
+        with sf.SoundFile(path_vocal, "w", samplerate=rate, channels=2) as f_vocal, \
+                sf.SoundFile(path_other, "w", samplerate=rate, channels=2) as f_other:
+            for mix, opt in self.demix_file(m):
+                f_vocal.write((mix - opt).T)
+                f_other.write(opt.T)
+        if format not in ["wav", "flac"]:
             opt_path_vocal = path_vocal[:-4] + ".%s" % format
             opt_path_other = path_other[:-4] + ".%s" % format
             if os.path.exists(path_vocal):
@@ -1,56 +1,60 @@
 import hashlib
-import os
-import traceback
+import math
 from pathlib import Path
 
-import librosa
+import numpy as np
 import soundfile as sf
 import torch
-from pydub import AudioSegment
 
 from videotrans.configure import config
-
+from videotrans.configure._models import ModelCache
+from videotrans.util import audioio
 from videotrans.separate.vr import AudioPre
 
 
-def uvr(*, model_name=None, save_root=None, inp_path=None, source="logs", uuid=None, percent=[0, 1]):
-    infos = []
-    try:
-        func = AudioPre
-        pre_fun = func(
-            agg=10,
-            model_path=config.ROOT_DIR + f"/uvr5_weights/{model_name}.pth",
-            device="cuda" if torch.cuda.is_available() else "cpu",
-            is_half=False,
-            source=source
-        )
-        done = 0
-        try:
-            y, sr = librosa.load(inp_path, sr=None)
-            info = sf.info(inp_path)
-            channels = info.channels
-            need_reformat = 0
-            pre_fun._path_audio_(
-                inp_path,
-                ins_root=save_root,
-                uuid=uuid,
-                percent=percent
-            )
-            done = 1
-        except  Exception:
-            traceback.print_exc()
-    except:
-        infos.append(traceback.format_exc())
-        yield "\n".join(infos)
-    finally:
-        try:
-            del pre_fun.model
-            del pre_fun
-        except Exception:
-            traceback.print_exc()
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
-    yield "\n".join(infos)
+# 相邻分段重叠的毫秒数
+OVERLAP_MS = 2000
+
+# 分离模型进程内常驻，各任务复用，空闲超过 uvr_model_idle 秒后卸载
+uvr_models = ModelCache('uvr_model_idle', 'uvr')
+
+
+def _device():
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _load_model(model_name, source="logs"):
+    return AudioPre(
+        agg=10,
+        model_path=config.ROOT_DIR + f"/uvr5_weights/{model_name}.pth",
+        device=_device(),
+        is_half=False,
+        source=source
+    )
+
+
+class _OverlapWriter:
+    """
+    分段追加写入，相邻分段有重叠，重叠部分线性交叉淡化后写入，避免分段边界处的爆音
+    内存中只保留上一段末尾的重叠部分
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.tail = None
+
+    # keep: 本段末尾作为重叠保留到下一段的帧数
+    def write(self, data, keep=0):
+        if self.tail is not None and len(self.tail):
+            n = min(len(self.tail), len(data))
+            fade = np.linspace(0, 1, n, dtype=np.float32)[:, None]
+            self.f.write(self.tail[:n] * (1 - fade) + data[:n] * fade)
+            if n < len(self.tail):
+                self.f.write(self.tail[n:])
+            data = data[n:]
+        keep = min(keep, len(data))
+        self.f.write(data[:len(data) - keep])
+        self.tail = data[len(data) - keep:] if keep else None
 
 
 def convert_to_pure_eng_num(string):
@@ -61,76 +65,47 @@ def convert_to_pure_eng_num(string):
     return hex_digest
 
 
-def split_audio(file_path):
-    audio = AudioSegment.from_wav(file_path)
+# path 是需要保存vocal.wav的目录
+# 按 bgm_split_time 秒逐段读入内存分离，相邻分段重叠并交叉淡化，结果追加写入 instrument.wav 和 vocal.wav，不再写出分段文件
+def start(audio, path, source="logs", uuid=None, model_name="HP2"):
+    Path(path).mkdir(parents=True, exist_ok=True)
     segment_length = 300
     try:
         segment_length = int(config.settings['bgm_split_time'])
     except Exception:
         pass
-    output_folder = Path(config.TEMP_DIR) / "separate"
-    output_folder.mkdir(parents=True, exist_ok=True)
-    output_folder = output_folder.as_posix()
-
-    total_length = len(audio)  # Total length in milliseconds
-    segment_length_ms = segment_length * 1000  # Convert segment length to milliseconds
-    segments = []
-
-    for i in range(0, total_length, segment_length_ms):
-        start = i
-        end = min(i + segment_length_ms, total_length)
-        segment = audio[start:end]
-        segment_filename = os.path.join(output_folder, f"segment_{i // 1000}.wav")
-        # 如果音频不是2通道，16kHz，则进行转换
-        if segment.channels != 2:
-            segment = segment.set_channels(2)
-        if segment.frame_rate != 44100:
-            segment = segment.set_frame_rate(44100)
-        segment.export(segment_filename, format="wav")
-        segments.append(segment_filename)
-
-    return segments
-
-
-def concatenate_audio(input_wav_list, out_wav):
-    combined = AudioSegment.empty()
-    for wav_file in input_wav_list:
-        audio = AudioSegment.from_wav(wav_file)
-        if audio.channels != 2:
-            audio = audio.set_channels(2)
-        if audio.frame_rate != 44100:
-            audio = audio.set_frame_rate(44100)
-        combined += audio
-
-    combined.export(out_wav, format="wav")
-
-
-# path 是需要保存vocal.wav的目录
-def start(audio, path, source="logs", uuid=None):
-    Path(path).mkdir(parents=True, exist_ok=True)
-    reslist = split_audio(audio)
-    vocal_list = []
-    instr_list = []
-    grouplen = len(reslist)
-    per = round(1 / grouplen, 2)
-    for i, audio_seg in enumerate(reslist):
-        if config.exit_soft or (uuid in config.stoped_uuid_set):
-            return
-        audio_path = Path(audio_seg)
-        path_dir = audio_path.parent / audio_path.stem
-        path_dir.mkdir(parents=True, exist_ok=True)
-        try:
-            gr = uvr(model_name="HP2", save_root=path_dir.as_posix(), inp_path=Path(audio_seg).as_posix(),
-                     source=source, uuid=uuid, percent=[i * per, per])
-            print(next(gr))
-            print(next(gr))
-        except StopIteration:
-            vocal_list.append((path_dir / 'vocal.wav').as_posix())
-            instr_list.append((path_dir / 'instrument.wav').as_posix())
-        except Exception as e:
-            raise
-
-    if len(vocal_list) < 1 or len(instr_list) < 1:
+    segment_length_ms = max(segment_length, 1) * 1000
+    total_length = audioio.duration_ms(audio)
+    if total_length <= 0:
         raise Exception('separate bgm error')
-    concatenate_audio(instr_list, Path(f"{path}/instrument.wav").as_posix())
-    concatenate_audio(vocal_list, Path(f"{path}/vocal.wav").as_posix())
+    grouplen = math.ceil(total_length / segment_length_ms)
+    per = 1 / grouplen
+    instrument_file = Path(f"{path}/instrument.wav").as_posix()
+    vocal_file = Path(f"{path}/vocal.wav").as_posix()
+    done = False
+    try:
+        with uvr_models.get((model_name, _device()), lambda: _load_model(model_name, source)) as pre_fun:
+            sr = pre_fun.mp.param["sr"]
+            with sf.SoundFile(instrument_file, 'w', samplerate=sr, channels=2, subtype='PCM_16') as f_ins, \
+                    sf.SoundFile(vocal_file, 'w', samplerate=sr, channels=2, subtype='PCM_16') as f_vocal:
+                w_ins, w_vocal = _OverlapWriter(f_ins), _OverlapWriter(f_vocal)
+                for i, start_ms in enumerate(range(0, total_length, segment_length_ms)):
+                    if config.exit_soft or (uuid in config.stoped_uuid_set):
+                        return
+                    # 每段向后多读 OVERLAP_MS，与下一段开头重叠
+                    end_ms = min(start_ms + segment_length_ms + OVERLAP_MS, total_length)
+                    data, data_sr = audioio.read(audio, start_ms, end_ms, sr=sr)
+                    res = pre_fun.separate(data, data_sr, uuid=uuid, percent=[i * per, per], source=source)
+                    if res is None:
+                        return
+                    # 分离结果长度与输入对齐，保证重叠部分逐帧对应
+                    keep = max(0, len(data) - int(segment_length_ms * sr / 1000))
+                    for w, wav in zip((w_ins, w_vocal), res):
+                        if len(wav) < len(data):
+                            wav = np.pad(wav, ((0, len(data) - len(wav)), (0, 0)))
+                        w.write(wav[:len(data)], keep)
+        done = True
+    finally:
+        if not done:
+            Path(instrument_file).unlink(missing_ok=True)
+            Path(vocal_file).unlink(missing_ok=True)
@@ -27,10 +27,14 @@ def make_padding(width, cropsize, offset):
     return left, right, roi_size
 
 
-def inference(X_spec, device, model, aggressiveness, data, source="logs", uuid=None, percent=[0, 1]):
+def inference(X_spec, device, model, aggressiveness, data, source="logs", uuid=None, percent=[0, 1], batch_size=None):
     """
     data : dic configs
+    batch_size : 每次前向计算的窗口数，None 时使用 uvr_batch 设置
     """
+    if batch_size is None:
+        batch_size = int(float(config.settings.get('uvr_batch', 4)))
+    batch_size = max(1, batch_size)
 
     def _execute(
             X_mag_pad, roi_size, n_window, device, model, aggressiveness, is_half=True, source="logs"
@@ -38,21 +42,19 @@ def inference(X_spec, device, model, aggressiveness, data, source="logs", uuid=N
         model.eval()
         with torch.no_grad():
             preds = []
-
-            iterations = [n_window]
-
-            total_iterations = sum(iterations)
-            for i in range(n_window):
+            # 多个窗口堆叠为一批，一次前向计算
+            for b in range(0, n_window, batch_size):
                 if config.exit_soft or (uuid in config.stoped_uuid_set):
                     return
-                jd = (percent[0] + (percent[1] * (i + 1) / n_window)) * 100
+                n = min(batch_size, n_window - b)
+                jd = (percent[0] + (percent[1] * (b + n) / n_window)) * 100
                 jd = 100 if jd >= 100 else jd
                 tools.set_process(text=f"{config.transobj['Separating background music']} {round(jd, 1)}%", type=source,
                                   uuid=uuid)
-                start = i * roi_size
-                X_mag_window = X_mag_pad[
-                               None, :, :, start: start + data["window_size"]
-                               ]
+                X_mag_window = np.stack([
+                    X_mag_pad[:, :, (b + i) * roi_size: (b + i) * roi_size + data["window_size"]]
+                    for i in range(n)
+                ])
                 X_mag_window = torch.from_numpy(X_mag_window)
                 if is_half:
                     X_mag_window = X_mag_window.half()
@@ -61,7 +63,7 @@ def inference(X_spec, device, model, aggressiveness, data, source="logs", uuid=N
                 pred = model.predict(X_mag_window, aggressiveness)
 
                 pred = pred.detach().cpu().numpy()
-                preds.append(pred[0])
+                preds.extend(pred)
 
             pred = np.concatenate(preds, axis=2)
         return pred
@@ -90,6 +92,8 @@ def inference(X_spec, device, model, aggressiveness, data, source="logs", uuid=N
     pred = _execute(
         X_mag_pad, roi_size, n_window, device, model, aggressiveness, is_half, source
     )
+    if pred is None:
+        return None
     pred = pred[:, :, :n_frame]
 
     if data["tta"]:
@@ -102,6 +106,8 @@ def inference(X_spec, device, model, aggressiveness, data, source="logs", uuid=N
         pred_tta = _execute(
             X_mag_pad, roi_size, n_window, device, model, aggressiveness, is_half
         )
+        if pred_tta is None:
+            return None
         pred_tta = pred_tta[:, :, roi_size // 2:]
         pred_tta = pred_tta[:, :, :n_frame]
 
@@ -10,6 +10,7 @@ from videotrans.separate.lib_v5 import nets_61968KB as Nets
 from videotrans.separate.lib_v5 import spec_utils
 from videotrans.separate.lib_v5.model_param_init import ModelParameters
 from videotrans.separate.utils import inference
+from videotrans.util import audioio
 
 
 class AudioPre:
@@ -39,18 +40,18 @@ class AudioPre:
         self.mp = mp
         self.model = model
 
-    def _path_audio_(
-            self, music_file, ins_root=None, format="wav", is_hp3=False, uuid=None, percent=[0, 1]
-    ):
-
-        if ins_root is None:
-            return "No save root."
-        name = os.path.splitext(os.path.basename(music_file))[0]
-        if ins_root is not None:
-            os.makedirs(ins_root, exist_ok=True)
-        vocal_root = ins_root
+    def separate(self, wave, sr, uuid=None, percent=[0, 1], source=None):
+        """
+        分离内存中的音频，wave 形状为 (帧数, 声道数) 或一维，sr 为其采样率
+        返回 (背景声, 人声)，均为 (帧数, 2) float32，采样率为 self.mp.param["sr"]，中途停止时返回 None
+        """
+        wave = np.asarray(wave, dtype=np.float32)
+        wave = wave.T if wave.ndim == 2 else np.asarray([wave, wave])
+        if wave.shape[0] == 1:
+            wave = np.concatenate([wave, wave])
+        wave = np.ascontiguousarray(wave[:2])
 
-        X_wave, y_wave, X_spec_s, y_spec_s = {}, {}, {}, {}
+        X_wave, X_spec_s = {}, {}
         bands_n = len(self.mp.param["band"])
         for d in range(bands_n, 0, -1):
             if config.exit_soft:
@@ -58,18 +59,12 @@ class AudioPre:
 
             bp = self.mp.param["band"][d]
             if d == bands_n:  # high-end band
-                (
-                    X_wave[d],
-                    _,
-                ) = librosa.core.load(
-                    music_file,
-                    sr=bp["sr"],
-                    mono=False,
-                    dtype=np.float32,
+                X_wave[d] = wave if sr == bp["sr"] else librosa.core.resample(
+                    wave,
+                    orig_sr=sr,
+                    target_sr=bp["sr"],
                     res_type=bp["res_type"],
                 )
-                if X_wave[d].ndim == 1:
-                    X_wave[d] = np.asfortranarray([X_wave[d], X_wave[d]])
             else:  # lower bands
                 X_wave[d] = librosa.core.resample(
                     X_wave[d + 1],
@@ -86,7 +81,6 @@ class AudioPre:
                 self.mp.param["mid_side_b2"],
                 self.mp.param["reverse"],
             )
-            # pdb.set_trace()
             if d == bands_n and self.data["high_end_process"] != "none":
                 input_high_end_h = (bp["n_fft"] // 2 - bp["crop_stop"]) + (
                         self.mp.param["pre_filter_stop"] - self.mp.param["pre_filter_start"]
@@ -94,19 +88,24 @@ class AudioPre:
                 input_high_end = X_spec_s[d][
                                  :, bp["n_fft"] // 2 - input_high_end_h: bp["n_fft"] // 2, :
                                  ]
+        del X_wave
 
         X_spec_m = spec_utils.combine_spectrograms(X_spec_s, self.mp)
+        del X_spec_s
         aggresive_set = float(self.data["agg"] / 100)
         aggressiveness = {
             "value": aggresive_set,
             "split_bin": self.mp.param["band"][1]["crop_stop"],
         }
         with torch.no_grad():
-            pred, X_mag, X_phase = inference(
-                X_spec_m, self.device, self.model, aggressiveness, self.data, self.source,
+            res = inference(
+                X_spec_m, self.device, self.model, aggressiveness, self.data, source or self.source,
                 uuid=uuid,
                 percent=percent
             )
+        if res is None:
+            return None
+        pred, X_mag, X_phase = res
         # Postprocess
         if self.data["postprocess"]:
             pred_inv = np.clip(X_mag - pred, 0, np.inf)
@@ -114,52 +113,43 @@ class AudioPre:
         y_spec_m = pred * X_phase
         v_spec_m = X_spec_m - y_spec_m
 
-        if ins_root is not None:
+        result = []
+        for spec_m in (y_spec_m, v_spec_m):
             if self.data["high_end_process"].startswith("mirroring"):
                 input_high_end_ = spec_utils.mirroring(
-                    self.data["high_end_process"], y_spec_m, input_high_end, self.mp
+                    self.data["high_end_process"], spec_m, input_high_end, self.mp
                 )
-                wav_instrument = spec_utils.cmb_spectrogram_to_wave(
-                    y_spec_m, self.mp, input_high_end_h, input_high_end_
+                wav = spec_utils.cmb_spectrogram_to_wave(
+                    spec_m, self.mp, input_high_end_h, input_high_end_
                 )
             else:
-                wav_instrument = spec_utils.cmb_spectrogram_to_wave(y_spec_m, self.mp)
-            config.logger.info("%s instruments done" % name)
-            if is_hp3 == True:
-                head = "vocal"
-            else:
-                head = "instrument"
-            if format in ["wav", "flac"]:
-                sf.write(
-                    os.path.join(
-                        ins_root,
-                        head + ".{}".format(format),
-                    ),
-                    (np.array(wav_instrument) * 32768).astype("int16"),
-                    self.mp.param["sr"],
-                )  #
+                wav = spec_utils.cmb_spectrogram_to_wave(spec_m, self.mp)
+            result.append(np.asarray(wav, dtype=np.float32))
+        return result[0], result[1]
 
-        if vocal_root is not None:
-            if is_hp3 == True:
-                head = "instrument"
-            else:
-                head = "vocal"
-            if self.data["high_end_process"].startswith("mirroring"):
-                input_high_end_ = spec_utils.mirroring(
-                    self.data["high_end_process"], v_spec_m, input_high_end, self.mp
-                )
-                wav_vocals = spec_utils.cmb_spectrogram_to_wave(
-                    v_spec_m, self.mp, input_high_end_h, input_high_end_
-                )
-            else:
-                wav_vocals = spec_utils.cmb_spectrogram_to_wave(v_spec_m, self.mp)
-            config.logger.info("%s vocals done" % name)
-            if format in ["wav", "flac"]:
+    def _path_audio_(
+            self, music_file, ins_root=None, format="wav", is_hp3=False, uuid=None, percent=[0, 1]
+    ):
+
+        if ins_root is None:
+            return "No save root."
+        name = os.path.splitext(os.path.basename(music_file))[0]
+        os.makedirs(ins_root, exist_ok=True)
+
+        wave, sr = audioio.read(music_file)
+        res = self.separate(wave, sr, uuid=uuid, percent=percent)
+        if res is None:
+            return
+        wav_instrument, wav_vocals = res
+        config.logger.info("%s instruments and vocals done" % name)
+        if format in ["wav", "flac"]:
+            heads = ("vocal", "instrument") if is_hp3 == True else ("instrument", "vocal")
+            for head, wav in zip(heads, (wav_instrument, wav_vocals)):
                 sf.write(
                     os.path.join(
-                        vocal_root,
+                        ins_root,
                         head + ".{}".format(format),
                     ),
-                    (np.array(wav_vocals) * 32768).astype("int16"),
+                    (wav * 32768).astype("int16"),
                     self.mp.param["sr"],
                 )
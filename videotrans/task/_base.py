@@ -21,6 +21,8 @@ class BaseTask(BaseCon):
         self.shound_del_name=None
         if "uuid" in self.cfg and self.cfg['uuid']:
             self.uuid = self.cfg['uuid']
+        # 排队优先级，数字越小越优先执行
+        self.priority = int(self.cfg.get('priority') or 0)
 
         # 进度
         self.precent = 1
@@ -75,6 +77,10 @@ class BaseTask(BaseCon):
     def task_done(self):
         pass
 
+    # 任务已被停止，阶段线程跳过时调用，释放仍在占用的资源
+    def stopped(self):
+        pass
+
     # 字幕是否存在并且有效
     def _srt_vail(self, file):
         if not file:
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+from videotrans.configure import config
+from videotrans.util import tools
+
+# 阶段顺序，某阶段重新保存后，其后阶段的记录全部失效
+STAGES = ['prepare', 'novoice', 'recogn', 'trans', 'dubbing', 'align']
+
+
+# 产物哈希，小文件全部读取，大于 16MB 时取大小和首尾各 4MB，避免对整段视频求哈希
+def file_hash(file):
+    size = os.path.getsize(file)
+    md5 = hashlib.md5(str(size).encode('utf-8'))
+    with open(file, 'rb') as f:
+        if size <= 16 * 1024 * 1024:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                md5.update(chunk)
+        else:
+            md5.update(f.read(4 * 1024 * 1024))
+            f.seek(-4 * 1024 * 1024, os.SEEK_END)
+            md5.update(f.read())
+    return md5.hexdigest()
+
+
+# 删除超过 task_resume_days 天未更新的断点记录
+def prune_manifests():
+    days = float(config.settings.get('task_resume_days', 7))
+    root = Path(config.CACHE_DIR) / 'tasks'
+    if days <= 0 or not root.is_dir():
+        return
+    expire = time.time() - days * 86400
+    for d in root.iterdir():
+        try:
+            if d.is_dir() and d.stat().st_mtime < expire:
+                shutil.rmtree(d, ignore_errors=True)
+        except Exception:
+            pass
+
+
+class TaskManifest:
+    """
+    视频翻译任务的断点记录，位于 CACHE_DIR/tasks/<输入文件路径、大小、修改时间和输出目录的md5>/
+    manifest.json 记录各已完成阶段的参数指纹和产物哈希，产物复制保存在同目录下，退出软件时不删除
+    重新开始同一输入且参数一致时，仍有效的阶段直接恢复产物并跳过，任务成功完成后删除
+    阶段指纹包含上一阶段指纹和输入文件哈希，上游阶段变化或字幕被修改后，其后阶段自动失效
+    """
+
+    def __init__(self, name, target_dir):
+        st = Path(name).stat()
+        self.id = tools.get_md5(f'{Path(name).as_posix()}-{st.st_size}-{st.st_mtime}-{target_dir}')
+        self.dir = Path(config.CACHE_DIR) / 'tasks' / self.id
+        self.file = self.dir / 'manifest.json'
+        # stage -> {"key":指纹, "files":{名称:{"file":保存的文件名,"hash":哈希}}, "meta":{}}
+        self.stages = {}
+        # 最近一个已恢复或已保存阶段的指纹
+        self.chain = ''
+        if self.file.is_file():
+            try:
+                self.stages = json.loads(self.file.read_text(encoding='utf-8')).get('stages', {})
+            except Exception as e:
+                config.logger.exception(e, exc_info=True)
+
+    @staticmethod
+    def enabled():
+        return bool(config.settings.get('task_resume', True))
+
+    # 阶段指纹，inputs 为可能被用户修改的输入文件，例如编辑后的字幕
+    def key(self, stage, params, inputs=(), chain=True):
+        hashes = [file_hash(f) if tools.vail_file(f) else '' for f in inputs]
+        return tools.get_md5(json.dumps([self.chain if chain else '', stage, params, hashes], sort_keys=True, ensure_ascii=False, default=str))
+
+    # 指纹一致且产物完好时复制回 files 中的目标路径，返回 meta，否则返回 None
+    # files: {名称: 目标路径}，为 None 时恢复该阶段保存的全部产物，目标路径由 dest(名称, 保存的文件名) 给出
+    def restore(self, stage, key, files=None, dest=None, chain=True):
+        rec = self.stages.get(stage)
+        if not rec or rec.get('key') != key:
+            return None
+        if files is None:
+            files = {name: dest(name, info['file']) for name, info in rec['files'].items()}
+        try:
+            for name, target in files.items():
+                info = rec['files'].get(name)
+                if not info:
+                    return None
+                src = self.dir / info['file']
+                if not src.is_file() or file_hash(src) != info['hash']:
+                    config.logger.info(f'断点记录 {stage} 产物 {name} 已失效')
+                    return None
+            for name, target in files.items():
+                Path(target).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(self.dir / rec['files'][name]['file'], target)
+        except Exception as e:
+            config.logger.exception(e, exc_info=True)
+            return None
+        if chain:
+            self.chain = key
+        config.logger.info(f'从断点记录恢复阶段 {stage}')
+        return rec.get('meta') or {}
+
+    # 阶段成功后复制产物并记录，files: {名称: 文件路径}
+    def save(self, stage, key, files, meta=None, chain=True):
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            # 之后的阶段依赖本阶段，全部失效，不参与指纹链的阶段仅替换自身
+            later = [s for s in STAGES[STAGES.index(stage):] if s != 'novoice'] if chain else []
+            for s in set([stage] + later):
+                old = self.stages.pop(s, None)
+                if old:
+                    for info in old['files'].values():
+                        (self.dir / info['file']).unlink(missing_ok=True)
+            rec = {"key": key, "files": {}, "meta": meta or {}}
+            for name, file in files.items():
+                if not tools.vail_file(file):
+                    continue
+                saved = f'{stage}-{name}{Path(file).suffix}'
+                shutil.copy2(file, self.dir / saved)
+                rec['files'][name] = {"file": saved, "hash": file_hash(self.dir / saved)}
+            self.stages[stage] = rec
+            tmp = self.file.with_suffix('.tmp')
+            tmp.write_text(json.dumps({"stages": self.stages}, ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp, self.file)
+        except Exception as e:
+            config.logger.exception(e, exc_info=True)
+            return
+        if chain:
+            self.chain = key
+
+    def clear(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
@@ -1,13 +1,14 @@
 import os
 import shutil
 import time
+import wave
 from pathlib import Path
 
 from pydub import AudioSegment
 from pydub.exceptions import CouldntDecodeError
 
 from videotrans.configure import config
-from videotrans.util import tools
+from videotrans.util import tools, mediainfo
 import concurrent.futures
 
 
@@ -20,16 +21,17 @@ import concurrent.futures
 
 def process_audio(item):
     """处理单个音频文件"""
+    input_file_path=item['filename']
     try:
         from pydub import AudioSegment
         from pydub.silence import detect_nonsilent
-        input_file_path=item['filename']
         target_duration_ms=item["target_duration_ms"]
         
         if not Path(input_file_path).exists():
             return input_file_path,target_duration_ms,""
         
         format = input_file_path.split('.')[-1].lower()
+        format = "mp4" if format == 'm4a' else format
         audio = AudioSegment.from_file(input_file_path,format=format)
         
         current_duration_ms=len(audio)
@@ -51,11 +53,9 @@ def process_audio(item):
 
             # Remove the silence from the end by slicing the audio segment
             trimmed_audio = audio[:end_index]
-            if is_start and nonsilent_chunks[0] and nonsilent_chunks[0][0] > 0:
-                trimmed_audio = audio[nonsilent_chunks[0][0]:end_index]
             current_duration_ms=len(trimmed_audio)
             if current_duration_ms <= target_duration_ms:
-                audio.export(input_file_path, format=format)
+                trimmed_audio.export(input_file_path, format=format)
                 return input_file_path,current_duration_ms,""
             audio=trimmed_audio
             
@@ -118,6 +118,41 @@ def process_video(item,codenum,crf,preset,video_hard,stop_file=None):
         return False,str(e),0,item.get('idx',-1)
 
 
+class _TimelineWriter:
+    """
+    按时间轴顺序写入 16bit PCM 到 wav 文件，位置以毫秒计，换算为采样帧
+    片段只追加写入，内存占用与总时长无关
+    """
+
+    def __init__(self, wavfile, frame_rate, channels):
+        self.frame_rate = frame_rate
+        self.channels = channels
+        self.frames = 0
+        self._wav = wave.open(wavfile, 'wb')
+        self._wav.setnchannels(channels)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(frame_rate)
+
+    # 填充静音直到 ms 位置，已超过时不处理
+    def pad_to(self, ms):
+        nframes = int(round(ms * self.frame_rate / 1000)) - self.frames
+        # 每次最多写入 10s 静音，避免一次分配过大内存
+        step = self.frame_rate * 10
+        while nframes > 0:
+            n = min(nframes, step)
+            self._wav.writeframes(b'\x00' * (n * self.channels * 2))
+            self.frames += n
+            nframes -= n
+
+    def write(self, segment):
+        segment = segment.set_frame_rate(self.frame_rate).set_channels(self.channels).set_sample_width(2)
+        self._wav.writeframes(segment.raw_data)
+        self.frames += int(segment.frame_count())
+
+    def close(self):
+        self._wav.close()
+
+
 class SpeedRate:
 
     def __init__(self,
@@ -168,7 +203,11 @@ class SpeedRate:
     # 1. 将每个配音的实际长度加入 dubb_time
     def _add_dubb_time(self):
         length = len(self.queue_tts)
-        # 最后一次
+        # 批量获取全部配音时长，wav/mp3 读取文件头，其余并发 ffprobe
+        files = [it['filename'] if it and tools.vail_file(it['filename']) else None for it in self.queue_tts]
+        durations = mediainfo.batch_duration_ms([f for f in files if f])
+        durations = iter(durations)
+        dubb_times = [next(durations) if f else None for f in files]
 
         for i, it in enumerate(self.queue_tts):
             if it is None:
@@ -195,12 +234,11 @@ class SpeedRate:
             it['video_extend'] = -1
 
             # 记录实际配音后，未经任何处理的真实配音时长
-            if tools.vail_file(it['filename']):
-                the_ext = it['filename'].split('.')[-1]
-                try:
-                    it['dubb_time'] = len(AudioSegment.from_file(it['filename'], format="mp4" if the_ext == 'm4a' else the_ext))
-                except CouldntDecodeError:
-                    config.logger.exception(f'添加配音时长失败')
+            if files[i]:
+                if dubb_times[i] is not None:
+                    it['dubb_time'] = dubb_times[i]
+                else:
+                    config.logger.error(f'添加配音时长失败')
                     it['dubb_time'] = 0
                     it['video_extend'] = 0
             else:
@@ -325,41 +363,46 @@ class SpeedRate:
         total_files = len(should_speed)
         if total_files<1:
             return
-        results = []
-        """
-        with concurrent.futures.ProcessPoolExecutor(max_workers=min(2,total_files)  ) as executor:
-            futures = [executor.submit(process_audio, item.copy()) for item in should_speed]
-            for i, future in enumerate(concurrent.futures.as_completed(futures)):
-                if config.exit_soft:
-                    return
-                filename, success, error_message = future.result()
-                progress = (i + 1) / total_files * 100
-                tools.set_process(text=f"{config.transobj['dubbing speed up']}  {i + 1}/{total_files}",uuid=self.uuid)
-                print(f"进度: {progress:.2f}%, 状态: {'成功' if success else '失败'}")
-                if success is False or success is None:
-                    print(f"错误信息: {error_message}")
-                else:
-                    results.append({filename:success})
-        """
-        # 3.22 修改
-        for i,item in enumerate(should_speed):
-            if config.exit_soft:
-                return
-            filename, success, error_message=process_audio(item.copy())
+        # 文件名 -> 加速后的真实时长
+        results = {}
+
+        def _done(i, filename, success, error_message):
             progress = (i + 1) / total_files * 100
             tools.set_process(text=f"{config.transobj['dubbing speed up']}  {i + 1}/{total_files}",uuid=self.uuid)
             print(f"进度: {progress:.2f}%, 状态: {'成功' if success else '失败'}")
             if success is False or success is None:
                 print(f"错误信息: {error_message}")
             else:
-                results.append({filename:success})
+                results[filename]=success
+
+        worker_nums = min(total_files, os.cpu_count() or 1)
+        if worker_nums < 2:
+            for i,item in enumerate(should_speed):
+                if self._is_stop():
+                    return
+                _done(i, *process_audio(item.copy()))
+        else:
+            # 多进程并发变速，每个文件独立处理，结果按文件名回写，与完成顺序无关
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=worker_nums)
+            try:
+                futures = [executor.submit(process_audio, item.copy()) for item in should_speed]
+                for i, future in enumerate(concurrent.futures.as_completed(futures)):
+                    if self._is_stop():
+                        return
+                    _done(i, *future.result())
+            finally:
+                executor.shutdown(wait=not self._is_stop(), cancel_futures=True)
         for i, it in enumerate(self.queue_tts):
             # 获取实际加速完毕后的真实配音时长，因为精确度原因，未必和上述计算出的一致
             # 如果视频需要变化，更新视频时长需要变化的长度
-            if tools.vail_file(it['filename']) and it['filename'] in results:
-                it['dubb_time'] = int(results.get(it['filename']))
+            if it['filename'] in results and tools.vail_file(it['filename']):
+                it['dubb_time'] = int(results[it['filename']])
             self.queue_tts[i] = it
 
+    # 软件退出或当前任务已停止
+    def _is_stop(self):
+        return config.exit_soft or (self.uuid is not None and self.uuid in config.stoped_uuid_set)
+
 
     # 视频慢速 在配音加速调整后，根据字幕实际开始结束时间，裁剪视频，慢速播放实现对齐
     def _ajust_video(self):
@@ -491,26 +534,37 @@ class SpeedRate:
                    self.queue_tts[idx]['video_extend']=extend_time
                    print(f'视频延长了 {extend_time} 毫秒')
         """
+        onepass = False
+        if config.settings.get('videoslow_onepass', True):
+            try:
+                onepass = self._ajust_video_onepass(should_speed)
+            except Exception as e:
+                config.logger.exception(f'单次编码视频慢速失败，改为逐片段处理:{e}', exc_info=True)
         # 0322 修改
-        for i,item in enumerate(should_speed):
-            if config.exit_soft or config.current_status!='ing':
-                return
-            success,error,extend_time,idx=process_video(
-                item.copy(),
-                config.settings.get('video_codec',264),
-                config.settings.get('crf',10),
-                config.settings.get('preset','fast'),
-                config.settings.get('videoslow_hard',False),
-                stop_file=config.TEMP_DIR+'/stop_porcess.txt'
-            )
-            print(f"sp进度: {i+1}/{total_files}, 状态: {'成功' if success else '失败'}")
-            tools.set_process(text=f"{config.transobj['videodown..']} {i+1}/{total_files}", uuid=self.uuid)
-            if success is False or success is None:
-                config.logger.error(f'[错误信息] {error}')
-                print(f"错误信息 {error}")
-            elif extend_time>0 and idx>-1:
-               self.queue_tts[idx]['video_extend']=extend_time
-               print(f'视频延长了 {extend_time} 毫秒')
+        if not onepass:
+            extends = {}
+            for i,item in enumerate(should_speed):
+                if config.exit_soft or config.current_status!='ing':
+                    return
+                success,error,extend_time,idx=process_video(
+                    item.copy(),
+                    config.settings.get('video_codec',264),
+                    config.settings.get('crf',10),
+                    config.settings.get('preset','fast'),
+                    config.settings.get('videoslow_hard',False),
+                    stop_file=config.TEMP_DIR+'/stop_porcess.txt'
+                )
+                print(f"sp进度: {i+1}/{total_files}, 状态: {'成功' if success else '失败'}")
+                tools.set_process(text=f"{config.transobj['videodown..']} {i+1}/{total_files}", uuid=self.uuid)
+                if success is False or success is None:
+                    config.logger.error(f'[错误信息] {error}')
+                    print(f"错误信息 {error}")
+                elif extend_time>0 and idx>-1:
+                   extends[idx]=extend_time
+                   print(f'视频延长了 {extend_time} 毫秒')
+            # 未实际延长的字幕 video_extend 归零
+            for i, it in enumerate(self.queue_tts):
+                it['video_extend'] = extends.get(i, 0)
         
         # 需要调整 原字幕时长，延长视频相当于延长了原字幕时长
         offset = 0
@@ -521,6 +575,8 @@ class SpeedRate:
                 it['end_time_source'] += it['video_extend']
                 offset += it['video_extend']
             self.queue_tts[i] = it
+        if onepass:
+            return
 
         # 将所有视频片段连接起来
         new_arr = []
@@ -537,9 +593,66 @@ class SpeedRate:
             tools.concat_multi_mp4(out=self.novoice_mp4, concat_txt=concat_txt)
 
 
+    # 按切片计划构建 trim+setpts+concat 滤镜图，仅解码和编码一次，不产生中间片段文件
+    # 成功返回 True，并写入各字幕的 video_extend
+    def _ajust_video_onepass(self, should_speed):
+        filters = []
+        labels = []
+        extends = {}
+        for k, item in enumerate(should_speed):
+            start = tools.get_ms_from_hmsm(item['ss'])
+            end = tools.get_ms_from_hmsm(item['to']) if item['to'] else 0
+            if item['to'] and end <= start:
+                continue
+            trim = f'trim=start={start / 1000:.3f}' + (f':end={end / 1000:.3f}' if item['to'] else '')
+            setpts = 'PTS-STARTPTS'
+            if item['pts'] > 0 and end > start:
+                duration = end - start
+                # 同逐片段处理的 process_video，多放慢 0.1 倍留出余量
+                rate = round(0.1 + item['pts'] / duration, 2)
+                if rate > 1:
+                    setpts = f'{rate}*(PTS-STARTPTS)'
+                    extends[item.get('idx', -1)] = int(duration * rate) - duration
+            filters.append(f'[0:v]{trim},setpts={setpts}[v{k}]')
+            labels.append(f'[v{k}]')
+        if len(labels) < 1:
+            return False
+        filters.append(f'{"".join(labels)}concat=n={len(labels)}:v=1:a=0[outv]')
+        # 字幕较多时滤镜图很长，写入文件避免超出命令行长度限制
+        filter_file = self.cache_folder + '/videoslow_filter.txt'
+        with open(filter_file, 'w', encoding='utf-8') as f:
+            f.write(';\n'.join(filters))
+        tools.set_process(text=f"{config.transobj['videodown..']}", uuid=self.uuid)
+        out = self.cache_folder + '/videoslow_onepass.mp4'
+        tools.runffmpeg([
+            '-y',
+            '-i', self.novoice_mp4,
+            *tools.filter_complex_file_args(filter_file),
+            '-map', '[outv]',
+            '-an',
+            '-c:v', f"libx{config.settings.get('video_codec',264)}",
+            '-crf', f"{config.settings.get('crf',10)}",
+            '-preset', config.settings.get('preset','fast'),
+            out
+        ], force_cpu=not config.settings.get('videoslow_hard',False))
+        shutil.copy2(out, self.novoice_mp4)
+        # 未实际延长的字幕 video_extend 归零，否则后续字幕会按未添加到视频中的时长偏移
+        for i, it in enumerate(self.queue_tts):
+            it['video_extend'] = extends.get(i, 0)
+        return True
+
+    # 合并后的采样率和声道数，取所有配音文件中的最大值，避免较高采样率或双声道的配音被降低，均不可用时为 44100Hz 单声道
+    def _timeline_format(self):
+        files = [it['filename'] for it in self.queue_tts if tools.vail_file(it['filename'])]
+        formats = [fmt for fmt in mediainfo.batch_audio_format(files) if fmt]
+        if not formats:
+            return 44100, 1
+        return max(fmt[0] for fmt in formats), max(fmt[1] for fmt in formats)
+
     def _merge_audio_segments(self):
-        merged_audio = AudioSegment.empty()
+        wavfile = self.cache_folder + "/target.wav"
         if len(self.queue_tts) == 1:
+            merged_audio = AudioSegment.empty()
             the_ext = self.queue_tts[0]['filename'].split('.')[-1]
             try:
                 merged_audio += AudioSegment.from_file(self.queue_tts[0]['filename'],format="mp4" if the_ext == 'm4a' else the_ext)
@@ -547,74 +660,68 @@ class SpeedRate:
                 merged_audio+=AudioSegment.silent(duration=3000)
             except Exception:
                 merged_audio+=AudioSegment.silent(duration=3000)
+            merged_audio.export(wavfile, format="wav")
         else:
-            # start is not 0
-            if self.queue_tts[0]['start_time_source'] > 0:
-                silence = AudioSegment.silent(duration=self.queue_tts[0]['start_time_source'])
-                merged_audio += silence
-
-            # 开始时间
-            cur = self.queue_tts[0]['start_time_source']
-            length = len(self.queue_tts)
-            for i, it in enumerate(self.queue_tts):
-                if config.exit_soft:
-                    return
-                # 存在有效配音文件则加入，否则配音时长大于0则加入静音
-                segment = None
-                the_ext = it['filename'].split('.')[-1]
-
-                # 原始字幕时长
-                raw_source = it['end_time_source'] - it['start_time_source']
-                if raw_source == 0:
-                    continue
-                # 存在配音文件
-                if tools.vail_file(it['filename']):
-                    try:
-                        segment = AudioSegment.from_file(it['filename'], format="mp4" if the_ext == 'm4a' else the_ext)
-                        it['dubb_time'] = len(segment)
-                    except CouldntDecodeError:
-                        segment = AudioSegment.silent(duration=raw_source)
+            # 按时间轴顺序直接写入 wav，每个配音只解码一次，不再反复拼接 AudioSegment
+            timeline = _TimelineWriter(wavfile, *self._timeline_format())
+            try:
+                # start is not 0
+                timeline.pad_to(self.queue_tts[0]['start_time_source'])
+
+                # 开始时间
+                cur = self.queue_tts[0]['start_time_source']
+                length = len(self.queue_tts)
+                for i, it in enumerate(self.queue_tts):
+                    if config.exit_soft:
+                        return
+                    # 存在有效配音文件则加入，否则配音时长大于0则加入静音
+                    segment = None
+                    the_ext = it['filename'].split('.')[-1]
+
+                    # 原始字幕时长
+                    raw_source = it['end_time_source'] - it['start_time_source']
+                    if raw_source == 0:
+                        continue
+                    # 存在配音文件
+                    if tools.vail_file(it['filename']):
+                        try:
+                            segment = AudioSegment.from_file(it['filename'], format="mp4" if the_ext == 'm4a' else the_ext)
+                            it['dubb_time'] = len(segment)
+                        except CouldntDecodeError:
+                            it['dubb_time'] = raw_source
+                    else:
+                        # 不存在配音文件
                         it['dubb_time'] = raw_source
-                else:
-                    # 不存在配音文件
-                    segment = AudioSegment.silent(duration=raw_source)
-                    it['dubb_time'] = raw_source
 
-                if i == 0:
-                    it['start_time'] = it['start_time_source']
-                    it['end_time'] = it['start_time_source'] + it['dubb_time']
-                    cur = it['end_time']
-                    merged_audio += segment
-                else:
-                    if it['start_time_source'] < cur:
+                    if i == 0:
+                        it['start_time'] = it['start_time_source']
+                    elif it['start_time_source'] < cur:
                         # 如果开始时间和上一个结束片段重合
                         it['start_time'] = cur
-                        it['end_time'] = it['start_time'] + it['dubb_time']
-                        cur = it['end_time']
-                        merged_audio += segment
-                    elif it['start_time_source'] >= cur:
+                    else:
                         # 如果当前开始时间和上一个结束时间之间有间隔，则添加静音
-                        if it['start_time_source'] > cur:
-                            merged_audio += AudioSegment.silent(duration=it['start_time_source'] - cur)
                         it['start_time'] = it['start_time_source']
-                        it['end_time'] = it['start_time'] + it['dubb_time']
-                        merged_audio += segment
-                        cur = it['end_time']
+                    it['end_time'] = it['start_time'] + it['dubb_time']
+                    timeline.pad_to(it['start_time'])
+                    if segment is not None:
+                        timeline.write(segment)
+                    cur = it['end_time']
+                    timeline.pad_to(cur)
 
-                if cur < it['end_time_source']:
-                    merged_audio += AudioSegment.silent(duration=it['end_time_source'] - cur)
-                    cur = it['end_time_source']
-                    it['end_time'] = cur
+                    if cur < it['end_time_source']:
+                        cur = it['end_time_source']
+                        it['end_time'] = cur
+                        timeline.pad_to(cur)
 
-                it['startraw'] = tools.ms_to_time_string(ms=it['start_time'])
-                it['endraw'] = tools.ms_to_time_string(ms=it['end_time'])
-                self.queue_tts[i] = it
-                tools.set_process(text=f"{config.transobj['audio_concat']}:{i + 1}/{length}", uuid=self.uuid)
+                    it['startraw'] = tools.ms_to_time_string(ms=it['start_time'])
+                    it['endraw'] = tools.ms_to_time_string(ms=it['end_time'])
+                    self.queue_tts[i] = it
+                    tools.set_process(text=f"{config.transobj['audio_concat']}:{i + 1}/{length}", uuid=self.uuid)
+            finally:
+                timeline.close()
 
         # 创建配音后的文件
         try:
-            wavfile = self.cache_folder + "/target.wav"
-            merged_audio.export(wavfile, format="wav")
             ext = Path(self.target_audio).suffix.lower()
             if ext == '.wav':
                 shutil.copy2(wavfile, self.target_audio)
@@ -0,0 +1,112 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+from videotrans.configure import config
+from videotrans.translator import run as run_trans
+from videotrans.tts import run as run_tts
+
+
+class StreamPipeline:
+    """
+    边识别边翻译、配音
+    识别进程每输出一条字幕即交给此处，每凑满 stream_window 条在后台翻译，译文接着在后台配音，各自单线程按顺序执行
+    结果写入翻译缓存和配音缓存，识别结束后原有的翻译、配音阶段照常对完整字幕执行，已预先处理的直接命中缓存
+    因此字幕被编辑过时仍以编辑后为准，变速对齐仍在全部配音完成后统一执行一次
+    预处理出错时忽略，由正式阶段重新处理并报告
+    """
+
+    def __init__(self, task):
+        self.task = task
+        self.window = max(1, int(float(config.settings.get('stream_window', 20))))
+        # 预处理使用单独的 uuid，其日志和字幕消息直接丢弃，不干扰界面
+        self.uuid = f'{task.uuid}-stream'
+        config.uuid_logs_queue[self.uuid] = 'stop'
+        self._subs = []
+        self._line = 0
+        self._trans_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='stream-trans')
+        self._tts_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='stream-tts')
+        self._trans_futures = []
+        self._tts_futures = []
+        self._closed = False
+
+    def _exit(self):
+        return self._closed or self.task._exit() or self.task.uuid in config.stoped_uuid_set
+
+    # 识别出一条字幕，sub 含 text/start_time/end_time/startraw/endraw/time
+    def add(self, sub):
+        if self._exit():
+            return
+        self._line += 1
+        self._subs.append(dict(sub, line=self._line))
+        if len(self._subs) >= self.window:
+            self._flush()
+
+    def _flush(self):
+        if not self._subs:
+            return
+        subs, self._subs = self._subs, []
+        if self.task.shoud_trans:
+            self._trans_futures.append(self._trans_pool.submit(self._translate, subs))
+        elif self._should_dubbing():
+            self._tts_futures.append(self._tts_pool.submit(self._dubbing, subs))
+
+    # 克隆角色需截取原音频作为参考，无法预先配音
+    def _should_dubbing(self):
+        return self.task.shoud_dubbing and self.task.cfg['voice_role'] != 'clone'
+
+    def _translate(self, subs):
+        if self._exit():
+            return
+        try:
+            target = run_trans(
+                translate_type=self.task.cfg['translate_type'],
+                text_list=copy.deepcopy(subs),
+                uuid=self.uuid,
+                # 自动检测语言时识别中仍为 auto，正式翻译时未命中会回退查找 auto 的缓存
+                source_code=self.task.cfg['source_language_code'],
+                target_code=self.task.cfg['target_language_code'])
+        except Exception as e:
+            config.logger.exception(e, exc_info=True)
+            return
+        if target and self._should_dubbing():
+            self._tts_futures.append(self._tts_pool.submit(self._dubbing, target))
+
+    def _dubbing(self, subs):
+        if self._exit():
+            return
+        rate = self.task._tts_rate()
+        queue_tts = [self.task._tts_item(it['line'] - 1, it, None, rate, prefix='stream-') for it in subs
+                     if it['end_time'] > it['start_time'] and it['text'].strip()]
+        queue_tts = [it for it in queue_tts if it['role'] != 'clone']
+        if not queue_tts:
+            return
+        Path(config.TEMP_DIR + "/dubbing_cache").mkdir(parents=True, exist_ok=True)
+        try:
+            run_tts(queue_tts=queue_tts, language=self.task.cfg['target_language_code'], uuid=self.uuid)
+        except Exception as e:
+            config.logger.exception(e, exc_info=True)
+        finally:
+            # 已写入配音缓存，临时文件不再需要
+            for it in queue_tts:
+                Path(it['filename']).unlink(missing_ok=True)
+
+    # 识别完成，提交剩余不足一个窗口的字幕
+    def finish(self):
+        if not self._exit():
+            self._flush()
+
+    # 正式翻译前等待预翻译完成，以免同一字幕重复请求
+    def wait_trans(self):
+        wait(list(self._trans_futures))
+
+    # 正式配音前等待预配音完成
+    def wait_dubbing(self):
+        self.wait_trans()
+        wait(list(self._tts_futures))
+
+    def close(self):
+        self._closed = True
+        self._trans_pool.shutdown(wait=False, cancel_futures=True)
+        self._tts_pool.shutdown(wait=False, cancel_futures=True)
+        config.uuid_logs_queue.pop(self.uuid, None)
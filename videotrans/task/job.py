@@ -1,4 +1,3 @@
-import time
 from threading import Thread
 
 from videotrans.configure import config
@@ -24,170 +23,160 @@ assemb_queue
 """
 
 
-class WorkerPrepare(Thread):
-    def __init__(self, *, parent=None):
-        super().__init__()
-
-    def run(self) -> None:
-        while 1:
-            if config.exit_soft:
-                return
-            if len(config.prepare_queue) < 1:
-                time.sleep(0.5)
-                continue
-            try:
-                trk: BaseTask = config.prepare_queue.pop(0)
-            except:
-                continue
-            if task_is_stop(trk.uuid):
-                continue
-            try:
-
-                trk.prepare()
-                # 如果需要识别，则插入 recogn_queue队列，否则继续判断翻译队列、配音队列，都不吻合则插入最终队列
-                if trk.shoud_recogn:
-                    config.regcon_queue.append(trk)
-                elif trk.shoud_trans:
-                    config.trans_queue.append(trk)
-                elif trk.shoud_dubbing:
-                    config.dubb_queue.append(trk)
-                else:
-                    config.assemb_queue.append(trk)
-            except Exception as e:
-                config.logger.exception(e, exc_info=True)
-                set_process(text=f'{config.transobj["yuchulichucuo"]}:' + str(e), type='error', uuid=trk.uuid)
-
-
-class WorkerRegcon(Thread):
-    def __init__(self, *, parent=None):
-        super().__init__()
-
-    def run(self) -> None:
-        while 1:
-            if config.exit_soft:
-                return
-
-            if len(config.regcon_queue) < 1:
-                time.sleep(0.5)
-                continue
-            trk = config.regcon_queue.pop(0)
-            if task_is_stop(trk.uuid):
-                continue
-            try:
-                trk.recogn()
-                # 如果需要识翻译,则插入翻译队列，否则就行判断配音队列，都不吻合则插入最终队列
-                if trk.shoud_trans:
-                    config.trans_queue.append(trk)
-                elif trk.shoud_dubbing:
-                    config.dubb_queue.append(trk)
-                else:
-                    config.assemb_queue.append(trk)
-            except Exception as e:
-                config.logger.exception(e, exc_info=True)
-                set_process(text=f'{config.transobj["shibiechucuo"]}:' + str(e), type='error', uuid=trk.uuid)
+class StageWorker(Thread):
+    """
+    阶段工作线程基类，阻塞等待所在阶段队列，有任务立即执行，无需轮询
+    子类设置 queue_name/error_key/resources 并实现 process(trk)
+    """
+    # config 中对应的队列名
+    queue_name = ''
+    # 出错时的提示文字 key
+    error_key = ''
+    # 该阶段涉及的资源类，未单独设置线程数时，按其中最大上限启动线程
+    resources = ()
 
+    def __init__(self, *, parent=None, index=0):
+        super().__init__(name=f'{self.queue_name}-{index}')
 
-class WorkerTrans(Thread):
-    def __init__(self, *, parent=None):
-        super().__init__()
+    def process(self, trk: BaseTask) -> None:
+        pass
 
     def run(self) -> None:
+        queue = getattr(config, self.queue_name)
         while 1:
             if config.exit_soft:
                 return
-            if len(config.trans_queue) < 1:
-                time.sleep(0.5)
-                continue
-            trk = config.trans_queue.pop(0)
-            if task_is_stop(trk.uuid):
-                continue
-            try:
-                trk.trans()
-                # 如果需要配音，则插入 dubb_queue 队列，否则插入最终队列
-                if trk.shoud_dubbing:
-                    config.dubb_queue.append(trk)
-                else:
-                    config.assemb_queue.append(trk)
-            except Exception as e:
-                msg = f'{config.transobj["fanyichucuo"]}:' + str(e)
-                config.logger.exception(e, exc_info=True)
-                set_process(text=msg, type='error', uuid=trk.uuid)
-
-
-class WorkerDubb(Thread):
-    def __init__(self, *, parent=None):
-        super().__init__()
-
-    def run(self) -> None:
-        while 1:
-            if config.exit_soft:
-                return
-            if len(config.dubb_queue) < 1:
-                time.sleep(0.5)
-                continue
-            trk = config.dubb_queue.pop(0)
-            if task_is_stop(trk.uuid):
-                continue
-            try:
-                trk.dubbing()
-                config.align_queue.append(trk)
-            except Exception as e:
-                msg = f'{config.transobj["peiyinchucuo"]}:' + str(e)
-                config.logger.exception(e, exc_info=True)
-                set_process(text=msg, type='error', uuid=trk.uuid)
-
-
-class WorkerAlign(Thread):
-    def __init__(self, *, parent=None):
-        super().__init__()
-
-    def run(self) -> None:
-        while 1:
-            if config.exit_soft:
-                return
-            if len(config.align_queue) < 1:
-                time.sleep(0.5)
-                continue
-            trk = config.align_queue.pop(0)
-            if task_is_stop(trk.uuid):
-                continue
-            try:
-                trk.align()
-            except Exception as e:
-                msg = f'{config.transobj["peiyinchucuo"]}:' + str(e)
-                config.logger.exception(e, exc_info=True)
-                set_process(text=msg, type='error', uuid=trk.uuid)
-            else:
-                config.assemb_queue.append(trk)
-
-
-class WorkerAssemb(Thread):
-    def __init__(self, *, parent=None):
-        super().__init__()
-
-    def run(self) -> None:
-        while 1:
-            if config.exit_soft:
-                return
-            if len(config.assemb_queue) < 1:
-                time.sleep(0.5)
-                continue
-            trk = config.assemb_queue.pop(0)
-            if task_is_stop(trk.uuid):
+            # 超时仅用于检查是否退出
+            trk = queue.get(timeout=1)
+            if trk is None:
                 continue
             try:
-                trk.assembling()
-                trk.task_done()
+                if task_is_stop(trk.uuid):
+                    trk.stopped()
+                    continue
+                self.process(trk)
             except Exception as e:
-                msg = f'{config.transobj["hebingchucuo"]}:' + str(e)
                 config.logger.exception(e, exc_info=True)
-                set_process(text=msg, type='error', uuid=trk.uuid)
+                set_process(text=f'{config.transobj[self.error_key]}:' + str(e), type='error', uuid=trk.uuid)
+            finally:
+                queue.task_done()
+
+
+class WorkerPrepare(StageWorker):
+    queue_name = 'prepare_queue'
+    error_key = 'yuchulichucuo'
+    resources = ('ffmpeg',)
+
+    def process(self, trk: BaseTask) -> None:
+        with config.resource('ffmpeg'):
+            trk.prepare()
+        # 如果需要识别，则插入 recogn_queue队列，否则继续判断翻译队列、配音队列，都不吻合则插入最终队列
+        if trk.shoud_recogn:
+            config.regcon_queue.append(trk)
+        elif trk.shoud_trans:
+            config.trans_queue.append(trk)
+        elif trk.shoud_dubbing:
+            config.dubb_queue.append(trk)
+        else:
+            config.assemb_queue.append(trk)
+
+
+class WorkerRegcon(StageWorker):
+    queue_name = 'regcon_queue'
+    error_key = 'shibiechucuo'
+    # 本地模型占用 cpu，在线识别占用 network，具体在识别渠道中申请
+    resources = ('cpu', 'network')
+
+    def process(self, trk: BaseTask) -> None:
+        trk.recogn()
+        # 如果需要识翻译,则插入翻译队列，否则就行判断配音队列，都不吻合则插入最终队列
+        if trk.shoud_trans:
+            config.trans_queue.append(trk)
+        elif trk.shoud_dubbing:
+            config.dubb_queue.append(trk)
+        else:
+            config.assemb_queue.append(trk)
+
+
+class WorkerTrans(StageWorker):
+    queue_name = 'trans_queue'
+    error_key = 'fanyichucuo'
+    resources = ('network',)
+
+    def process(self, trk: BaseTask) -> None:
+        trk.trans()
+        # 如果需要配音，则插入 dubb_queue 队列，否则插入最终队列
+        if trk.shoud_dubbing:
+            config.dubb_queue.append(trk)
+        else:
+            config.assemb_queue.append(trk)
+
+
+class WorkerDubb(StageWorker):
+    queue_name = 'dubb_queue'
+    error_key = 'peiyinchucuo'
+    resources = ('network',)
+
+    def process(self, trk: BaseTask) -> None:
+        trk.dubbing()
+        config.align_queue.append(trk)
+
+
+class WorkerAlign(StageWorker):
+    queue_name = 'align_queue'
+    error_key = 'peiyinchucuo'
+    resources = ('ffmpeg',)
+
+    def process(self, trk: BaseTask) -> None:
+        with config.resource('ffmpeg'):
+            trk.align()
+        config.assemb_queue.append(trk)
+
+
+class WorkerAssemb(StageWorker):
+    queue_name = 'assemb_queue'
+    error_key = 'hebingchucuo'
+    resources = ('ffmpeg',)
+
+    def process(self, trk: BaseTask) -> None:
+        trk.assembling()
+        trk.task_done()
+
+
+# 阶段工作线程类，以及高级设置中对应的线程数 key，0=按资源类上限
+STAGE_WORKERS = [
+    (WorkerPrepare, 'prepare_worker'),
+    (WorkerRegcon, 'recogn_worker'),
+    (WorkerTrans, 'trans_worker'),
+    (WorkerDubb, 'dubbing_worker'),
+    (WorkerAlign, 'align_worker'),
+    (WorkerAssemb, 'assemb_worker'),
+]
+
+
+# 各阶段排队数、执行中数量，各资源类占用情况
+def stage_status() -> dict:
+    status = {}
+    for worker_cls, _ in STAGE_WORKERS:
+        queue = getattr(config, worker_cls.queue_name)
+        status[queue.name] = {"queued": len(queue), "running": queue.running}
+    for name, res in config.resource_classes.items():
+        status[f'resource_{name}'] = {"limit": res.limit, "active": res.active, "waiting": res.waiting}
+    return status
+
+
+# 阶段线程数，未设置时取所涉及资源类的最大上限
+def _worker_nums(worker_cls, key) -> int:
+    try:
+        nums = int(config.settings.get(key, 0))
+    except (TypeError, ValueError):
+        nums = 0
+    if nums < 1:
+        nums = max([config.resource(name).limit for name in worker_cls.resources] or [1])
+    return nums
 
 
 def start_thread(parent=None):
-    WorkerPrepare(parent=parent).start()
-    WorkerRegcon(parent=parent).start()
-    WorkerTrans(parent=parent).start()
-    WorkerDubb(parent=parent).start()
-    WorkerAlign(parent=parent).start()
-    WorkerAssemb(parent=parent).start()
+    for worker_cls, key in STAGE_WORKERS:
+        for i in range(_worker_nums(worker_cls, key)):
+            worker_cls(parent=parent, index=i).start()
@@ -14,11 +14,13 @@ from pydub import AudioSegment
 
 from videotrans import translator
 from videotrans.configure import config
-from videotrans.recognition import run as run_recogn,Faster_Whisper_XXL
+from videotrans.recognition import run as run_recogn,Faster_Whisper_XXL,recogn_emits_segments,settings_fingerprint as recogn_settings_fingerprint
 from videotrans.translator import run as run_trans, get_audio_code
 from videotrans.tts import run as run_tts, CLONE_VOICE_TTS, COSYVOICE_TTS,F5_TTS,EDGE_TTS,AZURE_TTS,ELEVENLABS_TTS
 from videotrans.util import tools
 from ._base import BaseTask
+from ._manifest import TaskManifest, prune_manifests
+from ._stream import StreamPipeline
 from ._rate import SpeedRate
 from ._remove_noise import remove_noise
 
@@ -171,6 +173,19 @@ class TransCreate(BaseTask):
         config.logger.info(f"{self.cfg=}")
         # 获取set.ini配置
         config.settings = config.parse_init()
+        # 断点记录，重新开始同一输入且参数一致时跳过仍有效的阶段
+        self.manifest = None
+        # 边识别边翻译配音，识别阶段创建
+        self.stream = None
+        # 原始 novoice_mp4 是否已保存到断点记录
+        self._novoice_saved = False
+        self._novoice_codec = "copy" if self.is_copy_video else f"libx{self.video_codec_num}"
+        if TaskManifest.enabled():
+            try:
+                prune_manifests()
+                self.manifest = TaskManifest(self.cfg['name'], self.cfg['target_dir'])
+            except Exception as e:
+                config.logger.exception(e, exc_info=True)
         # 禁止修改字幕
         self._signal(text="forbid", type="disabled_edit")
 
@@ -254,7 +269,57 @@ class TransCreate(BaseTask):
         if self._exit():
             return
         # 将原始视频分离为无声视频和音频
+        self._split_novoice()
+        params = {"is_separate": self.cfg['is_separate'], "source_language_code": self.cfg['source_language_code']}
+        meta = self._restore_stage('prepare', params, dest=lambda name, _: self.cfg[name])
+        if meta is not None:
+            if not meta.get('is_separate'):
+                self.cfg['instrument'] = None
+                self.cfg['vocal'] = None
+                self.cfg['is_separate'] = False
+                self.shoud_separate = False
+            if self.shoud_recogn:
+                tools.conver_to_16k(self.cfg['vocal'] if self.cfg['is_separate'] else self.cfg['source_wav'], self.cfg['shibie_audio'])
+            shutil.copy2(self.cfg['source_wav'], self.cfg['target_dir']+f"/{os.path.basename(self.cfg['source_wav'])}")
+            self.status_text = config.transobj['endfenliyinpin']
+            return
         self._split_wav_novicemp4()
+        files = {"source_wav": self.cfg['source_wav']}
+        if self.cfg['is_separate']:
+            files.update(vocal=self.cfg['vocal'], instrument=self.cfg['instrument'])
+        self._save_stage('prepare', params, files, meta={"is_separate": self.cfg['is_separate']})
+
+    # 断点记录：参数一致且产物完好时恢复产物并返回保存的 meta，否则返回 None
+    def _restore_stage(self, stage, params, files=None, *, inputs=(), dest=None, chain=True):
+        if not self.manifest:
+            return None
+        try:
+            return self.manifest.restore(stage, self.manifest.key(stage, params, inputs, chain), files, dest, chain)
+        except Exception as e:
+            config.logger.exception(e, exc_info=True)
+            return None
+
+    # 断点记录：阶段成功后保存产物
+    def _save_stage(self, stage, params, files, *, inputs=(), meta=None, chain=True):
+        if not self.manifest or self._exit():
+            return
+        try:
+            self.manifest.save(stage, self.manifest.key(stage, params, inputs, chain), files, meta, chain)
+        except Exception as e:
+            config.logger.exception(e, exc_info=True)
+
+    # 等待无声视频分离完成后保存，需在其被慢速或延长修改前调用
+    def _save_novoice(self):
+        if self._novoice_saved or not self.manifest or self.cfg['app_mode'] == 'tiqu':
+            return
+        try:
+            if not tools.is_novoice_mp4(self.cfg['novoice_mp4'], self.cfg['noextname']):
+                return
+        except Exception:
+            # 分离出错，交由后续步骤报告
+            return
+        self._novoice_saved = True
+        self._save_stage('novoice', {"codec": self._novoice_codec}, {"novoice_mp4": self.cfg['novoice_mp4']}, chain=False)
 
     def _recogn_succeed(self) -> None:
         # 仅提取字幕
@@ -282,6 +347,12 @@ class TransCreate(BaseTask):
         self.status_text = '开始识别创建字幕' if config.defaulelang=='zh' else 'Start to create subtitles'
         self.precent += 3
         self._signal(text=config.transobj["kaishishibie"])
+        params = {k: self.cfg.get(k) for k in ['recogn_type', 'model_name', 'split_type', 'detect_language', 'remove_noise']}
+        params.update(recogn_settings_fingerprint(self.cfg['recogn_type'], self.cfg['detect_language']))
+        if self._restore_stage('recogn', params, dest=lambda name, _: self.cfg[name]) is not None:
+            self._signal(text=Path(self.cfg['source_sub']).read_text(encoding='utf-8'), type='replace_subtitle')
+            self._recogn_succeed()
+            return
         if tools.vail_file(self.cfg['source_sub']):
             self._recogn_succeed()
             return
@@ -293,6 +364,8 @@ class TransCreate(BaseTask):
             self.hasend = True
             raise Exception(error)
 
+        # 识别成功后预处理继续供翻译、配音阶段使用，其他任何退出路径均需关闭
+        succeed = False
         try:
             if not tools.vail_file(self.cfg['shibie_audio']):
                 tools.conver_to_16k(self.cfg['source_wav'], self.cfg['shibie_audio'])
@@ -301,7 +374,7 @@ class TransCreate(BaseTask):
                 self.status_text='开始语音降噪处理，用时可能较久，请耐心等待' if config.defaulelang=='zh' else 'Starting to process speech noise reduction, which may take a long time, please be patient'
                 self.cfg['shibie_audio']=remove_noise(self.cfg['shibie_audio'],f"{self.cfg['cache_folder']}/remove_noise.wav")
             self.status_text = '语音识别文字处理中' if config.defaulelang == 'zh' else 'Speech Recognition to Word Processing'
-            
+            raw_subtitles = None
             if self.cfg['recogn_type']==Faster_Whisper_XXL:
                 import subprocess,shutil
                 cmd=[
@@ -321,13 +394,18 @@ class TransCreate(BaseTask):
                         break
                     time.sleep(1)
                 
-                subprocess.run(cmd)
+                with config.resource('cpu'):
+                    subprocess.run(cmd)
                 outsrt_file=self.cfg['target_dir']+'/'+Path(self.cfg['shibie_audio']).stem+".srt"
                 if outsrt_file!=self.cfg['source_sub']:
                     shutil.copy2(outsrt_file,self.cfg['source_sub'])
                     Path(outsrt_file).unlink(missing_ok=True)
                 self._signal(text=Path(self.cfg['source_sub']).read_text(encoding='utf-8'), type='replace_subtitle')
             else:
+                # 仅逐条输出识别结果的渠道才能边识别边翻译配音
+                if config.settings.get('stream_pipeline', False) and (self.shoud_trans or self.shoud_dubbing) \
+                        and recogn_emits_segments(self.cfg['recogn_type'], self.cfg['split_type']):
+                    self.stream = StreamPipeline(self)
                 raw_subtitles = run_recogn(
                     # faster-whisper openai-whisper googlespeech
                     recogn_type=self.cfg['recogn_type'],
@@ -357,9 +435,14 @@ class TransCreate(BaseTask):
                 else:
                     self._save_srt_target(raw_subtitles, self.cfg['source_sub'])
                     self.source_srt_list = raw_subtitles
+            if self.stream:
+                self.stream.finish()
+            files = {"source_sub": self.cfg['source_sub']}
+            if isinstance(raw_subtitles, tuple) and len(raw_subtitles) == 2:
+                files['target_sub'] = self.cfg['target_sub']
+            self._save_stage('recogn', params, files)
             self._recogn_succeed()
-
-            
+            succeed = True
         except Exception as e:
             msg = f'{str(e)}{str(e.args)}'
             if re.search(r'cub[a-zA-Z0-9_.-]+?\.dll', msg, re.I | re.M) is not None:
@@ -372,13 +455,39 @@ class TransCreate(BaseTask):
             self._signal(text=msg, type='error')
             tools.send_notification(str(e), f'{self.cfg["basename"]}')
             raise
+        finally:
+            if not succeed:
+                self._close_stream()
+
+    def _close_stream(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+    def stopped(self):
+        self._close_stream()
 
     def trans(self) -> None:
         if self._exit():
+            self._close_stream()
             return
         if not self.shoud_trans:
             return
         self.status_text = config.transobj['starttrans']
+        if self.stream:
+            self.stream.wait_trans()
+            if not self.shoud_dubbing:
+                self._close_stream()
+        params = {"translate_type": self.cfg['translate_type'], "target_language_code": self.cfg['target_language_code'],
+                  "aisendsrt": config.settings.get('aisendsrt', False),
+                  **translator.settings_fingerprint(self.cfg['translate_type'])}
+        if self._restore_stage('trans', params, {"target_sub": self.cfg['target_sub']}, inputs=[self.cfg['source_sub']]) is not None:
+            self._signal(
+                text=Path(self.cfg['target_sub']).read_text(encoding="utf-8", errors="ignore"),
+                type='replace_subtitle'
+            )
+            self._trans_succeed()
+            return
 
         # 如果存在目标语言字幕，前台直接使用该字幕替换
         if self._srt_vail(self.cfg['target_sub']):
@@ -405,28 +514,33 @@ class TransCreate(BaseTask):
             #
 
             self._save_srt_target(self._check_target_sub(rawsrt, target_srt), self.cfg['target_sub'])
-
-            # 仅提取，该名字删原
-            if self.cfg['app_mode'] == 'tiqu':
-                shutil.copy2(self.cfg['target_sub'],
-                             f"{self.cfg['target_dir']}/{self.cfg['noextname']}.srt")
-                if self.cfg.get('copysrt_rawvideo'):
-                    p=Path(self.cfg['name'])
-                    shutil.copy2(self.cfg['target_sub'],f'{p.parent.as_posix()}/{p.stem}.srt')
-                Path(self.cfg['source_sub']).unlink(missing_ok=True)
-                Path(self.cfg['target_sub']).unlink(missing_ok=True)
-                self.hasend = True
-                self.precent = 100
+            self._save_stage('trans', params, {"target_sub": self.cfg['target_sub']}, inputs=[self.cfg['source_sub']])
+            self._trans_succeed()
         except Exception as e:
             self.hasend = True
+            self._close_stream()
             self._signal(text=str(e), type='error')
             tools.send_notification(str(e), f'{self.cfg["basename"]}')
             raise
+
+    def _trans_succeed(self) -> None:
+        # 仅提取，该名字删原
+        if self.cfg['app_mode'] == 'tiqu':
+            shutil.copy2(self.cfg['target_sub'],
+                         f"{self.cfg['target_dir']}/{self.cfg['noextname']}.srt")
+            if self.cfg.get('copysrt_rawvideo'):
+                p=Path(self.cfg['name'])
+                shutil.copy2(self.cfg['target_sub'],f'{p.parent.as_posix()}/{p.stem}.srt')
+            Path(self.cfg['source_sub']).unlink(missing_ok=True)
+            Path(self.cfg['target_sub']).unlink(missing_ok=True)
+            self.hasend = True
+            self.precent = 100
         self.status_text = config.transobj['endtrans']
 
 
     def dubbing(self) -> None:
         if self._exit():
+            self._close_stream()
             return
         if self.cfg['app_mode'] == 'tiqu':
             self.precent = 100
@@ -436,6 +550,9 @@ class TransCreate(BaseTask):
 
         self.status_text = config.transobj['kaishipeiyin']
         self.precent += 3
+        if self.stream:
+            self.stream.wait_dubbing()
+            self._close_stream()
         try:
             if self.cfg['voice_role']=='clone' and self.cfg['tts_type']==ELEVENLABS_TTS:
                 if (self.cfg['source_language_code'] !='auto' and self.cfg['source_language_code'][:2] not in config.ELEVENLABS_CLONE) or (self.cfg['target_language_code'][:2] not in config.ELEVENLABS_CLONE):
@@ -446,8 +563,9 @@ class TransCreate(BaseTask):
                 self.ignore_align=True
                 from videotrans.tts._elevenlabs import ElevenLabsClone
                 ElevenLabsClone(self.cfg['source_wav'],self.cfg['target_wav'],self.cfg['source_language_code'],self.cfg['target_language_code']).run()
-            else:
+            elif not self._restore_dubbing():
                 self._tts()
+                self._save_dubbing()
         except Exception as e:
             self.hasend = True
             self._signal(text=str(e), type='error')
@@ -455,6 +573,44 @@ class TransCreate(BaseTask):
             raise
 
 
+    def _dubbing_params(self):
+        return {"tts_type": self.cfg['tts_type'], "voice_role": self.cfg['voice_role'], "voice_rate": self.cfg['voice_rate'],
+                "volume": self.cfg['volume'], "pitch": self.cfg['pitch'], "line_roles": config.line_roles}
+
+    # 配音结果按条保存，queue_tts 中以 clip 名称代替文件路径
+    def _save_dubbing(self):
+        files = {}
+        queue_tts = []
+        for i, it in enumerate(self.queue_tts):
+            it = {k: v for k, v in it.items() if k not in ['filename', 'ref_wav']}
+            it['clip'] = f'clip{i}'
+            files[it['clip']] = self.queue_tts[i]['filename']
+            queue_tts.append(it)
+        self._save_stage('dubbing', self._dubbing_params(), files, inputs=[self.cfg['target_sub']], meta={"queue_tts": queue_tts})
+
+    def _restore_dubbing(self) -> bool:
+        dub_dir = config.TEMP_DIR + "/dubbing_cache"
+        restored = {}
+        meta = self._restore_stage('dubbing', self._dubbing_params(), inputs=[self.cfg['target_sub']],
+                                   dest=lambda name, file: restored.setdefault(name, f"{dub_dir}/{self.uuid}-{file}"))
+        if not meta or not meta.get('queue_tts'):
+            return False
+        queue_tts = []
+        for i, it in enumerate(meta['queue_tts']):
+            # 当时配音失败的条目没有保存，仍指向不存在的文件
+            it['filename'] = restored.get(it.pop('clip', ''), f"{dub_dir}/{self.uuid}-missing-{i}.mp3")
+            queue_tts.append(it)
+        self.queue_tts = queue_tts
+        self._signal(text=f'{config.transobj["kaishipeiyin"]} [{len(queue_tts)}/{len(queue_tts)}]')
+        return True
+
+    def _align_params(self):
+        params = {k: self.cfg.get(k) for k in ['voice_autorate', 'video_autorate', 'append_video', 'volume', 'tts_type']}
+        params.update({k: config.settings.get(k) for k in
+                       ['audio_rate', 'video_rate', 'remove_srt_silence', 'remove_white_ms', 'video_goback', 'force_edit_srt',
+                        'video_codec', 'crf', 'preset']})
+        return params
+
     def align(self) -> None:
         if self._exit():
             return
@@ -469,11 +625,22 @@ class TransCreate(BaseTask):
         self.precent += 3
         if self.cfg['voice_autorate'] or self.cfg['video_autorate']:
             self.status_text = '声画变速对齐阶段' if config.defaulelang == 'zh' else 'Sound & video speed alignment stage'
+        shoud_video_rate = self.cfg['video_autorate'] and int(float(config.settings['video_rate'])) > 1
+        meta = self._restore_stage('align', self._align_params(), dest=lambda name, _: self.cfg[name])
+        if meta is not None:
+            self.video_time = meta.get('video_time', self.video_time)
+            # 恢复的是慢速处理后的无声视频
+            if meta.get('novoice'):
+                config.queue_novice[self.cfg['noextname']] = 'end'
+                self._novoice_saved = True
+            return
         try:
-            shoud_video_rate = self.cfg['video_autorate'] and int(float(config.settings['video_rate'])) > 1
             # 如果时需要慢速或者需要末尾延长视频，需等待 novoice_mp4 分离完毕
             if shoud_video_rate or self.cfg['append_video']:
                 tools.is_novoice_mp4(self.cfg['novoice_mp4'], self.cfg['noextname'])
+            # 慢速会修改 novoice_mp4，先保存原始的
+            if shoud_video_rate:
+                self._save_novoice()
             rate_inst = SpeedRate(
                 queue_tts=self.queue_tts,
                 uuid=self.uuid,
@@ -520,6 +687,10 @@ class TransCreate(BaseTask):
                 pass
             else:
                 shutil.copy2(tmp_name,self.cfg['target_wav'])
+        files = {"target_wav": self.cfg['target_wav'], "target_sub": self.cfg['target_sub']}
+        if shoud_video_rate:
+            files['novoice_mp4'] = self.cfg['novoice_mp4']
+        self._save_stage('align', self._align_params(), files, meta={"video_time": self.video_time, "novoice": bool(shoud_video_rate)})
 
     # 将 视频、音频、字幕合成
     def assembling(self) -> None:
@@ -534,8 +705,11 @@ class TransCreate(BaseTask):
         if self.precent < 95:
             self.precent += 3
         self.status_text = config.transobj['kaishihebing']
+        # 末尾延长会修改 novoice_mp4，先保存原始的
+        self._save_novoice()
         try:
-            self._join_video_audio_srt()
+            with config.resource('ffmpeg'):
+                self._join_video_audio_srt()
         except Exception as e:
             self.hasend = True
             self._signal(text=str(e), type='error')
@@ -565,6 +739,10 @@ class TransCreate(BaseTask):
 
         self.hasend = True
         self.precent = 100
+        self._close_stream()
+        # 已成功完成，不再需要断点记录
+        if self.manifest:
+            self.manifest.clear()
         self._signal(text=f"{self.cfg['name']}", type='succeed')
         tools.send_notification(config.transobj['Succeed'], f"{self.cfg['basename']}")
         try:
@@ -580,22 +758,29 @@ class TransCreate(BaseTask):
             config.logger.exception(e, exc_info=True)
 
 
-    # 分离音频 和 novoice.mp4
-    def _split_wav_novicemp4(self) -> None:
+    # 后台分离 novoice.mp4，断点记录中存在时直接恢复
+    def _split_novoice(self) -> None:
         # 不是 提取字幕时，需要分离出视频
-        if self.cfg['app_mode'] not in ['tiqu']:
-            config.queue_novice[self.cfg['noextname']] = 'ing'
-            threading.Thread(
-                target=tools.split_novoice_byraw,
-                args=(self.cfg['name'],
-                      self.cfg['novoice_mp4'],
-                      self.cfg['noextname'],
-                      "copy" if self.is_copy_video else f"libx{self.video_codec_num}")).start()
-            if not self.is_copy_video:
-                self.status_text = '视频需要转码，耗时可能较久..' if config.defaulelang == 'zh' else 'Video needs transcoded and take a long time..'
-        else:
+        if self.cfg['app_mode'] in ['tiqu']:
             config.queue_novice[self.cfg['noextname']] = 'end'
-
+            return
+        if self._restore_stage('novoice', {"codec": self._novoice_codec}, {"novoice_mp4": self.cfg['novoice_mp4']}, chain=False) is not None:
+            config.queue_novice[self.cfg['noextname']] = 'end'
+            self._novoice_saved = True
+            return
+        config.queue_novice[self.cfg['noextname']] = 'ing'
+        threading.Thread(
+            target=tools.split_novoice_byraw,
+            args=(self.cfg['name'],
+                  self.cfg['novoice_mp4'],
+                  self.cfg['noextname'],
+                  self._novoice_codec)).start()
+        if not self.is_copy_video:
+            self.status_text = '视频需要转码，耗时可能较久..' if config.defaulelang == 'zh' else 'Video needs transcoded and take a long time..'
+
+    # 分离音频
+    def _split_wav_novicemp4(self) -> None:
+        separate_failed = False
         # 添加是否保留背景选项
         if self.cfg['is_separate']:
             try:
@@ -615,6 +800,7 @@ class TransCreate(BaseTask):
                     self.cfg['vocal'] = None
                     self.cfg['is_separate'] = False
                     self.shoud_separate = False
+                    separate_failed = True
                 elif self.shoud_recogn:
                     # 需要识别时
                     # 分离成功后转为16k待识别音频
@@ -623,10 +809,14 @@ class TransCreate(BaseTask):
         if not self.cfg['is_separate']:
             try:
                 self.status_text = config.transobj['kaishitiquyinpin']
-                tools.split_audio_byraw(self.cfg['name'], self.cfg['source_wav'])
-                # 需要识别
-                if self.shoud_recogn:
-                    tools.conver_to_16k(self.cfg['source_wav'], self.cfg['shibie_audio'])
+                shibie_audio = self.cfg['shibie_audio'] if self.shoud_recogn else None
+                if separate_failed and tools.vail_file(self.cfg['source_wav']):
+                    # 分离失败但 source_wav 已在分离前输出，只需转换待识别音频
+                    if shibie_audio:
+                        tools.conver_to_16k(self.cfg['source_wav'], shibie_audio)
+                else:
+                    # 需要识别时 source_wav 和 16k 待识别音频一次解码同时输出
+                    tools.split_audio_byraw(self.cfg['name'], self.cfg['source_wav'], shibie_audio=shibie_audio)
             except Exception as e:
                 self._signal(text=str(e), type='error')
                 raise
@@ -634,6 +824,40 @@ class TransCreate(BaseTask):
             shutil.copy2(self.cfg['source_wav'], self.cfg['target_dir']+f"/{os.path.basename(self.cfg['source_wav'])}")
         self.status_text = config.transobj['endfenliyinpin']
 
+    def _tts_rate(self) -> str:
+        try:
+            rate = int(str(self.cfg['voice_rate']).replace('%', ''))
+        except:
+            rate = 0
+        if rate >= 0:
+            return f"+{rate}%"
+        return f"{rate}%"
+
+    # 第 i 条字幕的配音信息
+    def _tts_item(self, i, it, source_subs, rate, prefix='') -> dict:
+        # 取出设置的每行角色
+        line_roles = config.line_roles
+        # 判断是否存在单独设置的行角色，如果不存在则使用全局
+        voice_role = self.cfg['voice_role']
+        if line_roles and f'{it["line"]}' in line_roles:
+            voice_role = line_roles[f'{it["line"]}']
+        return {
+            "text": it['text'],
+            "ref_text": source_subs[i]['text'] if source_subs and i<len(source_subs) else '',
+            "role": voice_role,
+            "start_time_source": source_subs[i]['start_time'] if source_subs and i<len(source_subs) else it['start_time'],
+            "end_time_source": source_subs[i]['end_time'] if source_subs and i<len(source_subs) else it['end_time'],
+            "start_time": it['start_time'],
+            "end_time": it['end_time'],
+            "rate": rate,
+            "startraw": it['startraw'],
+            "endraw": it['endraw'],
+            "volume": self.cfg['volume'],
+            "pitch": self.cfg['pitch'],
+            "tts_type": self.cfg['tts_type'],
+            "filename": config.TEMP_DIR + f"/dubbing_cache/{prefix}{it['start_time']}-{it['end_time']}-{time.time()}-{len(it['text'])}-{i}.mp3"
+        }
+
     # 配音预处理，去掉无效字符，整理开始时间
     def _tts(self) -> None:
         queue_tts = []
@@ -642,41 +866,13 @@ class TransCreate(BaseTask):
         source_subs = tools.get_subtitle_from_srt(self.cfg['source_sub'])
         if len(subs) < 1:
             raise Exception(f"字幕格式不正确，请打开查看:{self.cfg['target_sub']}")
-        try:
-            rate = int(str(self.cfg['voice_rate']).replace('%', ''))
-        except:
-            rate = 0
-        if rate >= 0:
-            rate = f"+{rate}%"
-        else:
-            rate = f"{rate}%"
-        # 取出设置的每行角色
-        line_roles = config.line_roles
+        rate = self._tts_rate()
         # 取出每一条字幕，行号\n开始时间 --> 结束时间\n内容
         for i, it in enumerate(subs):
             if it['end_time'] <= it['start_time']:
                 continue
-            # 判断是否存在单独设置的行角色，如果不存在则使用全局
-            voice_role = self.cfg['voice_role']
-            if line_roles and f'{it["line"]}' in line_roles:
-                voice_role = line_roles[f'{it["line"]}']
-
-            tmp_dict = {
-                "text": it['text'],
-                "ref_text": source_subs[i]['text'] if source_subs and i<len(source_subs) else '',
-                "role": voice_role,
-                "start_time_source": source_subs[i]['start_time'] if source_subs and i<len(source_subs) else it['start_time'],
-                "end_time_source": source_subs[i]['end_time'] if source_subs and i<len(source_subs) else it['end_time'],
-                "start_time": it['start_time'],
-                "end_time": it['end_time'],
-                "rate": rate,
-                "startraw": it['startraw'],
-                "endraw": it['endraw'],
-                "volume": self.cfg['volume'],
-                "pitch": self.cfg['pitch'],
-                "tts_type": self.cfg['tts_type'],
-                "filename": config.TEMP_DIR + f"/dubbing_cache/{it['start_time']}-{it['end_time']}-{time.time()}-{len(it['text'])}-{i}.mp3"
-            }
+            tmp_dict = self._tts_item(i, it, source_subs, rate)
+            voice_role = tmp_dict['role']
             # 如果是clone-voice类型， 需要截取对应片段
             # 是克隆
             if self.cfg['tts_type'] in [COSYVOICE_TTS, CLONE_VOICE_TTS,F5_TTS] and voice_role == 'clone':
@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
-from typing import Union, List
+import hashlib
+from pathlib import Path
+from typing import Union, List, Dict
 
 
 
 from videotrans.configure import config
+from videotrans.util import tools
 
 
 
@@ -29,6 +32,18 @@ AI302_INDEX = 17
 ALI_INDEX = 18
 GLM4FLASH_INDEX = 19
 QWEN257B_INDEX = 20
+# AI翻译渠道的模型参数名和提示词名，None 表示模型固定
+AI_SETTINGS = {
+    CHATGPT_INDEX: ('chatgpt_model', 'chatgpt'),
+    LOCALLLM_INDEX: ('localllm_model', 'localllm'),
+    ZIJIE_INDEX: ('zijiehuoshan_model', 'zijie'),
+    AZUREGPT_INDEX: ('azure_model', 'azure'),
+    GEMINI_INDEX: ('gemini_model', 'gemini'),
+    CLAUDE_INDEX: ('claude_model', 'claude'),
+    AI302_INDEX: ('ai302_model', 'ai302'),
+    GLM4FLASH_INDEX: (None, 'freeai'),
+    QWEN257B_INDEX: (None, 'freeai'),
+}
 # 翻译通道名字列表，显示在界面
 TRANSLASTE_NAME_LIST = [
     "Google(免费)" if config.defaulelang == 'zh' else 'Google',
@@ -669,6 +684,22 @@ def get_subtitle_code(*, show_target=None):
     return 'eng'
 
 
+def settings_fingerprint(translate_type, is_srt=True) -> Dict:
+    """AI渠道的模型名和提示词模板(含术语表)的 hash，供断点恢复判断设置是否一致，其他渠道为空"""
+    translate_type = int(translate_type)
+    if translate_type not in AI_SETTINGS:
+        return {}
+    model_key, ainame = AI_SETTINGS[translate_type]
+    prompt = tools.get_prompt(ainame=ainame, is_srt=is_srt)
+    if config.settings.get('aisendsrt', False) and config.settings.get('refine3', False):
+        prompt += Path(config.ROOT_DIR + f'/videotrans/prompts/srt/fansi3{"" if config.defaulelang == "zh" else "-en"}.txt').read_text(encoding='utf-8')
+    return {
+        "model": config.params.get(model_key) if model_key else None,
+        "refine3": config.settings.get('refine3', False),
+        "prompt": hashlib.md5(prompt.encode('utf-8')).hexdigest(),
+    }
+
+
 # 翻译,先根据翻译通道和目标语言，取出目标语言代码
 def run(*, translate_type=None,
         text_list=None,
@@ -2,18 +2,19 @@
 import re
 from typing import Union, List
 
-import requests
-
 from videotrans.configure import config
+from videotrans.configure._except import StatusError
 from videotrans.translator._base import BaseTrans
 from videotrans.util import tools
 
 
 class AI302(BaseTrans):
+    credential_params = ('ai302_key',)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.trans_thread=int(config.settings.get('aitrans_thread',500))
+        self.token_batch=True
         self.proxies = {"http": "", "https": ""}
         self.prompt = tools.get_prompt(ainame='ai302',is_srt=self.is_srt).replace('{lang}', self.target_language_name)
         self.model_name=config.params['ai302_model']
@@ -31,7 +32,7 @@ class AI302(BaseTrans):
                  'content': self.prompt.replace('<INPUT></INPUT>',f'<INPUT>{text}</INPUT>')},
             ]
         }
-        response = requests.post('https://api.302.ai/v1/chat/completions', headers={
+        response = self._session().post('https://api.302.ai/v1/chat/completions', headers={
                 'Accept': 'application/json',
                 'Authorization': f'Bearer {config.params["ai302_key"]}',
                 'User-Agent': 'pyvideotrans',
@@ -39,7 +40,7 @@ class AI302(BaseTrans):
             }, json=payload, verify=False, proxies=self.proxies)
         config.logger.info(f'[302.ai]响应:{response.text=}')
         if response.status_code != 200:
-            raise Exception(f'status_code={response.status_code} {response.reason}')
+            raise StatusError(f'status_code={response.status_code} {response.reason}', response.status_code)
         res = response.json()
         result=""        
         if res['choices']:
@@ -63,7 +64,7 @@ class AI302(BaseTrans):
                  'content': prompt},
             ]
         }
-        response = requests.post('https://api.302.ai/v1/chat/completions', headers={
+        response = self._session().post('https://api.302.ai/v1/chat/completions', headers={
                 'Accept': 'application/json',
                 'Authorization': f'Bearer {config.params["ai302_key"]}',
                 'User-Agent': 'pyvideotrans',
@@ -71,7 +72,7 @@ class AI302(BaseTrans):
             }, json=payload, verify=False, proxies=self.proxies)
         config.logger.info(f'[302.ai]响应:{response.text=}')
         if response.status_code != 200:
-            raise Exception(f'status_code={response.status_code} {response.reason}')
+            raise StatusError(f'status_code={response.status_code} {response.reason}', response.status_code)
         res = response.json()
         if res['choices']:
             result = res['choices'][0]['message']['content']
@@ -14,6 +14,7 @@ from videotrans.translator._base import BaseTrans
 
 
 class Ali(BaseTrans):
+    credential_params = ('ali_id',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -11,10 +11,12 @@ from videotrans.util import tools
 
 
 class AzureGPT(BaseTrans):
+    credential_params = ('azure_key',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.trans_thread=int(config.settings.get('aitrans_thread',50))
+        self.token_batch=True
         self.prompt = tools.get_prompt(ainame='azure',is_srt=self.is_srt).replace('{lang}', self.target_language_name)
         self._check_proxy()
         self.model_name=config.params["azure_model"]
@@ -36,7 +38,7 @@ class AzureGPT(BaseTrans):
             api_key=config.params["azure_key"],
             api_version=config.params['azure_version'],
             azure_endpoint=config.params["azure_api"],
-            http_client=httpx.Client(proxy=self.proxies)
+            http_client=self._http_client(self.proxies)
         )
         text="\n".join([i.strip() for i in data]) if isinstance(data,list) else data
         message = [
@@ -77,7 +79,7 @@ class AzureGPT(BaseTrans):
             api_key=config.params["azure_key"],
             api_version=config.params['azure_version'],
             azure_endpoint=config.params["azure_api"],
-            http_client=httpx.Client(proxy=self.proxies)
+            http_client=self._http_client(self.proxies)
         )
         message = [
             {'role': 'system',
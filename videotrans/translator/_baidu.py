@@ -3,18 +3,21 @@ import hashlib
 import time
 from typing import Union, List
 
-import requests
-
 from videotrans.configure import config
+from videotrans.configure._except import StatusError, RateLimited
 from videotrans.translator._base import BaseTrans
 from videotrans.util import tools
 
 
 class Baidu(BaseTrans):
+    credential_params = ('baidu_appid',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.aisendsrt=False
+        # 免费标准版 QPS=1
+        self.max_concurrent = 1
+        self.max_qps = 1
 
     def _item_task(self, data: Union[List[str], str]) -> str:
         text = "\n".join(data)
@@ -31,15 +34,18 @@ class Baidu(BaseTrans):
         requrl = f"http://api.fanyi.baidu.com/api/trans/vip/translate?q={text}&from=auto&to={tocode}&appid={config.params['baidu_appid']}&salt={salt}&sign={sign}"
 
         config.logger.info(f'[Baidu]请求数据:{requrl=}')
-        resraw = requests.get(requrl, proxies={"http": "", "https": ""})
+        resraw = self._session().get(requrl, proxies={"http": "", "https": ""})
         if resraw.status_code != 200:
-            raise Exception(f'Baidu status_code={resraw.status_code} {resraw.reason}')
+            raise StatusError(f'Baidu status_code={resraw.status_code} {resraw.reason}', resraw.status_code)
         res = resraw.json()
         config.logger.info(f'[Baidu]返回响应:{res=}')
 
         if "error_code" in res or "trans_result" not in res or len(res['trans_result']) < 1:
             config.logger.info(f'Baidu 返回响应:{resraw}')
-            raise Exception(res['error_msg'])
+            # 54003 为访问频率受限
+            if str(res.get('error_code')) == '54003':
+                raise RateLimited(res.get('error_msg', '54003'))
+            raise Exception(res.get('error_msg', res))
 
         result = [tools.cleartext(tres['dst']) for tres in res['trans_result']]
         if not result or len(result) < 1:
@@ -1,5 +1,7 @@
-import json
+import hashlib
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Union, List
 
@@ -7,11 +9,16 @@ import requests
 
 from videotrans.configure import config
 from videotrans.configure._base import BaseCon
-from videotrans.configure._except import IPLimitExceeded
+from videotrans.configure._scheduler import token_bucket
+from videotrans.configure._except import IPLimitExceeded, RateLimited
+from videotrans.translator._batcher import token_batcher
+from videotrans.translator._cache import trans_cache
 from videotrans.util import tools
 
 
 class BaseTrans(BaseCon):
+    # 存放 api key 等凭据的 config.params 字段，同一凭据的请求共享限流
+    credential_params = ()
 
     def __init__(self,
                  text_list: Union[List, str] = "",
@@ -37,11 +44,16 @@ class BaseTrans(BaseCon):
         self.is_test = is_test
         #
         self.error = ""
-        self.error_code=0
         # 同时翻译字幕条数
         self.trans_thread = int(config.settings.get('trans_thread', 5))
+        # AI翻译渠道设为True，按 token 预算分组，每组条数仅受 aitrans_max_lines 安全上限限制
+        self.token_batch = False
         # 出错重试次数
         self.retry = int(config.settings.get('retries', 2))
+        # 渠道已知的并发上限，例如免费版有 QPS 限制的接口，0=不限制，仅受 trans_concurrent 控制
+        self.max_concurrent = 0
+        # 渠道已知的每秒请求数上限，None=不限制，translation_wait>0 时以其为准
+        self.max_qps = None
         # 每次翻译请求完成后等待秒数
         self.wait_sec = float(config.settings.get('translation_wait', 0))
         # 当前已重试次数
@@ -59,6 +71,9 @@ class BaseTrans(BaseCon):
         self.split_source_text = []
         self.proxies = None
         self.model_name=""
+        # 本次翻译的缓存命中和未命中字幕条数
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     # 发出请求获取内容 data=[text1,text2,text] | text
     def _item_task(self, data: Union[List[str], str]) -> str:
@@ -69,119 +84,73 @@ class BaseTrans(BaseCon):
             return True
         return False
 
-    # 实际操作 # 出错时发送停止信号
+    # 在线翻译占用 network 资源类名额，测试时不占用
     def run(self) -> Union[List, str, None]:
+        try:
+            if self.is_test:
+                return self._run()
+            with config.resource('network'):
+                return self._run()
+        finally:
+            if self.cache_hits or self.cache_misses:
+                config.logger.info(f'{self.__class__.__name__} 翻译缓存命中:{self.cache_hits} 未命中:{self.cache_misses}')
+
+    # 实际操作 # 出错时发送停止信号
+    def _run(self) -> Union[List, str, None]:
         # 开始对分割后的每一组进行处理
         self._signal(text="")
         if self.is_srt:
             source_text = [t['text'] for t in self.text_list] if not self.aisendsrt else self.text_list
-            self.split_source_text = [source_text[i:i + self.trans_thread] for i in  range(0, len(self.text_list), self.trans_thread)]
         else:
             source_text = self.text_list.strip().split("\n")
-            self.split_source_text = [source_text[i:i + self.trans_thread] for i in  range(0, len(source_text), self.trans_thread)]
+        self.split_source_text = self._split_batches(source_text)
 
         if self.is_srt and self.aisendsrt:
             return self.runsrt()
-            """
-            return_raw_list=self.runsrt()
-            if len(return_raw_list)!=len(self.text_list) and self.trans_thread>1:
-                self.trans_thread=1
-                source_text = [t['text'] for t in self.text_list] if not self.aisendsrt else self.text_list
-                self.split_source_text = [source_text[i:i + self.trans_thread] for i in  range(0, len(self.text_list), self.trans_thread)]
-                return_raw_list=self.runsrt()
-            return return_raw_list
-            """
-
-        for i, it in enumerate(self.split_source_text):
-            # 失败后重试 self.retry 次
-            while 1:
-                if self._exit():
-                    return
-                if self.iter_num > self.retry:
-                    msg = f'{"字幕翻译失败" if config.defaulelang == "zh" else " Translation Subtitles error"},{self.error}'
-                    self._signal(text=msg, type="error")
-                    raise Exception(msg)
-
-                self.iter_num += 1
-                if self.iter_num > 1:
-                    if self.error_code==429:
-                        msg='429 超出api每分钟频率限制，暂停60s后重试' if config.defaulelang=='zh' else '429 Exceeded the frequency limit of the api per minute, pause for 60s and retry'
-                        self._signal(text=msg)
-                        if self.inst and self.inst.status_text:
-                            self.inst.status_text=msg
-                        time.sleep(60)
-                    else:
-                        self._signal(
-                            text=f"第{self.iter_num}次出错，{self.wait_sec}s后重试," if config.defaulelang == 'zh' else f'{self.iter_num} retries occurs, {self.wait_sec}s later retry')
-                        time.sleep(self.wait_sec)
-
-                try:
-                    result = self._get_cache(it)
-                    if not result:
-                        result = tools.cleartext(self._item_task(it))
-                        self._set_cache(it, result)
-                    if self.inst and self.inst.precent < 75:
-                        self.inst.precent += 0.01
-                    # 非srt直接break
-                    if not self.is_srt:
-                        self.target_list.append(result)
-                        self.iter_num = 0
-                        self.error = ''
-                        break
-                    sep_res = result.split("\n")
-                    raw_len = len(it)
-                    sep_len = len(sep_res)
-
-                    # 如果返回数量和原始语言数量不一致，则重新切割
-                    '''
-                    if sep_len + 1 < raw_len:
-                        sep_res = []
-                        for it_n in it:
-                            time.sleep(self.wait_sec)
-                            t = self._get_cache(it_n)
-                            if not t:
-                                t = tools.cleartext(self._item_task(it_n))
-                                self._set_cache(it_n, t)
-                            self._signal(
-                                text=t + "\n",
-                                type='subtitle')
-                            sep_res.append(t)
-                    '''
-
-                    for x, result_item in enumerate(sep_res):
-                        if x < len(it):
-                            self.target_list.append(result_item.strip())
-                            self._signal(
-                                text=result_item + "\n",
-                                type='subtitle')
-                            self._signal(
-                                text=config.transobj['starttrans'] + f' {i * self.trans_thread + x + 1} ')
-                    if len(sep_res) < len(it):
-                        tmp = ["" for x in range(len(it) - len(sep_res))]
-                        self.target_list += tmp
-                except requests.exceptions.ProxyError as e:
-                    proxy=None if not self.proxies else f'{list(self.proxies.values())[0]}'
-                    raise Exception(f'代理错误请检查:{proxy=} {e}')
-                except (requests.ConnectionError, requests.exceptions.RetryError, requests.Timeout) as e:
-                    msg=''
-                    if self.api_url:
-                        msg = f'无法连接当前API:{self.api_url} ' if config.defaulelang == 'zh' else f'Check API:{self.api_url} '
-                    raise IPLimitExceeded(msg=msg+str(e), name=self.__class__.__name__)
-                except Exception as e:
-                    self.error = f'{e}'
-                    config.logger.exception(e, exc_info=True)
-                else:
-                    # 成功 未出错
-                    self.error = ''
-                    self.error_code=0
-                    self.iter_num = 0
-                    if self.inst and self.inst.status_text:
-                        self.inst.status_text='字幕翻译中' if config.defaulelang=='zh' else 'Translation of subtitles'
-                finally:
-                    time.sleep(self.wait_sec)
-                if self.iter_num == 0:
-                    # 未出错跳过while
-                    break
+
+        def _translate(it):
+            # 逐条查询缓存，AI渠道有未命中时发送整组以保留上下文，其他渠道仅发送未命中的字幕行
+            cached = self._get_cache(it)
+            if self.token_batch and any(c is None for c in cached):
+                cached = [None] * len(it)
+            misses = [t for t, c in zip(it, cached) if c is None]
+            if misses:
+                start = time.time()
+                miss_res = tools.cleartext(self._item_task(misses)).split("\n")
+                self._batch_feedback(len(misses), len(miss_res), time.time() - start)
+                # 返回行数不一致时二分重发不一致的部分
+                miss_res = self._bisect_lines(misses, miss_res)
+                # 返回行数一致时才能确定对应关系，写入缓存
+                if len(miss_res) == len(misses):
+                    self._set_cache(misses, miss_res)
+                miss_res.reverse()
+                cached = [c if c is not None else (miss_res.pop() if miss_res else "") for c in cached]
+            return "\n".join(cached)
+
+        def _on_result(i, result):
+            it = self.split_source_text[i]
+            if self.inst and self.inst.precent < 75:
+                self.inst.precent += 0.01
+            # 非srt直接返回
+            if not self.is_srt:
+                self.target_list.append(result)
+                return
+            sep_res = result.split("\n")
+            for x, result_item in enumerate(sep_res):
+                if x < len(it):
+                    self.target_list.append(result_item.strip())
+                    self._signal(
+                        text=result_item + "\n",
+                        type='subtitle')
+                    self._signal(
+                        text=config.transobj['starttrans'] + f' {len(self.target_list)} ')
+            if len(sep_res) < len(it):
+                tmp = ["" for x in range(len(it) - len(sep_res))]
+                self.target_list += tmp
+
+        if not self._dispatch(_translate, _on_result,
+                              f'{"字幕翻译失败" if config.defaulelang == "zh" else " Translation Subtitles error"}'):
+            return
         # 恢复原代理设置
         if self.shound_del:
             self._set_proxy(type='del')
@@ -206,70 +175,36 @@ class BaseTrans(BaseCon):
     # 发送完整字幕格式内容进行翻译
     def runsrt(self):
         result_srt_str_list = []
-        for i, it in enumerate(self.split_source_text):
-            # 失败后重试 self.retry 次
-            while 1:
-                if self._exit():
-                    return
-                if self.iter_num > self.retry:
-                    msg = f'{"字幕翻译阶段失败" if config.defaulelang == "zh" else " Translate subtitles error "},{self.error}'
-                    self._signal(text=msg, type="error")
-                    raise Exception(msg)
-
-                self.iter_num += 1
-                if self.iter_num > 1:
-                    if self.error_code==429:
-                        msg='429 超出api每分钟频率限制，暂停60s后重试' if config.defaulelang=='zh' else '429 Exceeded the frequency limit of the api per minute, pause for 60s and retry'
-                        self._signal(text=msg)
-                        if self.inst and self.inst.status_text:
-                            self.inst.status_text=msg
-                        time.sleep(60)
-                    else:
-                        self._signal(
-                            text=f"第{self.iter_num}次出错，{self.wait_sec} s后重试," if config.defaulelang == 'zh' else f'{self.iter_num} retries occurs, {self.wait_sec}s later retry')
-                        time.sleep(self.wait_sec)
-
-                try:
-                    for j,srt in enumerate(it):
-                        srt['text']=srt['text'].strip().replace("\n"," ")
-                        it[j]=srt
-                    srt_str = "\n\n".join(
-                        [f"{srtinfo['line']}\n{srtinfo['time']}\n{srtinfo['text'].strip()}" for srtinfo in it])
-                    result = self._get_cache(srt_str)
-                    if not result:                        
-                        result = tools.cleartext(self._item_task(srt_str))
-                        if not result.strip():
-                            raise Exception('无返回翻译结果' if config.defaulelang == 'zh' else 'Translate result is empty')
-                        self._set_cache(it, result)
-
-                    if self.inst and self.inst.precent < 75:
-                        self.inst.precent += 0.1
-
-                    self._signal(text=result, type='subtitle')
-                    result_srt_str_list.append(result)
-                except requests.exceptions.ProxyError as e:
-                    proxy=None if not self.proxies else f'{list(self.proxies.values())[0]}'
-                    raise Exception(f'代理错误请检查:{proxy=} {e}')
-                except (requests.ConnectionError, requests.Timeout, requests.exceptions.RetryError) as e:
-                    msg=''
-                    if self.api_url:
-                        msg = f'无法连接当前API:{self.api_url} ' if config.defaulelang == 'zh' else f'Check API:{self.api_url} '
-                    raise IPLimitExceeded(msg=msg+str(e), name=self.__class__.__name__)
-                except Exception as e:
-                    self.error = f'{e}'
-                    config.logger.exception(e, exc_info=True)
-                else:
-                    # 成功 未出错
-                    self.error = ''
-                    self.error_code=0
-                    self.iter_num = 0
-                    if self.inst and self.inst.status_text:
-                        self.inst.status_text='字幕翻译中' if config.defaulelang=='zh' else 'Translation of subtitles'
-                finally:
-                    time.sleep(self.wait_sec)
-                if self.iter_num == 0:
-                    # 未出错跳过while
-                    break
+
+        def _translate(it):
+            for j,srt in enumerate(it):
+                srt['text']=srt['text'].strip().replace("\n"," ")
+                it[j]=srt
+            srt_str = self._srt_str(it)
+            # 整组字幕均命中缓存时直接组装，否则发送整组以保留上下文
+            cached = self._get_cache([srtinfo['text'] for srtinfo in it])
+            if all(c is not None for c in cached):
+                return "\n\n".join(
+                    [f"{srtinfo['line']}\n{srtinfo['time']}\n{c}" for srtinfo, c in zip(it, cached)])
+            start = time.time()
+            result = tools.cleartext(self._item_task(srt_str))
+            self._batch_feedback(len(it), result.count('-->'), time.time() - start)
+            if not result.strip():
+                raise Exception('无返回翻译结果' if config.defaulelang == 'zh' else 'Translate result is empty')
+            # 返回条数不一致时二分重发不一致的部分
+            result = self._bisect_srt(it, result)
+            self._set_srt_cache(it, result)
+            return result
+
+        def _on_result(i, result):
+            if self.inst and self.inst.precent < 75:
+                self.inst.precent += 0.1
+            self._signal(text=result, type='subtitle')
+            result_srt_str_list.append(result)
+
+        if not self._dispatch(_translate, _on_result,
+                              f'{"字幕翻译阶段失败" if config.defaulelang == "zh" else " Translate subtitles error "}'):
+            return
 
         # 恢复原代理设置
         if self.shound_del:
@@ -297,6 +232,174 @@ class BaseTrans(BaseCon):
 
 
 
+    def _srt_str(self, it):
+        return "\n\n".join(
+            [f"{srtinfo['line']}\n{srtinfo['time']}\n{srtinfo['text'].strip()}" for srtinfo in it])
+
+    # 修复时的单次请求，同样受限流控制
+    def _send_part(self, data):
+        bucket = getattr(self, '_dispatch_bucket', None)
+        if bucket and not bucket.acquire(stop=self._is_stop_dispatch):
+            raise Exception('stop')
+        return tools.cleartext(self._item_task(data))
+
+    # 返回行数和发送行数不一致时，一分为二分别重发，仅对仍不一致的一半继续二分，直到单行
+    # 单行仍返回多行时合并为一行
+    def _bisect_lines(self, lines, res):
+        if len(res) == len(lines):
+            return res
+        if len(lines) == 1:
+            return [" ".join(r.strip() for r in res if r.strip())]
+        config.logger.info(f'[{self.__class__.__name__}] 发送{len(lines)}行返回{len(res)}行，二分重发')
+        mid = len(lines) // 2
+        left, right = lines[:mid], lines[mid:]
+        return self._bisect_lines(left, self._send_part(left).split("\n")) + self._bisect_lines(right, self._send_part(right).split("\n"))
+
+    # 同上，以返回的字幕条数判断是否一致，单条时丢弃行号和时间行后按原行号时间重建
+    def _bisect_srt(self, it, result):
+        if result.count('-->') == len(it):
+            return result
+        if len(it) == 1:
+            text = " ".join(t.strip() for t in result.split("\n") if t.strip() and not t.strip().isdigit() and t.find('-->') == -1)
+            return f"{it[0]['line']}\n{it[0]['time']}\n{text}"
+        config.logger.info(f'[{self.__class__.__name__}] 发送{len(it)}条字幕返回{result.count("-->")}条，二分重发')
+        mid = len(it) // 2
+        left, right = it[:mid], it[mid:]
+        return self._bisect_srt(left, self._send_part(self._srt_str(left))) + "\n\n" + self._bisect_srt(right, self._send_part(self._srt_str(right)))
+
+    # 分组，AI渠道按 token 预算，其他按 trans_thread 条数
+    def _split_batches(self, source_text):
+        if not self.token_batch or self.is_test:
+            return [source_text[i:i + self.trans_thread] for i in range(0, len(source_text), self.trans_thread)]
+        items = [(it, f"{it['line']}\n{it['time']}\n{it['text']}" if isinstance(it, dict) else it) for it in source_text]
+        return token_batcher.split(
+            items,
+            key=self._batch_key(),
+            model_name=self.model_name,
+            prompt=self._refine3_prompt() if self.refine3 else getattr(self, 'prompt', ''),
+            max_output=self._max_output_tokens(),
+            max_lines=int(float(config.settings.get('aitrans_max_lines', 500))),
+            # refine3 会输出三个步骤的结果
+            expansion=3.5 if self.refine3 else 1.5)
+
+    def _batch_key(self):
+        return f'{self.__class__.__name__}-{self.model_name}'
+
+    # 请求中的 max_tokens，子类按实际设置覆盖
+    def _max_output_tokens(self):
+        return 4096
+
+    def _batch_feedback(self, sent, got, seconds):
+        if self.token_batch and not self.is_test:
+            token_batcher.feedback(self._batch_key(), sent=sent, got=got, seconds=seconds)
+
+    # 各组字幕并发发送，同时进行的组数不超过 trans_concurrent 及渠道的 max_concurrent，结果按原顺序交给 on_result(i, result)
+    # 同一渠道接口的同一凭据共享令牌桶限流，translation_wait>0 时即每 translation_wait 秒最多一次请求，否则按渠道的 max_qps
+    # 返回 False 表示已停止
+    def _dispatch(self, fn, on_result, fail_msg) -> bool:
+        total = len(self.split_source_text)
+        if total < 1:
+            return True
+        window = 1 if self.is_test else max(1, min(int(float(config.settings.get('trans_concurrent', 3))), total))
+        if self.max_concurrent > 0:
+            window = min(window, self.max_concurrent)
+        bucket = token_bucket(self._limiter_key(), 1 / self.wait_sec if self.wait_sec > 0 else self.max_qps)
+        self._dispatch_stop = False
+        self._dispatch_bucket = bucket
+        results = {}
+        next_i = 0
+        pool = ThreadPoolExecutor(max_workers=window)
+        futures = {pool.submit(self._run_batch, fn, it, bucket, fail_msg): i for i, it in enumerate(self.split_source_text)}
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    return False
+                results[futures[future]] = result
+                # 按顺序输出已完成的连续各组
+                while next_i in results:
+                    on_result(next_i, results.pop(next_i))
+                    next_i += 1
+        finally:
+            self._dispatch_stop = True
+            pool.shutdown(wait=False, cancel_futures=True)
+        return True
+
+    # 限流按凭据区分，不同 api key 各自计算
+    def _limiter_key(self):
+        credential = "|".join(str(config.params.get(k, '')) for k in self.credential_params)
+        return f'{self.__class__.__name__}-{self.api_url}-{hashlib.md5(credential.encode("utf-8")).hexdigest()[:12] if credential else ""}'
+
+    def _is_stop_dispatch(self):
+        return self._dispatch_stop or self._exit()
+
+    # 翻译单组字幕，失败后指数退避加随机抖动重试 self.retry 次，停止时返回 None
+    # 各组并发执行，错误信息和是否限流只保存在本组内
+    def _run_batch(self, fn, it, bucket, fail_msg):
+        attempt = 0
+        rate_limited = False
+        error = ''
+        while 1:
+            if self._is_stop_dispatch():
+                return None
+            if attempt > self.retry:
+                self.error = error
+                msg = f'{fail_msg},{error}'
+                self._signal(text=msg, type="error")
+                raise Exception(msg)
+            if attempt > 0:
+                delay = min(60.0, (10 if rate_limited else max(1.0, self.wait_sec)) * 2 ** (attempt - 1)) + random.random()
+                if rate_limited:
+                    msg = f'429 超出api频率限制，{delay:.0f}s后重试' if config.defaulelang == 'zh' else f'429 Exceeded the frequency limit of the api, retry after {delay:.0f}s'
+                else:
+                    msg = f"第{attempt + 1}次出错，{delay:.0f}s后重试," if config.defaulelang == 'zh' else f'{attempt + 1} retries occurs, {delay:.0f}s later retry'
+                self._signal(text=msg)
+                if self.inst and self.inst.status_text:
+                    self.inst.status_text = msg
+                end = time.time() + delay
+                while time.time() < end:
+                    if self._is_stop_dispatch():
+                        return None
+                    time.sleep(min(1, end - time.time()))
+            attempt += 1
+            if not bucket.acquire(stop=self._is_stop_dispatch):
+                return None
+            try:
+                result = fn(it)
+            except requests.exceptions.ProxyError as e:
+                proxy=None if not self.proxies else f'{list(self.proxies.values())[0]}'
+                raise Exception(f'代理错误请检查:{proxy=} {e}')
+            except (requests.ConnectionError, requests.exceptions.RetryError, requests.Timeout) as e:
+                msg=''
+                if self.api_url:
+                    msg = f'无法连接当前API:{self.api_url} ' if config.defaulelang == 'zh' else f'Check API:{self.api_url} '
+                raise IPLimitExceeded(msg=msg+str(e), name=self.__class__.__name__)
+            except Exception as e:
+                error = f'{e}'
+                config.logger.exception(e, exc_info=True)
+                rate_limited = self._is_rate_limited(e)
+                if rate_limited:
+                    bucket.slow_down()
+                continue
+            # 成功 未出错
+            bucket.recover()
+            if self.inst and self.inst.status_text:
+                self.inst.status_text='字幕翻译中' if config.defaulelang=='zh' else 'Translation of subtitles'
+            return result
+
+    # 根据异常类型或 HTTP 状态码判断是否限流，不匹配错误文字
+    # 各 SDK 的限流错误码：google api_core 为 429，腾讯云为 RequestLimitExceeded，阿里云为 Throttling.*
+    def _is_rate_limited(self, e):
+        if isinstance(e, RateLimited):
+            return True
+        status = getattr(e, 'status_code', None) or getattr(getattr(e, 'response', None), 'status_code', None)
+        if status == 429:
+            return True
+        code = getattr(e, 'code', None)
+        if code == 429:
+            return True
+        return isinstance(code, str) and (code.startswith('RequestLimitExceeded') or code.startswith('Throttling'))
+
     def _refine3_prompt(self):
         glossary=''
         if Path(config.ROOT_DIR+'/videotrans/glossary.txt').exists():
@@ -314,25 +417,57 @@ class BaseTrans(BaseCon):
         
         return prompt
 
-    def _set_cache(self, it, res_str):
-        if not res_str.strip():
-            return
-        key_cache = self._get_key(it)
+    # 提示词模板参与缓存键，修改提示词后不再使用旧结果
+    def _cache_engine(self):
+        engine = getattr(self, '_cache_engine_str', None)
+        if engine is None:
+            prompt = self._refine3_prompt() if self.refine3 else getattr(self, 'prompt', '')
+            prompt_hash = hashlib.md5(prompt.encode('utf-8')).hexdigest()[:12] if prompt else ''
+            engine = f'{self.__class__.__name__}-{self.api_url}-{self.refine3}-{prompt_hash}'
+            self._cache_engine_str = engine
+        return engine
 
-        file_cache = config.TEMP_DIR + f'/translate_cache/{key_cache}.txt'
-        if not Path(config.TEMP_DIR + f'/translate_cache').is_dir():
-            Path(config.TEMP_DIR + f'/translate_cache').mkdir(parents=True, exist_ok=True)
-        Path(file_cache).write_text(res_str, encoding='utf-8')
+    def _cache_key(self, text, source=None):
+        return trans_cache.key(
+            engine=self._cache_engine(),
+            model=self.model_name,
+            source=self.source_code if source is None else source,
+            target=self.target_code or self.target_language_name,
+            text=text)
+
+    # 与 lines 一一对应，未命中为 None，空行直接返回空字符串
+    # 原始语言已明确时，未命中的再查找以 auto 翻译的结果，例如识别时尚未检测出语言的边识别边翻译
+    def _get_cache(self, lines: List[str]) -> List[Union[str, None]]:
+        if self.is_test:
+            return [None] * len(lines)
+        keys = [self._cache_key(t) if t.strip() else None for t in lines]
+        found = trans_cache.get_many([k for k in keys if k])
+        res = [found.get(k) if k else "" for k in keys]
+        if self.source_code and self.source_code != 'auto' and any(r is None for r in res):
+            auto_keys = {i: self._cache_key(t, source='auto') for i, t in enumerate(lines) if res[i] is None}
+            auto_found = trans_cache.get_many(list(auto_keys.values()))
+            for i, k in auto_keys.items():
+                res[i] = auto_found.get(k)
+        self.cache_hits += len([r for k, r in zip(keys, res) if k and r is not None])
+        self.cache_misses += len([r for k, r in zip(keys, res) if k and r is None])
+        return res
 
-    def _get_cache(self, it):
+    def _set_cache(self, lines: List[str], results: List[str]):
         if self.is_test:
-            return None
-        key_cache = self._get_key(it)
-        file_cache = config.TEMP_DIR + f'/translate_cache/{key_cache}.txt'
-        if Path(file_cache).exists():
-            return Path(file_cache).read_text(encoding='utf-8')
-        return None
-
-    def _get_key(self, it):
-        Path(config.TEMP_DIR + '/translate_cache').mkdir(parents=True, exist_ok=True)
-        return tools.get_md5(f'{self.__class__.__name__}-{self.api_url}-{self.trans_thread}-{self.retry}-{self.wait_sec}-{self.iter_num}-{self.is_srt}-{self.aisendsrt}-{self.refine3}-{self.proxies}-{self.model_name}-{self.source_code}-{self.target_code}-{it if isinstance(it, str) else json.dumps(it)}')
+            return
+        target = self.target_code or self.target_language_name
+        trans_cache.put_many([
+            (self._cache_key(t), self._cache_engine(), self.model_name, self.source_code, target, t, r.strip())
+            for t, r in zip(lines, results) if t.strip()
+        ])
+
+    # 完整字幕格式的返回结果，条数一致时逐条写入缓存
+    def _set_srt_cache(self, it, result):
+        try:
+            raws = tools.get_subtitle_from_srt(result, is_file=False)
+        except Exception:
+            return
+        if len(raws) != len(it):
+            return
+        # 保留完整的多行译文，取用时与未命中时同样由 runsrt 统一处理
+        self._set_cache([srtinfo['text'] for srtinfo in it], [t['text'].strip() for t in raws])
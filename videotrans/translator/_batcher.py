@@ -0,0 +1,112 @@
+import re
+import threading
+
+from videotrans.configure import config
+
+
+class TokenBatcher:
+    """
+    AI翻译渠道按 token 预算分组，代替固定的 aitrans_thread 条数
+    每组输入 token 不超过 (上下文窗口 - 提示词 - 输出上限) 和 输出上限/膨胀系数 中的较小者，aitrans_max_lines 仅作为每组条数的安全上限
+    按渠道+模型记录缩放系数，返回行数不足(疑似截断)或耗时过长时缩小，顺利时逐步恢复，同一进程内后续任务共享
+    """
+
+    # 模型名包含关键字时对应的上下文窗口大小，按顺序匹配
+    context_windows = [
+        ('gpt-3.5', 16385),
+        ('gpt-4o', 128000),
+        ('gpt-4-turbo', 128000),
+        ('gpt-4.1', 1000000),
+        ('gpt-4', 8192),
+        ('o1', 128000),
+        ('o3', 200000),
+        ('o4', 200000),
+        ('claude', 200000),
+        ('gemini', 1000000),
+        ('deepseek', 64000),
+        ('qwen', 32768),
+        ('glm', 128000),
+        ('moonshot', 128000),
+        ('doubao', 32768),
+    ]
+    # 未知模型，例如本地大模型
+    default_window = 8192
+    min_scale = 0.1
+    # 单组耗时超过该秒数时缩小分组
+    slow_seconds = 90
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scale = {}
+
+    # 本地粗略估算 token 数：中日韩等字符每字约1个，其他按每4个字符1个
+    def estimate(self, text):
+        if not text:
+            return 0
+        cjk = len(re.findall(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]', text))
+        return cjk + (len(text) - cjk + 3) // 4
+
+    def context_window(self, model_name):
+        model_name = str(model_name).lower()
+        for k, v in self.context_windows:
+            if model_name.find(k) > -1:
+                return v
+        return self.default_window
+
+    def scale(self, key):
+        with self._lock:
+            return self._scale.get(key, 1.0)
+
+    def budget(self, *, key, model_name, prompt, max_output, expansion=1.5):
+        """
+        每组可用的输入 token 数
+        prompt: 发送时的完整提示词(含术语表)，max_output: 请求中的 max_tokens
+        expansion: 输出 token 相对输入的膨胀系数
+        """
+        custom = int(float(config.settings.get('aitrans_token_budget', 0)))
+        if custom > 0:
+            limit = custom
+        else:
+            # 预留 10% 余量给估算误差
+            window = self.context_window(model_name) - self.estimate(prompt) - max_output
+            limit = int(min(window, max_output / expansion) * 0.9)
+        return max(64, int(limit * self.scale(key)))
+
+    def split(self, items, *, key, model_name, prompt, max_output, max_lines, expansion=1.5):
+        """
+        items: [(item, text)]，text 为该条发送时的文字，返回 [[item,...],...]
+        单条超过预算时独占一组
+        """
+        budget = self.budget(key=key, model_name=model_name, prompt=prompt, max_output=max_output, expansion=expansion)
+        max_lines = max(1, max_lines)
+        groups = []
+        cur = []
+        cur_tokens = 0
+        for item, text in items:
+            # 换行符也计入
+            tokens = self.estimate(text) + 1
+            if cur and (cur_tokens + tokens > budget or len(cur) >= max_lines):
+                groups.append(cur)
+                cur = []
+                cur_tokens = 0
+            cur.append(item)
+            cur_tokens += tokens
+        if cur:
+            groups.append(cur)
+        config.logger.info(f'[{key}] token预算:{budget} 共{len(items)}条 分为{len(groups)}组')
+        return groups
+
+    # 根据单组结果调整缩放系数，sent/got 为发送和返回的条数
+    def feedback(self, key, *, sent, got, seconds):
+        with self._lock:
+            scale = self._scale.get(key, 1.0)
+            if got < sent:
+                scale *= 0.7
+            elif seconds > self.slow_seconds:
+                scale *= 0.85
+            else:
+                scale = min(1.0, scale * 1.05)
+            self._scale[key] = max(self.min_scale, scale)
+
+
+token_batcher = TokenBatcher()
@@ -0,0 +1,119 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+
+from videotrans.configure import config
+
+
+class TransCache:
+    """
+    字幕翻译结果持久缓存，单个 sqlite 文件 CACHE_DIR/translate.db，多个任务和线程共享
+    以单条字幕为粒度，键为 (渠道, 模型, 原始语言, 目标语言, 规范化原文)
+    超过 trans_cache_days 天未使用的删除，条数超过 trans_cache_rows 时删除最久未用的
+    """
+
+    # 每写入多少条检查一次过期和容量
+    evict_every = 200
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+        self._file = config.CACHE_DIR + '/translate.db'
+        self._inited = False
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._file, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with self._lock:
+                if not self._inited:
+                    conn.execute(
+                        'CREATE TABLE IF NOT EXISTS trans (key TEXT PRIMARY KEY, engine TEXT, model TEXT, source TEXT, target TEXT, text TEXT, result TEXT, created REAL, accessed REAL)')
+                    conn.execute('CREATE INDEX IF NOT EXISTS idx_accessed ON trans (accessed)')
+                    conn.commit()
+                    self._inited = True
+            self._local.conn = conn
+        return conn
+
+    @property
+    def enabled(self):
+        return int(float(config.settings.get('trans_cache_rows', 100000))) > 0
+
+    def _normalize(self, text):
+        return re.sub(r'\s+', ' ', text).strip()
+
+    def key(self, *, engine, model, source, target, text):
+        return hashlib.md5(
+            '\x1f'.join([str(engine), str(model), str(source), str(target), self._normalize(text)]).encode('utf-8')).hexdigest()
+
+    # 批量查询，返回 {key: result}，仅包含命中的
+    def get_many(self, keys):
+        if not self.enabled or not keys:
+            return {}
+        keys = list(set(keys))
+        found = {}
+        try:
+            conn = self._conn()
+            expire = time.time() - self._ttl() if self._ttl() != float('inf') else 0
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                rows = conn.execute(
+                    f'SELECT key, result FROM trans WHERE accessed>? AND key IN ({",".join("?" * len(part))})',
+                    [expire, *part]).fetchall()
+                found.update(dict(rows))
+            if found:
+                conn.executemany('UPDATE trans SET accessed=? WHERE key=?', [(time.time(), k) for k in found])
+                conn.commit()
+        except Exception as e:
+            config.logger.exception(e, exc_info=True)
+            return {}
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    # rows: [(key, engine, model, source, target, text, result)]
+    def put_many(self, rows):
+        rows = [r for r in rows if r[-1] and r[-1].strip()]
+        if not self.enabled or not rows:
+            return
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.executemany(
+                'INSERT OR REPLACE INTO trans (key, engine, model, source, target, text, result, created, accessed) VALUES (?,?,?,?,?,?,?,?,?)',
+                [(*r, now, now) for r in rows])
+            conn.commit()
+            with self._lock:
+                self._puts += len(rows)
+                should_evict = self._puts >= self.evict_every
+                if should_evict:
+                    self._puts = 0
+            if should_evict:
+                self._evict(conn)
+        except Exception as e:
+            config.logger.exception(e, exc_info=True)
+
+    def _ttl(self):
+        days = float(config.settings.get('trans_cache_days', 30))
+        return days * 86400 if days > 0 else float('inf')
+
+    def _evict(self, conn):
+        if self._ttl() != float('inf'):
+            conn.execute('DELETE FROM trans WHERE accessed<?', (time.time() - self._ttl(),))
+        max_rows = int(float(config.settings.get('trans_cache_rows', 100000)))
+        total = conn.execute('SELECT COUNT(*) FROM trans').fetchone()[0]
+        if total > max_rows:
+            conn.execute(
+                'DELETE FROM trans WHERE key IN (SELECT key FROM trans ORDER BY accessed ASC LIMIT ?)',
+                (total - max_rows,))
+        conn.commit()
+
+
+trans_cache = TransCache()
@@ -3,7 +3,7 @@ import re
 from pathlib import Path
 from typing import Union, List
 
-import httpx,requests
+import requests
 from openai import OpenAI, APIConnectionError, APIError
 
 from videotrans.configure import config
@@ -12,10 +12,12 @@ from videotrans.util import tools
 
 
 class ChatGPT(BaseTrans):
+    credential_params = ('chatgpt_key',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.trans_thread=int(config.settings.get('aitrans_thread',50))
+        self.token_batch=True
         self.api_url = self._get_url(config.params['chatgpt_api'])
         if not config.params['chatgpt_key']:
             raise Exception('必须在翻译设置 - OpenAI ChatGPT 填写 SK' if config.defaulelang=='zh' else 'please input your sk password')
@@ -53,6 +55,11 @@ class ChatGPT(BaseTrans):
             return url + "/v1"
         return url
 
+    def _max_output_tokens(self):
+        if self.refine3 or not config.params.get('chatgpt_max_token'):
+            return 4096
+        return int(config.params.get('chatgpt_max_token'))
+
     def _item_task(self, data: Union[List[str], str]) -> str:
         if self.refine3:
             return self._item_task_refine3(data)
@@ -68,7 +75,7 @@ class ChatGPT(BaseTrans):
 
         config.logger.info(f"\n[chatGPT]发送请求数据:{message=}")
         model = OpenAI(api_key=config.params['chatgpt_key'], base_url=self.api_url,
-                       http_client=httpx.Client(proxy=self.proxies,timeout=7200))
+                       http_client=self._http_client(self.proxies, 7200))
         try:
             response = model.chat.completions.create(
                 model='gpt-4o-mini' if config.params['chatgpt_model'].lower().find('gpt-3.5') > -1 else config.params['chatgpt_model'],
@@ -114,7 +121,7 @@ class ChatGPT(BaseTrans):
 
         config.logger.info(f"\n[chatGPT]发送请求数据:{message=}")
         model = OpenAI(api_key=config.params['chatgpt_key'], base_url=self.api_url,
-                       http_client=httpx.Client(proxy=self.proxies,timeout=7200))
+                       http_client=self._http_client(self.proxies, 7200))
         try:
             response = model.chat.completions.create(
                 model=config.params['chatgpt_model'],
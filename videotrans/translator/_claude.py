@@ -3,17 +3,20 @@ import re
 from typing import Union, List
 
 import anthropic
-import httpx
+
 from videotrans.configure import config
+from videotrans.configure._except import RateLimited
 from videotrans.translator._base import BaseTrans
 from videotrans.util import tools
 
 
 class Claude(BaseTrans):
+    credential_params = ('claude_key',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.trans_thread=int(config.settings.get('aitrans_thread',50))
+        self.token_batch=True
         self.api_url = self._get_url(config.params['claude_api'])
         if not config.params['claude_key']:
             raise Exception('必须在翻译设置 - Claude API 填写 SK' if config.defaulelang=='zh' else 'please input your sk password')
@@ -44,6 +47,9 @@ class Claude(BaseTrans):
 
         return url
 
+    def _max_output_tokens(self):
+        return 2000
+
     def _item_task(self, data: Union[List[str], str]) -> str:
         if self.refine3:
             return self._item_task_refine3(data)
@@ -65,7 +71,7 @@ class Claude(BaseTrans):
         client = anthropic.Anthropic(
             base_url=self._get_url(),
             api_key=config.params['claude_key'],
-            http_client=httpx.Client(proxy=self.proxies)
+            http_client=self._http_client(self.proxies)
         )
         try:
             response = client.messages.create(
@@ -81,8 +87,7 @@ class Claude(BaseTrans):
             raise Exception("The server could not be reached" if config.defaulelang!='zh' else '服务器无法访问,请尝试使用代理')
         except anthropic.RateLimitError as e:
             config.logger.exception(e,exc_info=True)
-            self.error_code=429
-            raise Exception("Too many requests, please try again later" if config.defaulelang!='zh' else '429,请求次数过多,请稍后再试或调大翻译后暂停秒数')
+            raise RateLimited("Too many requests, please try again later" if config.defaulelang!='zh' else '429,请求次数过多,请稍后再试或调大翻译后暂停秒数')
         except anthropic.APIStatusError as e:
             config.logger.exception(e,exc_info=True)
             raise Exception(f"{e}" if config.defaulelang!='zh' else f'{e}')
@@ -124,7 +129,7 @@ class Claude(BaseTrans):
         client = anthropic.Anthropic(
             base_url=self._get_url(),
             api_key=config.params['claude_key'],
-            proxies=self.proxies
+            http_client=self._http_client(self.proxies)
         )
         try:
             response = client.messages.create(
@@ -140,8 +145,7 @@ class Claude(BaseTrans):
             raise Exception("The server could not be reached" if config.defaulelang != 'zh' else '服务器无法访问,请尝试使用代理')
         except anthropic.RateLimitError as e:
             config.logger.exception(e, exc_info=True)
-            self.error_code = 429
-            raise Exception(
+            raise RateLimited(
                 "Too many requests, please try again later" if config.defaulelang != 'zh' else '429,请求次数过多,请稍后再试或调大翻译后暂停秒数')
         except anthropic.APIStatusError as e:
             config.logger.exception(e, exc_info=True)
@@ -10,6 +10,7 @@ from videotrans.translator._base import BaseTrans
 
 
 class DeepL(BaseTrans):
+    credential_params = ('deepl_authkey',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -3,14 +3,14 @@ import json
 import re
 from typing import Union, List
 
-import requests
-
 from videotrans.configure import config
+from videotrans.configure._except import StatusError
 from videotrans.translator._base import BaseTrans
 from videotrans.util import tools
 
 
 class DeepLX(BaseTrans):
+    credential_params = ('deeplx_key',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -49,9 +49,9 @@ class DeepLX(BaseTrans):
             "target_lang": target_code
         }
         config.logger.info(f'[DeepLX]发送请求数据,{jsondata=}')
-        response = requests.post(url=self.api_url, json=jsondata, proxies=self.proxies)
+        response = self._session().post(url=self.api_url, json=jsondata, proxies=self.proxies)
         if response.status_code != 200:
-            raise Exception(f'DeepLx: status_code={response.status_code} {response.reason} {response.text}')
+            raise StatusError(f'DeepLx: status_code={response.status_code} {response.reason} {response.text}', response.status_code)
         config.logger.info(f'[DeepLX]返回响应,{response.text=}')
         try:
             result = response.json()
@@ -16,6 +16,7 @@ class FreeAI(BaseTrans):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.trans_thread=int(config.settings.get('aitrans_thread',50))
+        self.token_batch=True
        
         
         # 是srt则获取srt的提示词
@@ -98,6 +99,7 @@ class FreeAI(BaseTrans):
 
 
 class FreeAIGLM(FreeAI):
+    credential_params = ('zhipu_key',)
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.model_name="glm-4-flash"
@@ -105,6 +107,7 @@ class FreeAIGLM(FreeAI):
         self.api_key=config.params.get('zhipu_key','')
 
 class FreeAIQWEN(FreeAI):
+    credential_params = ('guiji_key',)
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.model_name="Qwen/Qwen2.5-7B-Instruct"
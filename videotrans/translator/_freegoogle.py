@@ -4,9 +4,8 @@ import time
 from typing import Union, List
 from urllib.parse import quote
 
-import requests
-
 from videotrans.configure import config
+from videotrans.configure._except import StatusError
 from videotrans.translator._base import BaseTrans
 from videotrans.util import tools
 
@@ -29,14 +28,14 @@ class FreeGoogle(BaseTrans):
             'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Mobile/15E148 Safari/604.1'
         }
 
-        response = requests.get(url, headers=headers, timeout=300, proxies=self.proxies, verify=False)
+        response = self._session().get(url, headers=headers, timeout=300, proxies=self.proxies, verify=False)
         config.logger.info(f'[Google]返回数据:{response.text=}')
         if response.status_code == 429:
             self._signal(text='Google 429 hold on retry')
             time.sleep(random.randint(1, 5))
             return self._item_task_srt(data)
         if response.status_code != 200:
-            raise Exception(f'status_code={response.status_code},{response.reason}')
+            raise StatusError(f'status_code={response.status_code},{response.reason}', response.status_code)
 
         re_result=re.search(r'<div\s+class=\Wresult-container\W>([^<]+?)<',response.text)
         if not re_result or len(re_result.groups())<1:
@@ -52,14 +51,14 @@ class FreeGoogle(BaseTrans):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=300, proxies=self.proxies)
+        response = self._session().get(url, headers=headers, timeout=300, proxies=self.proxies)
         config.logger.info(f'[Google]返回数据:{response.text=}')
         if response.status_code == 429:
             self._signal(text='Google 429 hold on retry')
             time.sleep(random.randint(1, 5))
             return self._item_task(data)
         if response.status_code != 200:
-            raise Exception(f'status_code={response.status_code},{response.reason}')
+            raise StatusError(f'status_code={response.status_code},{response.reason}', response.status_code)
 
         re_result = response.json()
         if len(re_result[0]) < 1:
@@ -2,6 +2,7 @@
 
 import re
 import socket
+import threading
 from typing import Union, List
 import requests
 import google
@@ -9,9 +10,13 @@ import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 from google.api_core.exceptions import ServerError,TooManyRequests,RetryError
 from videotrans.configure import config
+from videotrans.configure._except import RateLimited
 from videotrans.translator._base import BaseTrans
 from videotrans.util import tools
 
+# genai.configure 设置的 api_key 为进程全局，各组并发翻译时需持有该锁直到请求完成，避免使用了其他线程轮换的 key
+genai_lock = threading.Lock()
+
 safetySettings = {
     'HATE': 'BLOCK_NONE',
     'HARASSMENT': 'BLOCK_NONE',
@@ -22,16 +27,21 @@ safetySettings = {
 
 # 代理修改  site-packages\google\ai\generativelanguage_v1beta\services\generative_service\transports\grpc_asyncio.py __init__方法的 options 添加 ("grpc.http_proxy",os.environ.get('http_proxy') or os.environ.get('https_proxy'))
 class Gemini(BaseTrans):
+    credential_params = ('gemini_key',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.trans_thread=int(config.settings.get('aitrans_thread',50))
+        self.token_batch=True
         self._set_proxy(type='set')
         self.prompt = tools.get_prompt(ainame='gemini',is_srt=self.is_srt).replace('{lang}', self.target_language_name)
         self.model_name=config.params["gemini_model"]
 
         self.api_keys=config.params.get('gemini_key','').strip().split(',')
         
+    def _max_output_tokens(self):
+        return 8192
+
     def _item_task(self, data: Union[List[str], str]) -> str:
         if self.refine3:
             return self._item_task_refine3(data)
@@ -39,16 +49,17 @@ class Gemini(BaseTrans):
             response = None
             text="\n".join([i.strip() for i in data]) if isinstance(data,list) else data
             message = self.prompt.replace('<INPUT></INPUT>',f'<INPUT>{text}</INPUT>')
-            api_key=self.api_keys.pop(0)
-            self.api_keys.append(api_key)
-            config.logger.info(f'[Gemini]请求发送:{api_key=},{config.params["gemini_model"]=}')
-            genai.configure(api_key=api_key)
-            
-            model = genai.GenerativeModel(model_name=config.params['gemini_model'],generation_config={"max_output_tokens": 8192},system_instruction="You are a translation assistant specializing in converting SRT subtitle content from one language to another while maintaining the original format and structure." if config.defaulelang != 'zh' else '您是一名翻译助理，专门负责将 SRT 字幕内容从一种语言转换为另一种语言，同时保持原始格式和结构。')
-            response = model.generate_content(
-                message,
-                safety_settings=safetySettings
-            )
+            with genai_lock:
+                api_key=self.api_keys.pop(0)
+                self.api_keys.append(api_key)
+                config.logger.info(f'[Gemini]请求发送:{api_key=},{config.params["gemini_model"]=}')
+                genai.configure(api_key=api_key)
+
+                model = genai.GenerativeModel(model_name=config.params['gemini_model'],generation_config={"max_output_tokens": 8192},system_instruction="You are a translation assistant specializing in converting SRT subtitle content from one language to another while maintaining the original format and structure." if config.defaulelang != 'zh' else '您是一名翻译助理，专门负责将 SRT 字幕内容从一种语言转换为另一种语言，同时保持原始格式和结构。')
+                response = model.generate_content(
+                    message,
+                    safety_settings=safetySettings
+                )
 
             result = response.text      
             config.logger.info(f'[Gemini]返回:{result=}')
@@ -59,14 +70,14 @@ class Gemini(BaseTrans):
                 return match.group(1)
             return response.text.strip()
         except TooManyRequests as e:
-            raise Exception('429超过请求次数，请尝试更换其他Gemini模型后重试' if config.defaulelang=='zh' else 'Too many requests, use other model retry')
+            raise RateLimited('429超过请求次数，请尝试更换其他Gemini模型后重试' if config.defaulelang=='zh' else 'Too many requests, use other model retry')
         except (ServerError,RetryError,socket.timeout) as e:
             error=str(e) if config.defaulelang !='zh' else '无法连接到Gemini,请尝试使用或更换代理或切换模型'
             raise requests.ConnectionError(error)
         except google.api_core.exceptions.PermissionDenied:
             raise Exception('您无权访问所请求的资源或模型' if config.defaulelang =='zh' else 'You donot have permission for the requested resource')
         except google.api_core.exceptions.ResourceExhausted:                
-            raise Exception(f'您的配额已用尽。请稍等片刻，然后重试,若仍如此，请查看Google账号 ' if config.defaulelang =='zh' else 'Your quota is exhausted. Please wait a bit and try again')
+            raise RateLimited(f'您的配额已用尽。请稍等片刻，然后重试,若仍如此，请查看Google账号 ' if config.defaulelang =='zh' else 'Your quota is exhausted. Please wait a bit and try again')
         except google.auth.exceptions.DefaultCredentialsError:                
             raise Exception(f'验证失败，可能 Gemini API Key 不正确 ' if config.defaulelang =='zh' else 'Authentication fails. Please double-check your API key and try again')
         except google.api_core.exceptions.InvalidArgument as e:
@@ -135,14 +146,15 @@ class Gemini(BaseTrans):
 
         response = None
         try:
-            api_key=self.api_keys.pop(0)
-            self.api_keys.append(api_key)
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel(config.params['gemini_model'], safety_settings=safetySettings)
-            response = model.generate_content(
-                prompt,
-                safety_settings=safetySettings
-            )
+            with genai_lock:
+                api_key=self.api_keys.pop(0)
+                self.api_keys.append(api_key)
+                genai.configure(api_key=api_key)
+                model = genai.GenerativeModel(config.params['gemini_model'], safety_settings=safetySettings)
+                response = model.generate_content(
+                    prompt,
+                    safety_settings=safetySettings
+                )
             config.logger.info(f'[Gemini]请求发送:{prompt=}')
 
             config.logger.info(f'[Gemini]返回:{response.text=}')
@@ -153,14 +165,14 @@ class Gemini(BaseTrans):
                 return match.group(1)
             return response.text.strip()
         except TooManyRequests as e:
-            raise Exception('429超过请求次数，请尝试更换其他Gemini模型后重试' if config.defaulelang=='zh' else 'Too many requests, use other model retry')
+            raise RateLimited('429超过请求次数，请尝试更换其他Gemini模型后重试' if config.defaulelang=='zh' else 'Too many requests, use other model retry')
         except (ServerError,RetryError,socket.timeout) as e:
             error=str(e) if config.defaulelang !='zh' else '无法连接到Gemini,请尝试使用或更换代理'
             raise requests.ConnectionError(error)
         except google.api_core.exceptions.PermissionDenied:
             raise Exception('您无权访问所请求的资源或模型' if config.defaulelang =='zh' else 'You donot have permission for the requested resource')
         except google.api_core.exceptions.ResourceExhausted:                
-            raise Exception(f'您的配额已用尽。请稍等片刻，然后重试,若仍如此，请查看Google账号 ' if config.defaulelang =='zh' else 'Your quota is exhausted. Please wait a bit and try again')
+            raise RateLimited(f'您的配额已用尽。请稍等片刻，然后重试,若仍如此，请查看Google账号 ' if config.defaulelang =='zh' else 'Your quota is exhausted. Please wait a bit and try again')
         except google.auth.exceptions.DefaultCredentialsError:                
             raise Exception(f'验证失败，可能 Gemini API Key 不正确 ' if config.defaulelang =='zh' else 'Authentication fails. Please double-check your API key and try again')
         except google.api_core.exceptions.InvalidArgument:                
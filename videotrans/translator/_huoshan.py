@@ -2,19 +2,19 @@
 import re
 from typing import Union, List
 
-import requests
-from requests import JSONDecodeError
-
 from videotrans.configure import config
+from videotrans.configure._except import StatusError
 from videotrans.translator._base import BaseTrans
 from videotrans.util import tools
 
 
 class HuoShan(BaseTrans):
+    credential_params = ('zijiehuoshan_key',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.trans_thread=int(config.settings.get('aitrans_thread',50))
+        self.token_batch=True
         self.proxies = {"http": "", "https": ""}
         self.prompt = tools.get_prompt(ainame='zijie',is_srt=self.is_srt).replace('{lang}', self.target_language_name)
         self.model_name=config.params["zijiehuoshan_model"]
@@ -36,14 +36,14 @@ class HuoShan(BaseTrans):
                 "model": config.params['zijiehuoshan_model'],
                 "messages": message
             }
-            resp = requests.post("https://ark.cn-beijing.volces.com/api/v3/chat/completions",
+            resp = self._session().post("https://ark.cn-beijing.volces.com/api/v3/chat/completions",
                                  proxies=self.proxies, json=req, headers={
                     "Accept": "application/json",
                     "Content-Type": "application/json",
                     "Authorization": f"Bearer {config.params['zijiehuoshan_key']}"
                 })
             if resp.status_code!=200:
-                raise Exception(f'字节火山引擎请求失败: status_code={resp.status_code} {resp.reason}')
+                raise StatusError(f'字节火山引擎请求失败: status_code={resp.status_code} {resp.reason}', resp.status_code)
             config.logger.info(f'[字节火山引擎]响应:{resp.text=}')
             data = resp.json()
             if 'choices' not in data or len(data['choices']) < 1:
@@ -77,14 +77,14 @@ class HuoShan(BaseTrans):
                 "model": config.params['zijiehuoshan_model'],
                 "messages": message
             }
-            resp = requests.post("https://ark.cn-beijing.volces.com/api/v3/chat/completions",
+            resp = self._session().post("https://ark.cn-beijing.volces.com/api/v3/chat/completions",
                                  proxies=self.proxies, json=req, headers={
                     "Accept": "application/json",
                     "Content-Type": "application/json",
                     "Authorization": f"Bearer {config.params['zijiehuoshan_key']}"
                 })
             if resp.status_code != 200:
-                raise Exception(f'字节火山引擎请求失败: status_code={resp.status_code} {resp.reason}')
+                raise StatusError(f'字节火山引擎请求失败: status_code={resp.status_code} {resp.reason}', resp.status_code)
             config.logger.info(f'[字节火山引擎]响应:{resp.text=}')
             data = resp.json()
             if 'choices' not in data or len(data['choices']) < 1:
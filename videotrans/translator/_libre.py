@@ -3,14 +3,14 @@ import json
 import re
 from typing import Union, List
 
-import requests
-
 from videotrans.configure import config
+from videotrans.configure._except import StatusError
 from videotrans.translator._base import BaseTrans
 from videotrans.util import tools
 
 
 class Libre(BaseTrans):
+    credential_params = ('libre_key',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -38,10 +38,10 @@ class Libre(BaseTrans):
         }
         config.logger.info(f'[Libre]发送请求数据,{jsondata=}')
 
-        response = requests.post(url=self.api_url, json=jsondata, proxies=self.proxies)
+        response = self._session().post(url=self.api_url, json=jsondata, proxies=self.proxies)
         config.logger.info(f'[libre]返回响应,{response.text=}')
         if response.status_code != 200:
-            raise Exception(f'Libre: status_code={response.status_code} {response.reason} {response.text}')
+            raise StatusError(f'Libre: status_code={response.status_code} {response.reason} {response.text}', response.status_code)
         try:
             result = response.json()
             result = tools.cleartext(result['translatedText'])
@@ -11,10 +11,12 @@ from videotrans.util import tools
 
 
 class LocalLLM(BaseTrans):
+    credential_params = ('localllm_key',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.trans_thread=int(config.settings.get('aitrans_thread',50))
+        self.token_batch=True
         self.api_url = config.params['localllm_api']
         self.prompt = tools.get_prompt(ainame='localllm',is_srt=self.is_srt).replace('{lang}', self.target_language_name)
         self._check_proxy()
@@ -34,9 +36,12 @@ class LocalLLM(BaseTrans):
             if pro:
                 self.proxies =  pro
                 
+    def _max_output_tokens(self):
+        return int(config.params.get('localllm_max_token')) if config.params.get('localllm_max_token') else 4096
+
     def _item_task(self, data: Union[List[str], str]) -> str:
         model = OpenAI(api_key=config.params['localllm_key'], base_url=self.api_url,
-                       http_client=httpx.Client(proxy=self.proxies))
+                       http_client=self._http_client(self.proxies))
         text="\n".join([i.strip() for i in data]) if isinstance(data,list) else data
         message = [
             {'role': 'system',
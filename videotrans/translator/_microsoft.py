@@ -5,6 +5,7 @@ from typing import Union, List
 import requests
 
 from videotrans.configure import config
+from videotrans.configure._except import StatusError
 from videotrans.translator._base import BaseTrans
 
 
@@ -27,10 +28,10 @@ class Microsoft(BaseTrans):
             auth_num -= 1
             try:
                 if not self.auth:
-                    self.auth = requests.get('https://edge.microsoft.com/translate/auth', headers=headers,
+                    self.auth = self._session().get('https://edge.microsoft.com/translate/auth', headers=headers,
                                              proxies=self.proxies,verify=False)
                     if self.auth.status_code!=200:
-                        raise Exception(f'[Mircosoft]:status_code={self.auth.status_code} {self.auth.reason}')
+                        raise StatusError(f'[Mircosoft]:status_code={self.auth.status_code} {self.auth.reason}', self.auth.status_code)
             except (requests.ConnectionError,requests.HTTPError,requests.Timeout,requests.exceptions.ProxyError):
                 raise
             except Exception as e:
@@ -48,10 +49,10 @@ class Microsoft(BaseTrans):
         url = f"https://api-edge.cognitive.microsofttranslator.com/translate?from=&to={tocode}&api-version=3.0&includeSentenceLength=true"
         headers['Authorization'] = f"Bearer {self.auth.text}"
         config.logger.info(f'[Mircosoft]请求数据:{url=},{self.auth.text=}')
-        response = requests.post(url, json=[{"Text": "\n".join(data)}], proxies=self.proxies, headers=headers,verify=False,  timeout=300)
+        response = self._session().post(url, json=[{"Text": "\n".join(data)}], proxies=self.proxies, headers=headers,verify=False,  timeout=300)
         config.logger.info(f'[Mircosoft]返回:{response.text=}')
         if response.status_code != 200:
-            raise Exception(f'[Mircosoft] status={response.status_code=}')
+            raise StatusError(f'[Mircosoft] status={response.status_code=}', response.status_code)
         re_result = response.json()
         if len(re_result) == 0 or len(re_result[0]['translations']) == 0:
             raise Exception(f'no result:{re_result=}')
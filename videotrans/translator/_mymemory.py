@@ -2,9 +2,8 @@
 import time
 from typing import Union, List
 
-import requests
-
 from videotrans.configure import config
+from videotrans.configure._except import StatusError
 from videotrans.translator._base import BaseTrans
 from urllib.parse import quote
 
@@ -13,6 +12,8 @@ class MyMemory(BaseTrans):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.aisendsrt=False
+        # 匿名免费接口频率限制严格
+        self.max_concurrent = 1
         pro = self._set_proxy(type='set')
         if pro:
             self.proxies = {"https": pro, "http": pro}
@@ -26,10 +27,10 @@ class MyMemory(BaseTrans):
         text="\n".join(data)
         url = f"https://api.mymemory.translated.net/get?q={quote(text)}&langpair={self.source_code}|{self.target_code}"
         config.logger.info(f'[mymemory]请求数据:{url=}')
-        response = requests.get(url, proxies=self.proxies, headers=headers,verify=False,  timeout=300)
+        response = self._session().get(url, proxies=self.proxies, headers=headers,verify=False,  timeout=300)
         config.logger.info(f'[mymemory]返回:{response.text=}')
         if response.status_code != 200:
-            raise Exception(f'[mymemory] status={response.status_code=}')
+            raise StatusError(f'[mymemory] status={response.status_code=}', response.status_code)
         re_result = response.json()
         if re_result['responseStatus'] != 200:
             raise Exception(f'no result:{re_result["responseData"]["translatedText"]}')
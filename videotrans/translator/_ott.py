@@ -1,8 +1,7 @@
 from typing import Union, List
 
-import requests
-
 from videotrans.configure import config
+from videotrans.configure._except import StatusError
 from videotrans.translator._base import BaseTrans
 
 
@@ -27,9 +26,9 @@ class OTT(BaseTrans):
             "source": "auto",
             "target": self.target_code[:2]
         }
-        response = requests.post(url=self.api_url, json=jsondata, proxies=self.proxies)
+        response = self._session().post(url=self.api_url, json=jsondata, proxies=self.proxies)
         if response.status_code != 200:
-            raise Exception(f'status_code={response.status_code} {response.reason}')
+            raise StatusError(f'status_code={response.status_code} {response.reason}', response.status_code)
         result = response.json()
         if "error" in result:
             raise Exception(f'{result=}')
@@ -12,10 +12,13 @@ from videotrans.translator._base import BaseTrans
 
 
 class Tencent(BaseTrans):
+    credential_params = ('tencent_SecretId',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.aisendsrt=False
+        # 文本翻译接口默认 QPS=5
+        self.max_qps = 5
         proxy = os.environ.get('http_proxy')
         if proxy:
             del os.environ['http_proxy']
@@ -1,13 +1,13 @@
 from typing import Union, List
 from urllib.parse import quote
 
-import requests
-
 from videotrans.configure import config
+from videotrans.configure._except import StatusError
 from videotrans.translator._base import BaseTrans
 
 
 class TransAPI(BaseTrans):
+    credential_params = ('trans_secret',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -25,10 +25,10 @@ class TransAPI(BaseTrans):
         text = quote("\n".join(data))
         requrl = f"{self.api_url}target_language={self.target_code}&source_language={self.source_code[:2] if self.source_code else ''}&text={text}&secret={config.params['trans_secret']}"
         config.logger.info(f'[TransAPI]请求数据：{requrl=}')
-        response = requests.get(url=requrl, proxies=self.proxies)
+        response = self._session().get(url=requrl, proxies=self.proxies)
         config.logger.info(f'[TransAPI]返回:{response.text=}')
         if response.status_code != 200:
-            raise Exception(f'status_code={response.status_code} {response.reason} {response.text}')
+            raise StatusError(f'status_code={response.status_code} {response.reason} {response.text}', response.status_code)
         jsdata = response.json()
         if jsdata['code'] != 0:
             raise Exception(f'{jsdata=}')
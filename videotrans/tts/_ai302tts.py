@@ -19,6 +19,9 @@ class AI302(BaseTTS):
         self.copydata = copy.deepcopy(self.queue_tts)
         self.proxies=None
         
+    def _cache_extra(self, it):
+        return config.params.get('ai302tts_model','')
+
     def _exec(self):
         self.dub_nums=1
         self._local_mul_thread()
@@ -61,7 +64,7 @@ class AI302(BaseTTS):
             'X-Microsoft-OutputFormat': 'riff-48khz-16bit-mono-pcm',
             'Content-Type': 'application/ssml+xml'
         }
-        response = requests.post('https://api.302.ai/cognitiveservices/v1',
+        response = self._session().post('https://api.302.ai/cognitiveservices/v1',
                                  headers=headers,
                                  data=ssml,
                                  verify=False,proxies=None)
@@ -99,7 +102,7 @@ class AI302(BaseTTS):
                 "operation": "query"
             }
         }
-        response = requests.post('https://api.302.ai/doubao/tts_hd', headers={
+        response = self._session().post('https://api.302.ai/doubao/tts_hd', headers={
             'Authorization': f'Bearer {config.params["ai302_key"]}',
             'User-Agent': 'pyvideotrans',
             'Content-Type': 'application/json'
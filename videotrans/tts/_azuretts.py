@@ -155,9 +155,9 @@ class AzureTTS(BaseTTS):
         else:
             language = self.language.split("-", maxsplit=1)
             self.language = language[0].lower() + ("" if len(language) < 2 else '-' + language[1].upper())
-            if self.len == 1:
+            if len(self.queue_tts) == 1:
                 return self._item_task_pl(self.queue_tts)
-            split_queue = [self.queue_tts[i:i + self.con_num] for i in range(0, self.len, self.con_num)]
+            split_queue = [self.queue_tts[i:i + self.con_num] for i in range(0, len(self.queue_tts), self.con_num)]
             for idx, items in enumerate(split_queue):
                 if self._exit():
                     return
@@ -12,6 +12,7 @@ import requests
 from videotrans.configure import config
 from videotrans.configure._base import BaseCon
 from videotrans.configure._except import IPLimitExceeded
+from videotrans.tts._cache import tts_cache
 from videotrans.util import tools
 
 
@@ -23,6 +24,8 @@ class BaseTTS(BaseCon):
     uuid: str 任务唯一标识符
     play:bool 是否播放
     """
+    # 采样生成、同一文字每次结果不同的渠道设为 False，仅在开启 tts_cache_sampling 时缓存
+    deterministic = True
 
     def __init__(self, queue_tts: List[dict] = None, language=None, inst=None, uuid=None, play=False, is_test=False):
         super().__init__()
@@ -80,9 +83,19 @@ class BaseTTS(BaseCon):
         self._signal(text="")
         if len(self.queue_tts)<1:
             raise Exception('无需要配音的字幕' if config.defaulelang=='zh' else 'No subtitles required')
+        # 命中持久缓存的字幕直接复用，仅将未命中的交给 _exec
+        all_tts = self.queue_tts
+        cache_keys = self._get_from_cache()
         try:
             print('a1==')
-            self._exec()
+            # 试听和测试时不占用 network 资源类名额
+            if len(self.queue_tts) < 1:
+                pass
+            elif self.is_test or self.play:
+                self._exec()
+            else:
+                with config.resource('network'):
+                    self._exec()
         except IPLimitExceeded as e:
             raise
         except requests.exceptions.ProxyError as e:
@@ -98,6 +111,8 @@ class BaseTTS(BaseCon):
             self._signal(text=self.error, type="error")
             raise Exception(f'{self.error}:{e}')
         finally:
+            self.queue_tts = all_tts
+            self._put_to_cache(cache_keys)
             if self.shound_del:
                 self._set_proxy(type='del')
             if self.error:
@@ -128,6 +143,46 @@ class BaseTTS(BaseCon):
             for it in self.queue_tts:
                 if tools.vail_file(it['filename']):
                     tools.remove_silence_from_end(it['filename'])
+
+    # 渠道的模型、指令、角色对应参考音频等影响配音结果、但不在 queue_tts 中的设置，计入缓存键，子类按需重写
+    def _cache_extra(self, it) -> str:
+        return ''
+
+    # 从持久缓存复制已有配音，self.queue_tts 仅保留未命中的，返回未命中的 [(item, key)]
+    def _get_from_cache(self):
+        if self.is_test or self.play:
+            return []
+        if not self.deterministic and not config.settings.get('tts_cache_sampling', False):
+            return []
+        misses = []
+        cache_keys = []
+        for it in self.queue_tts:
+            if not it['text'].strip():
+                misses.append(it)
+                continue
+            try:
+                key = tts_cache.key(it, tts_name=self.__class__.__name__, rate=self.rate, volume=self.volume,
+                                    pitch=self.pitch, language=self.language, api_url=self.api_url,
+                                    extra=self._cache_extra(it))
+            except Exception as e:
+                config.logger.exception(e, exc_info=True)
+                misses.append(it)
+                continue
+            if tts_cache.get(key, it['filename']):
+                self.has_done += 1
+                continue
+            misses.append(it)
+            cache_keys.append((it, key))
+        if len(misses) < len(self.queue_tts):
+            self._signal(text=f'{config.transobj["kaishipeiyin"]} cache {len(self.queue_tts) - len(misses)}/{self.len}')
+        self.queue_tts = misses
+        return cache_keys
+
+    def _put_to_cache(self, cache_keys):
+        for it, key in cache_keys:
+            if tools.vail_file(it['filename']):
+                tts_cache.put(key, it['filename'])
+
     # 实际业务逻辑 子类实现 在此创建线程池，或单线程时直接创建逻辑
     # 抛出异常则停止
     def _exec(self) -> None:
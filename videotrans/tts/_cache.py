@@ -0,0 +1,99 @@
+import hashlib
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+
+from videotrans.configure import config
+from videotrans.util import tools
+
+
+class TTSCache:
+    """
+    配音结果持久缓存，位于 CACHE_DIR/tts，退出软件时不删除，多个任务共享
+    键为 (渠道, 渠道设置, 角色, 语速, 音量, 音调, 规范化文字, 参考音频内容哈希) 的 md5，值为配音文件
+    总容量超过 tts_cache_size(MB) 时按最近使用时间淘汰，命中时更新文件修改时间
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._size = None
+        self._dir = Path(config.CACHE_DIR + '/tts')
+
+    @property
+    def limit(self):
+        return int(float(config.settings.get('tts_cache_size', 1024))) * 1024 * 1024
+
+    def _file_md5(self, file):
+        md5 = hashlib.md5()
+        with open(file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                md5.update(chunk)
+        return md5.hexdigest()
+
+    # extra 为渠道的模型、指令等影响结果的设置，由 BaseTTS._cache_extra 提供
+    def key(self, it, *, tts_name, rate, volume, pitch, language=None, api_url='', extra=''):
+        text = re.sub(r'\s+', ' ', it.get('text', '')).strip()
+        ref_wav = it.get('ref_wav')
+        ref_hash = self._file_md5(ref_wav) if ref_wav and tools.vail_file(ref_wav) else ''
+        ext = Path(it['filename']).suffix.lower()
+        return tools.get_md5(
+            f"{tts_name}-{it.get('tts_type', '')}-{api_url}-{extra}-{language}-{it.get('role', '')}-{rate}-{volume}-{pitch}-{ref_hash}-{it.get('ref_text', '') if ref_hash else ''}-{text}") + ext
+
+    def _scan_size(self):
+        if self._size is None:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            self._size = sum(f.stat().st_size for f in self._dir.iterdir() if f.is_file())
+        return self._size
+
+    # 命中时复制到 filename 并返回 True
+    def get(self, key, filename):
+        if self.limit <= 0:
+            return False
+        file = self._dir / key
+        try:
+            if not file.is_file() or file.stat().st_size < 1:
+                return False
+            shutil.copy2(file, filename)
+            os.utime(file)
+            return True
+        except Exception as e:
+            config.logger.exception(e, exc_info=True)
+            return False
+
+    def put(self, key, filename):
+        if self.limit <= 0 or not tools.vail_file(filename):
+            return
+        file = self._dir / key
+        try:
+            with self._lock:
+                self._scan_size()
+                if file.is_file():
+                    self._size -= file.stat().st_size
+                tmp = file.with_name(f'{key}.{threading.get_ident()}.tmp')
+                shutil.copy2(filename, tmp)
+                os.replace(tmp, file)
+                os.utime(file)
+                self._size += file.stat().st_size
+                if self._size > self.limit:
+                    self._evict()
+        except Exception as e:
+            config.logger.exception(e, exc_info=True)
+
+    # 删除最久未用的文件，直到容量降至上限的 90%
+    def _evict(self):
+        files = sorted((f for f in self._dir.iterdir() if f.is_file()), key=lambda f: f.stat().st_mtime)
+        target = int(self.limit * 0.9)
+        for f in files:
+            if self._size <= target:
+                break
+            try:
+                size = f.stat().st_size
+                f.unlink()
+                self._size -= size
+            except Exception:
+                pass
+
+
+tts_cache = TTSCache()
@@ -14,6 +14,7 @@ from videotrans.util import tools
 # 线程池并发 返回wav数据，转为mp3
 
 class ChatTTS(BaseTTS):
+    deterministic = False
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -32,7 +33,7 @@ class ChatTTS(BaseTTS):
             return
         try:
             data = {"text": data_item['text'].strip(), "voice": data_item['role'], 'prompt': '', 'is_split': 1}
-            res = requests.post(f"{self.api_url}/tts", data=data, proxies=self.proxies, timeout=3600)
+            res = self._session().post(f"{self.api_url}/tts", data=data, proxies=self.proxies, timeout=3600)
             if res.status_code != 200:
                 self.error = f'ChatTTS:{res.status_code} {res.reason}'
                 return
@@ -52,7 +53,7 @@ class ChatTTS(BaseTTS):
             if self.api_url.find('127.0.0.1') > -1 or self.api_url.find('localhost') > -1:
                 tools.wav2mp3(re.sub(r'\\{1,}', '/', res['filename']), data_item['filename'])
                 return
-            resb = requests.get(res['url'])
+            resb = self._session().get(res['url'])
             if resb.status_code != 200:
                 self.error = (f'chatTTS:{res["url"]=}')
                 return
@@ -14,6 +14,7 @@ from videotrans.util import tools
 # 线程池并发 返回wav数据，转为mp3
 
 class CloneVoice(BaseTTS):
+    deterministic = False
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -51,7 +52,7 @@ class CloneVoice(BaseTTS):
                 with open(data_item['ref_wav'], 'rb') as f:
                     chunk=f.read()
                 files = {"audio": chunk}
-            res = requests.post(f"{self.api_url}/apitts", data=data, files=files, proxies=self.proxies,
+            res = self._session().post(f"{self.api_url}/apitts", data=data, files=files, proxies=self.proxies,
                                 timeout=3600)
             if res.status_code != 200:
                 self.error = f'clonevoice: status_code={res.status_code} {res.reason} '
@@ -71,7 +72,7 @@ class CloneVoice(BaseTTS):
                 tools.wav2mp3(re.sub(r'\\{1,}', '/', res['filename']), data_item['filename'])
                 return
 
-            resb = requests.get(res['url'],proxies=self.proxies)
+            resb = self._session().get(res['url'],proxies=self.proxies)
             config.logger.info(f'clone-voice:resb={resb.status_code=}')
 
             with open(data_item['filename'] + ".wav", 'wb') as f:
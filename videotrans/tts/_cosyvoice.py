@@ -15,6 +15,7 @@ from videotrans.util import tools
 # 线程池并发 返回wav数据转为mp3
 
 class CosyVoice(BaseTTS):
+    deterministic = False
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -23,6 +24,11 @@ class CosyVoice(BaseTTS):
         self.api_url = 'http://' + api_url.replace('http://', '')
         self.proxies={"http": "", "https": ""}
 
+    # 角色对应的参考音频改变时不可复用
+    def _cache_extra(self, it):
+        rolelist = tools.get_cosyvoice_role() or {}
+        return json.dumps(rolelist.get(it.get('role','')), ensure_ascii=False)
+
     def _exec(self):
         self._local_mul_thread()
 
@@ -59,7 +65,7 @@ class CosyVoice(BaseTTS):
                 if data['speaker'] not in ["中文男", "中文女", "英文男", "英文女", "日语男", "韩语女", "粤语女"]:
                     data['new'] = 1
 
-                response = requests.post(f"{self.api_url}", json=data, proxies=self.proxies, timeout=3600)
+                response = self._session().post(f"{self.api_url}", json=data, proxies=self.proxies, timeout=3600)
                 config.logger.info(f'请求数据：{self.api_url=},{data=}')
             else:
                 api_url = self.api_url
@@ -90,7 +96,7 @@ class CosyVoice(BaseTTS):
                     data['role'] = '中文女'
                 config.logger.info(f'请求数据：{api_url=},{data=}')
                 # 克隆声音
-                response = requests.post(f"{api_url}", data=data, proxies={"http": "", "https": ""}, timeout=3600)
+                response = self._session().post(f"{api_url}", data=data, proxies={"http": "", "https": ""}, timeout=3600)
 
             if response.status_code != 200:
                 # 如果是JSON数据，使用json()方法解析
@@ -1,6 +1,5 @@
 import asyncio
-import threading
-import time
+import random
 from pathlib import Path
 
 
@@ -17,6 +16,8 @@ from edge_tts import Communicate
 # asyncio 异步并发
 
 class EdgeTTS(BaseTTS):
+    # 单条失败时的最大重试次数
+    retry = 3
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -24,47 +25,76 @@ class EdgeTTS(BaseTTS):
         if pro:
             self.proxies= pro
 
+    # 被限流时所有协程一起暂停，暂停时长按连续限流次数指数增加
+    async def _wait_backoff(self):
+        delay = self._backoff_until - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
 
+    def _set_backoff(self):
+        self._backoff_nums += 1
+        delay = min(60, 2 ** self._backoff_nums) + random.random()
+        self._backoff_until = max(self._backoff_until, asyncio.get_running_loop().time() + delay)
+        self._signal(text=f'可能被edge限流，{int(delay)}s后重试' if config.defaulelang == 'zh' else f'Edge may be rate limiting, retry after {int(delay)}s')
+
+    async def _item_task_async(self, sem, it):
+        async with sem:
+            for attempt in range(self.retry + 1):
+                if self._exit():
+                    return
+                await self._wait_backoff()
+                if self.wait_sec > 0:
+                    await asyncio.sleep(self.wait_sec)
+                try:
+                    communicate = Communicate(
+                        it['text'],
+                        voice=it['role'],
+                        rate=self.rate,
+                        volume=self.volume,
+                        proxy=self.proxies,
+                        pitch=self.pitch)
+                    await communicate.save(it['filename'])
+                    self._backoff_nums = 0
+                    break
+                except NoAudioReceived as e:
+                    # 文本和角色语言不一致，重试无意义
+                    config.logger.exception(e, exc_info=True)
+                    self.error = '请检查字幕文本和所选语言是否一致' if config.defaulelang == 'zh' else 'Please check that the subtitle text matches the selected language'
+                    break
+                except aiohttp.client_exceptions.ClientHttpProxyError as e:
+                    config.logger.exception(e, exc_info=True)
+                    raise Exception(f'代理错误，请检查 {e}')
+                except Exception as e:
+                    config.logger.exception(e, exc_info=True)
+                    if isinstance(e, WSServerHandshakeError) or str(e).find('Invalid response status') > -1:
+                        self.error = '可能被edge限流，请尝试使用或切换代理节点' if config.defaulelang == 'zh' else 'Edge may be rate limiting, try using or switching proxies'
+                        self._set_backoff()
+                    else:
+                        self.error = str(e)
+                        await asyncio.sleep(min(30, 2 ** attempt) + random.random())
+        self.has_done += 1
+        if self.inst and self.inst.precent < 80:
+            self.inst.precent += 0.05
+        self._signal(text=f'{config.transobj["kaishipeiyin"]} [{self.has_done}/{self.len}]')
+
+    # 并发数同 dubbing_thread，单条失败重试后跳过，由 run() 统一统计失败数量
     async def _task_queue(self):
-        
-        task_end=False
-        
-        def process():
-            if task_end:
-                return        
+        self._backoff_until = 0
+        self._backoff_nums = 0
+        sem = asyncio.Semaphore(max(1, self.dub_nums))
+        tasks = [
+            asyncio.create_task(self._item_task_async(sem, it))
+            for it in self.queue_tts if it['text'].strip()
+        ]
         try:
-            length=len(self.queue_tts)
-            for i,it in enumerate(self.queue_tts):
-                if task_end or self._exit():
-                    return
-                if self.inst and self.inst.precent < 80:
-                    self.inst.precent += 0.05
-                self._signal(text=f'{config.transobj["kaishipeiyin"]} [{i+1}/{length}]')
-                time.sleep(self.wait_sec if self.wait_sec>0 else 0.1)
-                communicate = Communicate(
-                    it['text'],
-                    voice=it['role'],
-                    rate=self.rate, 
-                    volume=self.volume,
-                    proxy=self.proxies,
-                    pitch=self.pitch)
-                await communicate.save(it['filename'])
-        except NoAudioReceived as e:
-            config.logger.exception(e, exc_info=True)
-            raise Exception(f'请检查字幕文本和所选语言是否一致')
-        except aiohttp.client_exceptions.ClientHttpProxyError as e:
-            config.logger.exception(e, exc_info=True)
-            raise Exception(f'代理错误，请检查 {e}')
+            await asyncio.gather(*tasks)
         except Exception as e:
-            config.logger.exception(e, exc_info=True)
-            if str(e).find('Invalid response status'):
-                raise Exception('可能被edge限流，请尝试使用或切换代理节点')
+            for t in tasks:
+                t.cancel()
             print(f"异步合成出错: {e}")
             raise
-        finally:
-            task_end=True
         print('配音完毕')
-    
+
     def _exec(self) -> None:
         # 防止出错，重试一次
         if self._exit():
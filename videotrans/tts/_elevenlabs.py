@@ -4,11 +4,12 @@ import os
 import re
 import time
 
-import httpx
+
 from elevenlabs import ElevenLabs,VoiceSettings
 
 
 from videotrans.configure import config
+from videotrans.configure._base import http_client
 from videotrans.tts._base import BaseTTS
 from videotrans.util import tools
 
@@ -24,6 +25,9 @@ class ElevenLabsC(BaseTTS):
         if pro:
             self.proxies = pro
 
+    def _cache_extra(self, it):
+        return config.params.get('elevenlabstts_models','')
+
     # 强制单个线程执行，防止频繁并发失败
     def _exec(self):
         prev_text = None
@@ -53,7 +57,7 @@ class ElevenLabsC(BaseTTS):
 
                 client = ElevenLabs(
                     api_key=config.params['elevenlabstts_key'],
-                    httpx_client=httpx.Client(proxy=self.proxies) if self.proxies else None
+                    httpx_client=self._http_client(self.proxies) if self.proxies else None
                 )
 
                 response = client.text_to_speech.convert(
@@ -109,7 +113,7 @@ class ElevenLabsClone():
             self.proxies =  pro
         self.client = ElevenLabs(
             api_key=config.params['elevenlabstts_key'],
-            httpx_client=httpx.Client(proxy=self.proxies) if pro else None
+            httpx_client=http_client(self.__class__.__name__, self.proxies) if pro else None
         )
 
     def _set_proxy(self, type='set'):
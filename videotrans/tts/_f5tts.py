@@ -5,7 +5,6 @@ import time
 from pathlib import Path
 from typing import Union, Dict, List
 
-import requests
 from pydub import AudioSegment
 
 from videotrans.configure import config
@@ -15,6 +14,7 @@ from videotrans.util import tools
 
 # 线程池并发  返回wav数据转为mp3
 class F5TTS(BaseTTS):
+    deterministic = False
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -33,6 +33,12 @@ class F5TTS(BaseTTS):
     
 
     
+    # 角色对应的参考音频和文字改变时不可复用
+    def _cache_extra(self, it):
+        roledict = tools.get_f5tts_role() or {}
+        return json.dumps([config.params.get('f5tts_model',''), config.params.get('f5tts_ttstype',''),
+                           config.params.get('f5tts_is_whisper',False), roledict.get(it.get('role',''))], ensure_ascii=False)
+
     def _exec(self):
         self._local_mul_thread()
     
@@ -81,7 +87,7 @@ class F5TTS(BaseTTS):
             if self.v1_local:
                 tools.wav2mp3(wav_file, data_item['filename'])
             else:
-                resp=requests.get(self.api_url+f'/gradio_api/file='+Path(wav_file).as_posix())
+                resp=self._session().get(self.api_url+f'/gradio_api/file='+Path(wav_file).as_posix())
                 resp.raise_for_status()
                 with open(data_item['filename'] + ".wav", 'wb') as f:
                     f.write(resp.content)
@@ -144,7 +150,7 @@ class F5TTS(BaseTTS):
             if self.v1_local:
                 tools.wav2mp3(wav_file, data_item['filename'])
             else:
-                resp=requests.get(self.api_url+f'/gradio_api/file='+Path(wav_file).as_posix())
+                resp=self._session().get(self.api_url+f'/gradio_api/file='+Path(wav_file).as_posix())
                 resp.raise_for_status()
                 with open(data_item['filename'] + ".wav", 'wb') as f:
                     f.write(resp.content)
@@ -203,7 +209,7 @@ class F5TTS(BaseTTS):
             if self.v1_local:
                 tools.wav2mp3(wav_file, data_item['filename'])
             else:
-                resp=requests.get(self.api_url+f'/gradio_api/file='+Path(wav_file).as_posix())
+                resp=self._session().get(self.api_url+f'/gradio_api/file='+Path(wav_file).as_posix())
                 resp.raise_for_status()
                 with open(data_item['filename'] + ".wav", 'wb') as f:
                     f.write(resp.content)
@@ -263,7 +269,7 @@ class F5TTS(BaseTTS):
             if self.v1_local:
                 tools.wav2mp3(wav_file, data_item['filename'])
             else:
-                resp=requests.get(self.api_url+f'/gradio_api/file='+Path(wav_file).as_posix())
+                resp=self._session().get(self.api_url+f'/gradio_api/file='+Path(wav_file).as_posix())
                 resp.raise_for_status()
                 with open(data_item['filename'] + ".wav", 'wb') as f:
                     f.write(resp.content)
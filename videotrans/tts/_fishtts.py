@@ -14,6 +14,7 @@ from videotrans.util import tools
 
 # 线程池并发  返回wav数据转为mp3
 class FishTTS(BaseTTS):
+    deterministic = False
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -49,7 +50,7 @@ class FishTTS(BaseTTS):
                 raise Exception(f'参考音频不存在:{audio_path}\n请确保该音频存在')
 
             config.logger.info(f'fishTTS-post:{data=},{self.proxies=}')
-            response = requests.post(f"{self.api_url}", json=data, proxies=self.proxies, timeout=3600)
+            response = self._session().post(f"{self.api_url}", json=data, proxies=self.proxies, timeout=3600)
             if response.status_code != 200:
                 self.error = f'status_code={response.status_code} {response.reason} {response.text}'
                 return
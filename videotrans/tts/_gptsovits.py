@@ -18,6 +18,7 @@ from videotrans.util import tools
 # 线程池并发 返回wav数据转为mp3
 
 class GPTSoVITS(BaseTTS):
+    deterministic = False
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -27,6 +28,12 @@ class GPTSoVITS(BaseTTS):
         self.splits = {"，", "。", "？", "！", ",", ".", "?", "!", "~", ":", "：", "—", "…", }
         self.proxies={"http": "", "https": ""}
 
+    # 角色对应的参考音频和文字改变时不可复用
+    def _cache_extra(self, it):
+        roledict = tools.get_gptsovits_role() or {}
+        return json.dumps([config.params.get('gptsovits_extra',''), config.params.get('gptsovits_isv2',False),
+                           roledict.get(it.get('role',''))], ensure_ascii=False)
+
     def _exec(self):
         self._local_mul_thread()
 
@@ -76,7 +83,7 @@ class GPTSoVITS(BaseTTS):
                     self.api_url+='/tts'
             config.logger.info(f'GPT-SoVITS post:{data=}\n{self.api_url=}')
             # 克隆声音
-            response = requests.post(f"{self.api_url}", json=data, proxies=self.proxies, timeout=3600)
+            response = self._session().post(f"{self.api_url}", json=data, proxies=self.proxies, timeout=3600)
             if response.status_code != 200:
                 self.error = f'GPT-SoVITS合成声音失败: status_code={response.status_code} {response.reason} {response.text}'
                 return
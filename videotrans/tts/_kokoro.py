@@ -39,7 +39,7 @@ class KokoroTTS(BaseTTS):
                 speed += rate
             data = {"input": text, "voice": data_item['role'],"speed":speed}
 
-            res = requests.post(self.api_url, json=data, proxies=self.proxies, timeout=3600)
+            res = self._session().post(self.api_url, json=data, proxies=self.proxies, timeout=3600)
             res.raise_for_status()
 
             with open(data_item['filename'], 'wb') as f:
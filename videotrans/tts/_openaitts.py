@@ -2,7 +2,7 @@ import copy
 import re
 import time
 
-import httpx,requests
+import requests
 from openai import OpenAI, RateLimitError, APIConnectionError
 
 from videotrans.configure import config
@@ -25,6 +25,9 @@ class OPENAITTS(BaseTTS):
                 self.proxies =  pro 
 
 
+    def _cache_extra(self, it):
+        return f"{config.params.get('openaitts_model','')}-{config.params.get('openaitts_instructions','')}"
+
     # 强制单个线程执行，防止频繁并发失败
     def _exec(self):
         if not config.params['openaitts_key']:
@@ -44,7 +47,7 @@ class OPENAITTS(BaseTTS):
             speed += rate
         try:
             client = OpenAI(api_key=config.params.get('openaitts_key',''), base_url=self.api_url,
-                            http_client=httpx.Client(proxy=self.proxies,timeout=7200))
+                            http_client=self._http_client(self.proxies, 7200))
             with client.audio.speech.with_streaming_response.create(
                 model=config.params['openaitts_model'],
                 voice=role,
@@ -25,6 +25,9 @@ class TTSAPI(BaseTTS):
             self.api_url=api_url
         self.proxies=None
 
+    def _cache_extra(self, it):
+        return f"{config.params.get('ttsapi_extra','')}-{config.params.get('ttsapi_emotion','')}-{config.params.get('ttsapi_language_boost','')}"
+
     def _exec(self) -> None:
         self._local_mul_thread()
 
@@ -71,7 +74,7 @@ class TTSAPI(BaseTTS):
             # 返回的是音频url地址
             if isinstance(res['data'],str) and res['data'].startswith('http'):
                 url = res['data']
-                res = requests.get(url)
+                res = self._session().get(url)
                 if res.status_code != 200:
                     self.error = f'{url=}'
                     return
@@ -127,7 +130,7 @@ class TTSAPI(BaseTTS):
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36"
         }
         config.logger.info(f'发送数据 {data=}')
-        resraw = requests.post(f"{self.api_url}", data=data, verify=False, headers=headers,proxies=None)
+        resraw = self._session().post(f"{self.api_url}", data=data, verify=False, headers=headers,proxies=None)
         resraw.raise_for_status()            
         return resraw.json()
     """
@@ -205,6 +208,6 @@ Serene Woman:Serene_Woman
            'Content-Type': 'application/json'
         }
 
-        response = requests.request("POST", self.api_url, headers=headers, data=payload)
+        response = self._session().request("POST", self.api_url, headers=headers, data=payload)
         response.raise_for_status()
         return response.json()
@@ -95,7 +95,20 @@ class Ui_setini(object):
                 "countdown_sec": "当单个视频翻译时，暂停时倒计时秒数",
                 "bgm_split_time": "设置分离背景音时切割片段，防止视频过长卡死，默认300s",
                 "homedir": "家目录，用于保存视频分离、字幕配音、字幕翻译等结果的位置，默认用户家目录",
-                "is_queue":"视频翻译任务默认交叉并发执行，以提高速度，选中该项则排队挨个翻译,速度会降低"
+                "is_queue":"视频翻译任务默认交叉并发执行，以提高速度，选中该项则排队挨个翻译,速度会降低",
+                "cpu_limit": "同时执行本地模型识别等计算密集操作的任务数，超过CPU/显存承受能力会变慢甚至崩溃",
+                "network_limit": "同时执行在线翻译、在线配音、在线识别的任务数",
+                "ffmpeg_limit": "同时执行预处理、声画对齐、最终合成等ffmpeg编码操作的任务数",
+                "prepare_worker": "视频翻译预处理阶段同时执行的任务数，0=按ffmpeg同时运行数",
+                "recogn_worker": "视频翻译语音识别阶段的线程数，0=自动，本地模型实际同时运行数受 本地模型同时运行数 限制",
+                "trans_worker": "视频翻译字幕翻译阶段同时执行的任务数，0=按在线请求同时运行数",
+                "dubbing_worker": "视频翻译配音阶段同时执行的任务数，0=按在线请求同时运行数",
+                "align_worker": "视频翻译声画对齐阶段同时执行的任务数，0=按ffmpeg同时运行数",
+                "assemb_worker": "视频翻译最终合成阶段同时执行的任务数，0=按ffmpeg同时运行数",
+                "task_resume": "视频翻译各阶段完成后保存断点，中断后重新开始同一视频且设置未变时跳过已完成阶段，成功完成后删除",
+                "task_resume_days": "断点记录超过该天数未更新则删除",
+                "stream_pipeline": "视频翻译时边识别边在后台翻译和配音，识别结束后翻译、配音阶段直接使用缓存结果，仅faster-whisper整体识别且未启用重新断句时有效，需开启翻译缓存和配音缓存，按窗口翻译时AI翻译可用的上下文变少",
+                "stream_window": "边识别边翻译时每凑满多少条字幕提交一次翻译"
             },
 
             "video": {
@@ -103,6 +116,7 @@ class Ui_setini(object):
                 "cuda_qp": "是否在 NVIDIA cuda上使用 qp代替crf",
                 "preset": "主要调节编码速度和质量的平衡，有ultrafast、superfast、veryfast、faster、fast、medium、slow、slower、veryslow 选项，编码速度从快到慢、压缩率从低到高、视频尺寸从大到小。 ",
                 "videoslow_hard":"视频慢速处理时是否尝试硬件加速(速度快但易出错)",
+                "videoslow_onepass":"视频慢速时使用单个滤镜图一次编码完成，不再逐片段截取编码后连接，出错时自动改为逐片段处理",
                 "ffmpeg_cmd": "自定义ffmpeg命令参数， 将添加在倒数第二个位置上,例如  -bf 7 -b_ref_mode middle",
                 "cuda_decode":"使用cuda解码视频",
                 "video_codec": "采用 libx264 编码或 libx265编码，264兼容性更好，265压缩比更大清晰度更高"
@@ -120,7 +134,12 @@ class Ui_setini(object):
                 "trans_thread": "传统翻译每次发送字幕行数",
                 "aitrans_thread": "AI翻译每次发送字幕行数",
                 "retries": "翻译出错时的重试次数",
+                "trans_cache_rows": "翻译结果持久缓存的最大字幕条数，超出时删除最久未用的，0=不缓存",
+                "trans_cache_days": "翻译缓存超过该天数未使用则删除，0=永不过期",
                 "translation_wait": "每次翻译后暂停时间/秒,用于限制请求频率",
+                "trans_concurrent": "同时发送翻译请求的字幕组数，默认3，遇到频率限制时自动降速，同一 api key 共享限流，百度等免费版有QPS限制的渠道始终为1",
+                "aitrans_token_budget": "AI翻译每组字幕的token上限，0为根据模型上下文和max_tokens自动计算，AI翻译按此分组，不再受AI翻译每次发送字幕行数限制",
+                "aitrans_max_lines": "AI翻译按token分组时每组字幕条数的安全上限，仅防止极短字幕时单组过大",
                 "google_trans_newadd": "批量字幕翻译功能当选择Google渠道时，可在此填写新的目标语言代码，请填写ISO-639 代码,多个以英文逗号分隔，语言代码在此查看  https://cloud.google.com/translate/docs/languages",
                 "aisendsrt":"是否在使用AI/Google翻译时发送完整字幕格式内容",
                 "refine3":"AI翻译并且启用上方选项时，使用三步反思翻译法"
@@ -128,6 +147,8 @@ class Ui_setini(object):
             },
             "dubbing": {
                 "dubbing_thread": "同时配音的字幕条数",
+                "tts_cache_size": "配音结果持久缓存的最大容量(MB)，渠道设置、角色、语速、音量、音调和文字都相同时直接复用，超出时删除最久未用的，0=不缓存",
+                "tts_cache_sampling": "是否也缓存 F5-TTS、GPT-SoVITS、CosyVoice、ChatTTS 等每次生成结果不同的本地模型配音，默认不缓存",
                 "dubbing_wait": "每次配音后暂停时间/秒,用于限制请求频率",
                 "save_segment_audio":"保留每条字幕的配音文件",
                 "azure_lines": "azureTTS一次配音行数",
@@ -158,6 +179,11 @@ class Ui_setini(object):
                 "cuda_com_type": "faster模式时cuda数据类型，int8=消耗资源少，速度快，精度低，float32=消耗资源多，速度慢，精度高，int8_float16=设备自选",
                 "whisper_threads": "faster模式下，字幕识别时，cpu进程数",
                 "whisper_worker": "faster模式下，字幕识别时，同时工作进程数",
+                "whisper_model_cache": "faster模式下，每个常驻识别进程最多保留的已加载模型数，超出时淘汰最久未用的，0=每次识别后卸载",
+                "funasr_model_idle": "重新断句使用的标点模型等funasr模型加载后常驻复用，超过该秒数未使用则卸载，0=每次使用后卸载",
+                "funasr_batch": "SenseVoiceSmall识别时每次送入模型的语音片段数，显存或内存不足时减小",
+                "uvr_model_idle": "分离人声背景声的模型加载后常驻复用，超过该秒数未使用则卸载，0=每次分离后卸载",
+                "uvr_batch": "分离人声背景声时每次前向计算的窗口数，越大越快但占用内存越多",
                 "beam_size": "字幕识别时精度调整，1-5，1=消耗显存最低，5=消耗显存最多",
                 "best_of": "字幕识别时精度调整，1-5，1=消耗显存最低，5=消耗显存最多",
                 "temperature": "0=占用更少GPU资源但效果略差，1=占用更多GPU资源同时效果更好",
@@ -201,7 +227,21 @@ class Ui_setini(object):
             "openairecognapi_model": "OpenAI语音识别模型",
             "homedir": "设置家目录",
             "is_queue": "视频翻译排队处理(默认交叉)",
+            "cpu_limit": "本地模型同时运行数",
+            "network_limit": "在线请求同时运行数",
+            "ffmpeg_limit": "ffmpeg同时运行数",
+            "prepare_worker": "预处理阶段并发数",
+            "recogn_worker": "识别阶段并发数",
+            "trans_worker": "翻译阶段并发数",
+            "dubbing_worker": "配音阶段并发数",
+            "align_worker": "对齐阶段并发数",
+            "assemb_worker": "合成阶段并发数",
+            "task_resume": "断点续做",
+            "task_resume_days": "断点保留天数",
+            "stream_pipeline": "边识别边翻译配音",
+            "stream_window": "流水线窗口条数",
             "videoslow_hard":"视频慢速时尝试硬件加速(速度快易出错)",
+            "videoslow_onepass":"视频慢速单次编码",
             "lang": "界面语言",
             "save_segment_audio":"保留每条字幕的配音文件",
             "crf": "视频转码损失控制",
@@ -242,13 +282,22 @@ class Ui_setini(object):
             "trans_thread": "传统翻译每次发送字幕行数",
             "aitrans_thread": "AI翻译每次发送字幕行数",
             "retries": "翻译出错重试数",
+            "trans_cache_rows": "翻译缓存最大条数",
+            "trans_cache_days": "翻译缓存过期天数",
             "dubbing_thread": "同时配音字幕数",
+            "tts_cache_size": "配音缓存容量MB",
+            "tts_cache_sampling": "缓存采样生成的配音",
             "countdown_sec": "暂停倒计时/s",
             "backaudio_volume": "背景音量倍数",
             "loop_backaudio": "循环播放背景音",
             "cuda_com_type": "CUDA数据类型",
             "whisper_threads": "faster-whisper cpu进程",
             "whisper_worker": "faster-whisper工作进程",
+            "whisper_model_cache": "faster-whisper常驻模型数",
+            "funasr_model_idle": "funasr模型空闲卸载秒数",
+            "funasr_batch": "SenseVoice批处理片段数",
+            "uvr_model_idle": "人声分离模型空闲卸载秒数",
+            "uvr_batch": "人声分离批处理窗口数",
             "beam_size": "字幕识别准确度控制beam_size",
             "best_of": "字幕识别准确度控制best_of",
             "temperature": "faster-whisper温度控制",
@@ -262,6 +311,9 @@ class Ui_setini(object):
             "azure_lines": "AzureTTS批量行数",
             "chattts_voice": "ChatTTS音色值",
             "translation_wait": "翻译后暂停时间/s",
+            "trans_concurrent": "翻译并发组数",
+            "aitrans_token_budget": "AI翻译每组token上限",
+            "aitrans_max_lines": "AI翻译每组条数上限",
             "dubbing_wait": "配音后暂停时间/s",
             "gemini_model": "Gemini模型列表",
             "google_trans_newadd": "Google字幕翻译新增语言代码",
@@ -314,6 +366,19 @@ class Ui_setini(object):
                     "lang": "Set the software interface language, a restart is required after modification",
                     "countdown_sec": "Countdown seconds when pausing during single video translation",
                     "is_queue":"Video translation tasks are cross-executed concurrently by default to increase speed, checking this item queues the translations one by one.",
+                    "cpu_limit": "Number of CPU-heavy operations such as local model recognition running at the same time",
+                    "network_limit": "Number of online translation, dubbing and recognition jobs running at the same time",
+                    "ffmpeg_limit": "Number of ffmpeg encoding operations (preprocess, alignment, final merge) running at the same time",
+                    "prepare_worker": "Number of tasks processed concurrently in the preprocessing stage, 0=follow FFmpeg concurrency",
+                    "recogn_worker": "Number of recognition stage threads, 0=auto, local models are still limited by CPU-heavy concurrency",
+                    "trans_worker": "Number of tasks translated concurrently, 0=follow Network concurrency",
+                    "dubbing_worker": "Number of tasks dubbed concurrently, 0=follow Network concurrency",
+                    "align_worker": "Number of tasks aligned concurrently, 0=follow FFmpeg concurrency",
+                    "assemb_worker": "Number of tasks assembled concurrently, 0=follow FFmpeg concurrency",
+                    "task_resume": "Save a checkpoint after each video translation stage, restarting the same video with unchanged settings skips finished stages, removed after success",
+                    "task_resume_days": "Checkpoints not updated for this many days are deleted",
+                    "stream_pipeline": "Translate and dub in the background while recognition is still running, the translation and dubbing stages then reuse the cached results. Only for faster-whisper overall recognition without re-segmentation, requires the translation and dubbing caches, AI translation sees less context per window",
+                    "stream_window": "Number of recognized subtitles collected before each background translation",
                     "bgm_split_time": "Set the segment length for splitting background audio to prevent freezing on long videos, default is 300s",
                     "homedir": "Home directory, used to save the results of video separation, subtitle dubbing, subtitle translation, etc. Default user home directory"
                 },
@@ -323,6 +388,7 @@ class Ui_setini(object):
                     "cuda_decode":"Decode the video using cuda",
                     "preset": "Mainly adjust the balance of encoding speed and quality, there are ultrafast, superfast, veryfast, fast, fast, medium, slow, slow, veryslow options, encoding speed from fast to slow, compression rate from low to high, video size from large to small.",
                     "videoslow_hard":"Whether to try hardware acceleration when video is processed slowly (fast but error prone)",
+                    "videoslow_onepass":"Slow down video with a single filter graph and one encode instead of cutting, encoding and concatenating every segment, falls back to per-segment processing on error",
                     "ffmpeg_cmd": "Custom ffmpeg command parameters, added at the penultimate position, e.g., -bf 7 -b_ref_mode middle",
                     "video_codec": "Use libx264 or libx265 encoding, 264 has better compatibility, 265 has higher compression ratio and clarity"
                 },
@@ -338,13 +404,20 @@ class Ui_setini(object):
                     "trans_thread": "Number of subtitles translated simultaneously",
                     "aitrans_thread": "Number of subtitles AI translated simultaneously",
                     "retries": "Number of retries when translation fails",
+                    "trans_cache_rows": "Max number of subtitle lines kept in the persistent translation cache, least recently used are evicted, 0=disable",
+                    "trans_cache_days": "Translation cache entries unused for this many days are deleted, 0=never expire",
                     "translation_wait": "Pause time in seconds after each translation, used to limit request frequency",
+                    "trans_concurrent": "Number of subtitle batches sent for translation at the same time, default 3. Slows down automatically when rate limited; requests with the same api key share the limit, and channels with free-tier QPS limits such as Baidu always use 1",
+                    "aitrans_token_budget": "Token limit per subtitle batch for AI translation, 0 computes it from the model context window and max_tokens; AI translation batches by this limit instead of the AI batch line count",
+                    "aitrans_max_lines": "Safety cap on subtitle lines per batch when AI translation batches by tokens, only guards against oversized batches of very short lines",
                     "google_trans_newadd": "Batch Subtitle Translation Function When selecting Google channel, you can fill in the new target language code here, please fill in the ISO-639 code, the language code can be viewed here.  https://cloud.google.com/translate/docs/languages",
                     "aisendsrt":"Sending full subtitle content when use ai translation",
                     "refine3":"When AI translation is enabled and the above options are enabled, use reflective translation"
                 },
                 "dubbing": {
                     "dubbing_thread": "Number of subtitles dubbed simultaneously",
+                    "tts_cache_size": "Max size in MB of the persistent dubbing cache, lines with the same channel settings, role, rate, volume, pitch and text are reused, least recently used are evicted, 0=disable",
+                    "tts_cache_sampling": "Whether to also cache dubbing from local models whose output differs on every run, such as F5-TTS, GPT-SoVITS, CosyVoice and ChatTTS. Off by default",
                     "dubbing_wait": "Pause time in seconds after each dubbing, used to limit request frequency",
                     "save_segment_audio":"Save the dubbing file of each subtitle",
                     "azure_lines": "Number of lines dubbed at once by azureTTS",
@@ -375,6 +448,11 @@ class Ui_setini(object):
                     "cuda_com_type": "Data type for cuda in faster mode, int8 = less resource usage, faster speed, lower precision, float32 = more resource usage, slower speed, higher precision, int8_float16 = device auto-select",
                     "whisper_threads": "Number of CPU processes for subtitle recognition in faster mode",
                     "whisper_worker": "Number of concurrent workers for subtitle recognition in faster mode",
+                    "whisper_model_cache": "Max loaded models kept by each resident recognition process in faster mode, least recently used are evicted, 0=unload after each recognition",
+                    "funasr_model_idle": "Loaded funasr models such as the punctuation model used for re-segmentation are kept and reused, unloaded after being unused for this many seconds, 0=unload after each use",
+                    "funasr_batch": "Number of speech segments sent to SenseVoiceSmall per call, lower it if running out of memory",
+                    "uvr_model_idle": "The vocal separation model is kept loaded and reused, unloaded after being unused for this many seconds, 0=unload after each separation",
+                    "uvr_batch": "Number of spectrogram windows per forward pass when separating vocals, larger is faster but uses more memory",
                     "beam_size": "Precision adjustment during subtitle recognition, 1-5, 1 = lowest memory usage, 5 = highest memory usage",
                     "best_of": "Precision adjustment during subtitle recognition, 1-5, 1 = lowest memory usage, 5 = highest memory usage",
                     "temperature": "0 = less GPU resource usage but slightly worse performance, 1 = more GPU resource usage and better performance",
@@ -427,6 +505,19 @@ class Ui_setini(object):
             self.titles = {
                 "homedir": "Set Home directory",
                 "is_queue":"Video Translation Task Queuing Translation",
+                "cpu_limit": "CPU-heavy concurrency",
+                "network_limit": "Network concurrency",
+                "ffmpeg_limit": "FFmpeg concurrency",
+                "prepare_worker": "Preprocess stage workers",
+                "recogn_worker": "Recognition stage workers",
+                "trans_worker": "Translation stage workers",
+                "dubbing_worker": "Dubbing stage workers",
+                "align_worker": "Alignment stage workers",
+                "assemb_worker": "Assembling stage workers",
+                "task_resume": "Resume Interrupted Tasks",
+                "task_resume_days": "Checkpoint Retention Days",
+                "stream_pipeline": "Overlap Recognition, Translation and Dubbing",
+                "stream_window": "Pipeline Window Size",
                 "ai302_models": "302.ai Translation Models",
                 "ai302tts_models": "302.ai TTS Models",
                 "openairecognapi_model": "OpenAI Speech",
@@ -435,6 +526,7 @@ class Ui_setini(object):
                 "aisendsrt":"Sending full subtitle content when ai translation",
                 "crf": "Video Transcoding Loss Control",
                 "videoslow_hard":"Try hardware acceleration when video slowly",
+                "videoslow_onepass":"Single-pass video slowdown",
                 "cuda_qp": "NVIDIA Use QP Instead of CRF",
                 "cuda_decode":"Decode the video using cuda",
                 "preset": "Output Video Quality compression rate",
@@ -471,13 +563,22 @@ class Ui_setini(object):
                 "trans_thread": "Number of Subtitles Translated Simultaneously",
                 "aitrans_thread": "Number of Subtitles AI Translated Simultaneously",
                 "retries": "Number of Retries on Translation Failure",
+                "trans_cache_rows": "Translation Cache Max Lines",
+                "trans_cache_days": "Translation Cache Expiry Days",
                 "dubbing_thread": "Number of Subtitles Dubbed Simultaneously",
+                "tts_cache_size": "Dubbing Cache Size MB",
+                "tts_cache_sampling": "Cache Sampled Dubbing",
                 "countdown_sec": "Countdown Seconds on Pause",
                 "backaudio_volume": "Background Volume Multiplier",
                 "loop_backaudio": "Loop Background Audio",
                 "cuda_com_type": "CUDA Data Type",
                 "whisper_threads": "Faster-Whisper CPU Threads",
                 "whisper_worker": "Faster-Whisper Working Threads",
+                "whisper_model_cache": "Faster-Whisper Resident Models",
+                "funasr_model_idle": "FunASR Model Idle Seconds",
+                "funasr_batch": "SenseVoice Batch Size",
+                "uvr_model_idle": "Separation Model Idle Seconds",
+                "uvr_batch": "Separation Batch Windows",
                 "beam_size": "Subtitle Recognition Accuracy Control 1",
                 "best_of": "Subtitle Recognition Accuracy Control 2",
                 "temperature": "Faster-Whisper Temperature Control",
@@ -491,6 +592,9 @@ class Ui_setini(object):
                 "azure_lines": "Azure TTS Batch Line Count",
                 "chattts_voice": "ChatTTS Voice Tone Value",
                 "translation_wait": "Pause Time After Translation",
+            "trans_concurrent": "Concurrent Translation Batches",
+            "aitrans_token_budget": "AI Translation Token Budget per Batch",
+            "aitrans_max_lines": "AI Translation Max Lines per Batch",
                 "dubbing_wait": "Pause Time After Dubbing",
                 "gemini_model": "Gemini Model List",
                 "google_trans_newadd": "Google translation subtitles new language code",
@@ -0,0 +1,158 @@
+"""
+低内存音频读写，wav/flac 等 soundfile 可直接定位的格式只读取所需帧，不将整个文件解码到内存
+m4a/aac 等 soundfile 不支持的格式，或需要改变采样率时，经 ffmpeg 管道仅解码所需片段
+数据均为 numpy 数组，形状为 (帧数, 声道数)，mono=True 时为一维
+"""
+import subprocess
+import sys
+
+import numpy as np
+import soundfile as sf
+
+from videotrans.configure import config
+from videotrans.util import mediainfo
+
+
+def info(file):
+    """返回 (采样率, 声道数, 总帧数)，不支持的格式返回 None"""
+    try:
+        i = sf.info(file)
+        return i.samplerate, i.channels, i.frames
+    except Exception:
+        return None
+
+
+def duration_ms(file):
+    """音频时长毫秒，wav/mp3 仅读取文件头，其他格式使用缓存的 ffprobe 结果"""
+    return mediainfo.duration_ms(file)
+
+
+def _ffmpeg_read(file, start_ms, end_ms, sr, channels):
+    cmd = [config.FFMPEG_BIN, "-hide_banner", "-loglevel", "error", "-nostdin"]
+    if start_ms > 0:
+        cmd += ["-ss", f'{start_ms / 1000:.3f}']
+    cmd += ["-i", str(file)]
+    if end_ms is not None:
+        cmd += ["-t", f'{max(end_ms - start_ms, 0) / 1000:.3f}']
+    cmd += ["-vn", "-f", "f32le", "-acodec", "pcm_f32le", "-ac", str(channels)]
+    cmd += ["-ar", str(sr), "-"]
+    p = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False,
+                       creationflags=0 if sys.platform != 'win32' else subprocess.CREATE_NO_WINDOW)
+    if p.returncode != 0:
+        raise Exception(p.stderr.decode('utf-8', errors='replace').strip()[-300:])
+    return np.frombuffer(p.stdout, dtype=np.float32).reshape(-1, channels)
+
+
+def read(file, start_ms=0, end_ms=None, *, sr=None, mono=False, dtype='float32'):
+    """
+    读取 [start_ms, end_ms) 区间，end_ms 为 None 时读到末尾
+    sr 为 None 时保持原采样率，否则重采样到 sr，返回 (数据, 采样率)
+    """
+    i = info(file)
+    if i and (not sr or sr == i[0]):
+        rate = i[0]
+        start = int(start_ms * rate / 1000)
+        stop = None if end_ms is None else max(int(end_ms * rate / 1000), start)
+        data, _ = sf.read(file, start=start, stop=stop, dtype=dtype, always_2d=True)
+    else:
+        channels = 1 if mono else (i[1] if i else 2)
+        # 无法得知原采样率时统一输出 44100
+        rate = sr or 44100
+        data = _ffmpeg_read(file, start_ms, end_ms, rate, channels)
+        if dtype != 'float32':
+            data = _from_float(data, dtype)
+    if mono:
+        data = data[:, 0] if data.shape[1] == 1 else data.mean(axis=1).astype(data.dtype)
+    return data, rate
+
+
+def _from_float(data, dtype):
+    if dtype == 'int16':
+        return (np.clip(data, -1.0, 1.0) * 32767).astype(np.int16)
+    return data.astype(dtype)
+
+
+def blocks(file, block_ms, *, mono=False, dtype='float32'):
+    """按 block_ms 逐块读取，生成 (起始毫秒, 数据)，内存中只保留一块"""
+    i = info(file)
+    if not i:
+        total = duration_ms(file)
+        for start in range(0, total, block_ms):
+            data, _ = read(file, start, min(start + block_ms, total), mono=mono, dtype=dtype)
+            yield start, data
+        return
+    rate = i[0]
+    blocksize = max(1, int(block_ms * rate / 1000))
+    for n, data in enumerate(sf.blocks(file, blocksize=blocksize, dtype=dtype, always_2d=True)):
+        if mono:
+            data = data[:, 0] if data.shape[1] == 1 else data.mean(axis=1).astype(data.dtype)
+        yield int(n * blocksize * 1000 / rate), data
+
+
+def write(file, data, sr, subtype='PCM_16'):
+    sf.write(file, data, sr, subtype=subtype)
+
+
+def to_segment(data, sr):
+    """转为 pydub AudioSegment，用于仍需 pydub 处理的少量片段"""
+    from pydub import AudioSegment
+    if data.dtype != np.int16:
+        data = _from_float(data, 'int16')
+    channels = 1 if data.ndim == 1 else data.shape[1]
+    return AudioSegment(data.tobytes(), frame_rate=sr, sample_width=2, channels=channels)
+
+
+def nonsilent_range(file, silence_thresh=-50.0, chunk_ms=10):
+    """
+    逐块扫描，以 chunk_ms 为窗口计算音量，返回首个和最后一个非静音窗口的 (起始毫秒, 结束毫秒)
+    全部静音返回 None，silence_thresh 为 dBFS，同 pydub detect_nonsilent
+    """
+    i = info(file)
+    rate = i[0] if i else 44100
+    win = max(1, int(chunk_ms * rate / 1000))
+    thresh = 10 ** (silence_thresh / 20)
+    first = last = None
+    pos = 0
+    rest = np.zeros(0, dtype=np.float64)
+    # 每块约 60s，各声道的均方值逐帧合并后再按窗口计算
+    for _, data in blocks(file, max(chunk_ms, 60000 // chunk_ms * chunk_ms)):
+        power = np.concatenate([rest, np.mean(np.square(data, dtype=np.float64), axis=1)])
+        n = len(power) // win
+        rest = power[n * win:]
+        if n:
+            loud = np.flatnonzero(np.sqrt(power[:n * win].reshape(n, win).mean(axis=1)) > thresh)
+            if len(loud):
+                if first is None:
+                    first = pos + loud[0]
+                last = pos + loud[-1]
+        pos += n
+    if len(rest) and np.sqrt(rest.mean()) > thresh:
+        if first is None:
+            first = pos
+        last = pos
+    if first is None:
+        return None
+    total = pos * win + len(rest)
+    return int(first * win * 1000 / rate), int(min((last + 1) * win, total) * 1000 / rate)
+
+
+def trim_silence(file, silence_thresh=-50.0, chunk_ms=10, is_start=True):
+    """
+    去除末尾静音，is_start=True 时同时去除开头静音，按原编码写回 file
+    返回处理后的时长毫秒，全部为静音时不修改，soundfile 不支持的格式返回 None
+    """
+    i = info(file)
+    if not i:
+        return None
+    total = int(i[2] * 1000 / i[0]) if i[0] else 0
+    bounds = nonsilent_range(file, silence_thresh, chunk_ms)
+    if not bounds:
+        return total
+    start = bounds[0] if is_start else 0
+    end = bounds[1]
+    if start <= 0 and end >= total:
+        return total
+    subtype = sf.info(file).subtype
+    data, rate = read(file, start, end)
+    sf.write(file, data, rate, subtype=subtype)
+    return end - start
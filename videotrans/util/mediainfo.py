@@ -0,0 +1,234 @@
+"""
+媒体元数据缓存，以 (路径, 大小, 修改时间) 为键缓存 ffprobe 结果，文件被改写后自动失效
+wav/mp3 时长直接解析文件头获得，不启动 ffprobe 进程
+"""
+import json
+import os
+import struct
+import threading
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from videotrans.configure import config
+
+# 最多缓存的文件数，按最近使用淘汰
+MAX_ENTRIES = 4096
+
+_lock = threading.Lock()
+# key -> {"probe": ffprobe json, "duration": 毫秒}
+_cache = OrderedDict()
+
+
+# 文件不存在等同原 ffprobe 失败时抛出普通 Exception，调用方无需另外处理 OSError
+def _key(file):
+    try:
+        st = os.stat(file)
+    except OSError as e:
+        raise Exception(f'ffprobe error:dont get video information {file} {e}')
+    return Path(file).resolve().as_posix(), st.st_size, st.st_mtime_ns
+
+
+def _get(key, name):
+    with _lock:
+        entry = _cache.get(key)
+        if entry is None or name not in entry:
+            return None
+        _cache.move_to_end(key)
+        return entry[name]
+
+
+def _put(key, name, value):
+    with _lock:
+        _cache.setdefault(key, {})[name] = value
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def clear():
+    with _lock:
+        _cache.clear()
+
+
+def probe(file):
+    """ffprobe -show_format -show_streams 的 json 结果，同一文件未改动时只执行一次"""
+    key = _key(file)
+    out = _get(key, 'probe')
+    if out is not None:
+        return out
+    from videotrans.util import tools
+    out = tools.runffprobe(['-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams', Path(file).as_posix()])
+    if out is False:
+        raise Exception(f'ffprobe error:dont get video information')
+    out = json.loads(out)
+    _put(key, 'probe', out)
+    return out
+
+
+# mp3 帧头各版本的比特率(kbps)和采样率表
+_MP3_BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def _mp3_duration_ms(file):
+    """解析 mp3 文件头，VBR 使用 Xing/Info/VBRI 中的总帧数，CBR 按比特率和数据长度计算，无法解析返回 None"""
+    size = os.path.getsize(file)
+    with open(file, 'rb') as f:
+        head = f.read(10)
+        offset = 0
+        # 跳过 ID3v2 标签
+        if head[:3] == b'ID3' and len(head) == 10:
+            offset = 10 + ((head[6] & 0x7f) << 21 | (head[7] & 0x7f) << 14 | (head[8] & 0x7f) << 7 | (head[9] & 0x7f))
+        f.seek(offset)
+        buf = f.read(64 * 1024)
+        tail = 0
+        if size > 128:
+            f.seek(-128, os.SEEK_END)
+            tail = 128 if f.read(3) == b'TAG' else 0
+    for i in range(len(buf) - 4):
+        if buf[i] != 0xff or buf[i + 1] & 0xe0 != 0xe0:
+            continue
+        b1, b2, b3 = buf[i + 1], buf[i + 2], buf[i + 3]
+        version_bits = (b1 >> 3) & 3
+        layer_bits = (b1 >> 1) & 3
+        bitrate_idx = b2 >> 4
+        rate_idx = (b2 >> 2) & 3
+        if version_bits == 1 or layer_bits == 0 or bitrate_idx in (0, 15) or rate_idx == 3:
+            continue
+        version = 1 if version_bits == 3 else 2
+        layer = 4 - layer_bits
+        bitrate = _MP3_BITRATES[(version, layer)][bitrate_idx] * 1000
+        samplerate = _MP3_RATES[version_bits][rate_idx]
+        if layer == 1:
+            samples = 384
+        elif layer == 3 and version == 2:
+            samples = 576
+        else:
+            samples = 1152
+        mono = (b3 >> 6) == 3
+        # Xing/Info 位于边信息之后，VBRI 固定位于帧头后 32 字节
+        side = (17 if mono else 32) if version == 1 else (9 if mono else 17)
+        xing = buf[i + 4 + side:i + 4 + side + 12]
+        if xing[:4] in (b'Xing', b'Info') and struct.unpack('>I', xing[4:8])[0] & 1:
+            frames = struct.unpack('>I', xing[8:12])[0]
+            return int(frames * samples * 1000 / samplerate)
+        vbri = buf[i + 36:i + 36 + 18]
+        if vbri[:4] == b'VBRI':
+            frames = struct.unpack('>I', vbri[14:18])[0]
+            return int(frames * samples * 1000 / samplerate)
+        # 末尾 ID3v1 标签不计入
+        return int((size - offset - i - tail) * 8 * 1000 / bitrate)
+    return None
+
+
+def _header_duration_ms(file):
+    ext = Path(file).suffix.lower()
+    try:
+        if ext == '.wav':
+            with wave.open(str(file), 'rb') as w:
+                return int(w.getnframes() * 1000 / w.getframerate())
+        if ext == '.mp3':
+            return _mp3_duration_ms(file)
+    except Exception:
+        return None
+    return None
+
+
+def duration_ms(file):
+    """时长毫秒，wav/mp3 解析文件头，其他格式使用缓存的 ffprobe 结果"""
+    key = _key(file)
+    ms = _get(key, 'duration')
+    if ms is not None:
+        return ms
+    ms = _header_duration_ms(file)
+    if ms is None:
+        out = probe(file)
+        ms = int(float(out['format']['duration']) * 1000)
+    _put(key, 'duration', ms)
+    return ms
+
+
+def audio_format(file):
+    """(采样率, 声道数)，wav 解析文件头，其他格式使用缓存的 ffprobe 结果，无音频流返回 None"""
+    key = _key(file)
+    fmt = _get(key, 'format')
+    if fmt is not None:
+        return fmt
+    fmt = None
+    if Path(file).suffix.lower() == '.wav':
+        try:
+            with wave.open(str(file), 'rb') as w:
+                fmt = (w.getframerate(), w.getnchannels())
+        except Exception:
+            fmt = None
+    if fmt is None:
+        for it in probe(file).get('streams', []):
+            if it.get('codec_type') == 'audio':
+                fmt = (int(it['sample_rate']), int(it['channels']))
+                break
+    if fmt is not None:
+        _put(key, 'format', fmt)
+    return fmt
+
+
+def batch_audio_format(files, max_workers=None):
+    """批量获取 (采样率, 声道数)，返回与 files 对应的列表，无法获取的为 None"""
+
+    def _one(file):
+        try:
+            return audio_format(file)
+        except Exception as e:
+            config.logger.exception(e, exc_info=True)
+            return None
+
+    if not files:
+        return []
+    workers = max_workers or min(8, os.cpu_count() or 4)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(files)))) as pool:
+        return list(pool.map(_one, files))
+
+
+def batch_duration_ms(files, max_workers=None):
+    """
+    批量获取时长，返回与 files 对应的列表，无法获取的为 None
+    可解析文件头的直接读取，其余并发执行 ffprobe
+    """
+    result = [None] * len(files)
+    rest = []
+    for i, file in enumerate(files):
+        try:
+            key = _key(file)
+        except Exception:
+            continue
+        ms = _get(key, 'duration')
+        if ms is None:
+            ms = _header_duration_ms(file)
+            if ms is not None:
+                _put(key, 'duration', ms)
+        if ms is None:
+            rest.append(i)
+        else:
+            result[i] = ms
+
+    def _one(i):
+        try:
+            return i, duration_ms(files[i])
+        except Exception as e:
+            config.logger.exception(e, exc_info=True)
+            return i, None
+
+    if rest:
+        workers = max_workers or min(8, os.cpu_count() or 4)
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(rest)))) as pool:
+            for i, ms in pool.map(_one, rest):
+                result[i] = ms
+    return result
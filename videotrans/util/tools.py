@@ -644,6 +644,38 @@ def runffmpeg(arg, *, noextname=None, uuid=None, force_cpu=False):
         raise
 
 
+_ffmpeg_major = None
+
+
+# ffmpeg 主版本号，无法识别(例如 git 构建)时为 0
+def get_ffmpeg_major():
+    global _ffmpeg_major
+    if _ffmpeg_major is not None:
+        return _ffmpeg_major
+    _ffmpeg_major = 0
+    try:
+        p = subprocess.run([config.FFMPEG_BIN, '-hide_banner', '-version'],
+                           stdout=subprocess.PIPE,
+                           stderr=subprocess.PIPE,
+                           encoding="utf-8",
+                           errors='replace',
+                           text=True,
+                           creationflags=0 if sys.platform != 'win32' else subprocess.CREATE_NO_WINDOW)
+        m = re.match(r'ffmpeg version n?(\d+)\.', p.stdout.strip())
+        if m:
+            _ffmpeg_major = int(m.group(1))
+    except Exception as e:
+        config.logger.exception(e, exc_info=True)
+    return _ffmpeg_major
+
+
+# ffmpeg 从文件读取滤镜图的参数，7.0 起 -filter_complex_script 已弃用，改用 -/filter_complex
+def filter_complex_file_args(filter_file):
+    if get_ffmpeg_major() >= 7:
+        return ['-/filter_complex', filter_file]
+    return ['-filter_complex_script', filter_file]
+
+
 # run ffprobe 获取视频元信息
 def runffprobe(cmd):
     try:
@@ -704,12 +736,9 @@ def hide_show_element(wrap_layout, show_status):
 
 # 获取视频信息
 def get_video_info(mp4_file, *, video_fps=False, video_scale=False, video_time=False, get_codec=False):
-    mp4_file = Path(mp4_file).as_posix()
-    out = runffprobe(
-        ['-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams', mp4_file])
-    if out is False:
-        raise Exception(f'ffprobe error:dont get video information')
-    out = json.loads(out)
+    from videotrans.util import mediainfo
+    # 同一文件未改动时复用已缓存的 ffprobe 结果
+    out = mediainfo.probe(Path(mp4_file).as_posix())
     result = {
         "video_fps": 30,
         "video_codec_name": "",
@@ -798,43 +827,35 @@ def split_novoice_byraw(source_mp4, novoice_mp4, noextname, lib="copy"):
     return runffmpeg(cmd, noextname=noextname)
 
 
-# 从原始视频中分离出音频 cuda + h264_cuvid
-def split_audio_byraw(source_mp4, targe_audio, is_separate=False, uuid=None):
-    source_mp4 = Path(source_mp4).as_posix()
-    targe_audio = Path(targe_audio).as_posix()
+# 从原始视频中一次解码输出全部所需音频，ffmpeg 对同一输入只解码一次，各输出共用解码结果
+# targe_audio 为单声道 aac，shibie_audio 为 16k 单声道待识别音频，raw_wav 为 44.1k 双声道待分离音频
+def extract_audio_byraw(source_mp4, targe_audio, shibie_audio=None, raw_wav=None):
     cmd = [
         "-y",
         "-i",
-        source_mp4,
-        "-vn",
-        "-ac",
-        "1",
-        "-b:a",
-        "128k",
-        "-c:a",
-        "aac",
-        targe_audio
+        Path(source_mp4).as_posix()
     ]
-    rs = runffmpeg(cmd)
+    if raw_wav:
+        cmd += ["-vn", "-ac", "2", "-ar", "44100", "-c:a", "pcm_s16le", Path(raw_wav).as_posix()]
+    if shibie_audio:
+        cmd += ["-vn", "-ac", "1", "-ar", "16000", Path(shibie_audio).as_posix()]
+    # targe_audio 放在最后，自定义 ffmpeg 参数仍作用于它
+    cmd += ["-vn", "-ac", "1", "-b:a", "128k", "-c:a", "aac", Path(targe_audio).as_posix()]
+    return runffmpeg(cmd)
+
+
+# 从原始视频中分离出音频 cuda + h264_cuvid
+# 不分离时 shibie_audio 不为空则同时输出 16k 待识别音频，分离时待识别音频需由分离后的 vocal.wav 转换
+def split_audio_byraw(source_mp4, targe_audio, is_separate=False, uuid=None, shibie_audio=None):
+    source_mp4 = Path(source_mp4).as_posix()
+    targe_audio = Path(targe_audio).as_posix()
     if not is_separate:
-        return rs
-    # 继续人声分离
+        return extract_audio_byraw(source_mp4, targe_audio, shibie_audio=shibie_audio)
+    # 继续人声分离，待分离音频与 targe_audio 同一次解码输出
     tmpdir = config.TEMP_DIR + f"/{time.time()}"
     os.makedirs(tmpdir, exist_ok=True)
     tmpfile = tmpdir + "/raw.wav"
-    runffmpeg([
-        "-y",
-        "-i",
-        source_mp4,
-        "-vn",
-        "-ac",
-        "2",
-        "-ar",
-        "44100",
-        "-c:a",
-        "pcm_s16le",
-        tmpfile
-    ])
+    extract_audio_byraw(source_mp4, targe_audio, raw_wav=tmpfile)
     from videotrans.separate import st
     try:
         path = Path(targe_audio).parent.as_posix()
@@ -1469,12 +1490,9 @@ def send_notification(title, message):
 
 # 获取音频时长
 def get_audio_time(audio_file):
-    # 如果存在缓存并且没有禁用缓存
-    out = runffprobe(['-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams', audio_file])
-    if out is False:
-        raise Exception(f'ffprobe error:dont get video information')
-    out = json.loads(out)
-    return float(out['format']['duration'])
+    from videotrans.util import mediainfo
+    # wav/mp3 解析文件头，其他格式复用已缓存的 ffprobe 结果
+    return mediainfo.duration_ms(audio_file) / 1000
 
 
 def kill_ffmpeg_processes():
@@ -1543,6 +1561,11 @@ def remove_silence_from_end(input_file_path, silence_threshold=-50.0, chunk_size
     :param chunk_size: the chunk size to use in silence detection (in milliseconds)
     :return: an AudioSegment without silence at the end
     """
+    # wav 文件逐块检测并只读取保留的区间，不整体载入
+    if isinstance(input_file_path, str) and input_file_path.split('.')[-1].lower() == 'wav':
+        from videotrans.util import audioio
+        if audioio.trim_silence(input_file_path, silence_threshold, chunk_size, is_start) is not None:
+            return input_file_path
     # Load the audio file
     format = "wav"
     if isinstance(input_file_path, str):
@@ -1597,6 +1620,12 @@ def remove_silence_from_file(input_file_path, silence_threshold=-50.0, chunk_siz
     # Load the audio file
     format = input_file_path.split('.')[-1].lower()
     length = 0
+    if format == 'wav':
+        from videotrans.util import audioio
+        length = audioio.trim_silence(input_file_path, silence_threshold, chunk_size, is_start)
+        if length is not None:
+            return input_file_path, length
+        length = 0
     if format in ['wav', 'mp3', 'm4a']:
         audio = AudioSegment.from_file(input_file_path, format=format if format in ['wav', 'mp3'] else 'mp4')
         length = len(audio)